@@ -14,12 +14,30 @@ if [ ! -d "venv" ]; then
     # Install requirements
     echo "Installing dependencies..."
     pip install -r requirements.txt
+    
+    # Pre-compile theme bundles so the first start doesn't have to
+    python src/theme_compiler.py > /dev/null
 else
     # Activate virtual environment
     source venv/bin/activate
 fi
 
+# Headless batch conversion: no window, no theme loading
+if [ "$1" = "--batch" ]; then
+    shift
+    python src/batch_convert.py "$@"
+    exit $?
+fi
+
+# Warm standby process: later launches get a pre-built window from it instantly
+if [ "$1" = "--daemon" ]; then
+    echo "Starting HyprText daemon..."
+    nohup python src/main.py "$@" > /dev/null 2>&1 &
+    echo "Daemon started! Stop it with ./run.sh --stop-daemon"
+    exit 0
+fi
+
 # Run the application
 echo "Starting HyprText..."
-nohup python src/main.py 
+nohup python src/main.py "$@"
 echo "Program started! You can safely close this terminal if you don't want to debug."
@@ -1,6 +1,7 @@
-from PyQt6.QtWidgets import QTextEdit, QPlainTextEdit
+from PyQt6.QtWidgets import QTextEdit
 from PyQt6.QtCore import QPropertyAnimation, QEasingCurve, Qt, pyqtProperty, QTimer, QObject
-from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor
+from PyQt6.QtGui import QColor, QTextCharFormat, QTextFormat, QTextLayout, QPalette
+import time
 import traceback
 
 class AnimationManager(QObject):
@@ -57,139 +58,197 @@ class AnimationManager(QObject):
 # Create a global animation manager instance
 animation_manager = AnimationManager()
 
-class CharacterAnimation:
-    """Handles animation of a single character with fade in/out effects"""
+# Marker property used to tell fade formats apart from syntax highlighter formats
+ANIMATION_FORMAT_PROPERTY = QTextFormat.Property.UserProperty + 1
+
+class FadeOverlay:
+    """Frame-driven fade engine for text editors
+    
+    Tracks a list of (range, start_time) entries. Every frame, the visible glyphs of
+    those entries get their foreground color with the current opacity as QTextLayout
+    overlay formats (the mechanism QSyntaxHighlighter uses), set once per affected block.
+    The document stays plain: no undo entries, no stray formats, no cursor moves. The
+    glyphs themselves fade, so whatever is behind a transparent editor shows through,
+    and the cost of a frame depends only on the number of visible animating glyphs.
+    """
     
     FADE_IN = 0
     FADE_OUT = 1
     
-    def __init__(self, text_widget, position, animation_type=FADE_IN, duration=200):
+    FRAME_INTERVAL = 16  # ms, roughly 60 fps
+    
+    def __init__(self, text_widget):
         self.text_widget = text_widget
-        self.position = position
-        self.animation_type = animation_type
-        self.duration = duration
-        self.steps = 5
-        self.current_step = 0
-        self.completed = False
+        self.entries = []  # Lists of [start, length, start_time, duration, fade_in]
+        self.styled_positions = []  # A position in every block given fade formats by the last frame
         
-        # Create a dedicated timer for this animation
+        # A single frame timer drives every entry; it only runs while something animates
         self.timer = QTimer(text_widget)
-        self.timer.setInterval(duration // self.steps)
-        self.timer.timeout.connect(self.animation_step)
+        self.timer.setInterval(self.FRAME_INTERVAL)
+        self.timer.timeout.connect(self._tick)
     
-    def start(self):
-        """Start the animation"""
+    def add(self, start, length, fade_in=True, duration=200, delay=0):
+        """Start fading the glyphs in [start, start + length)"""
         try:
-            # Set initial values
-            if self.animation_type == self.FADE_IN:
-                self.current_step = 0
-            else:  # FADE_OUT
-                self.current_step = self.steps
-                
-            # Start the timer
-            self.timer.start()
-            return True
+            if length <= 0:
+                return
+            start_time = time.monotonic() + delay / 1000.0
+            self.entries.append([start, length, start_time, max(1, duration) / 1000.0, fade_in])
+            if not self.timer.isActive():
+                self.timer.start()
         except Exception as e:
-            print(f"Error starting character animation: {str(e)}")
+            print(f"Error adding fade overlay: {str(e)}")
             traceback.print_exc()
-            return False
     
-    def stop(self):
-        """Stop the animation and clean up"""
+    def shift(self, from_pos, offset):
+        """Move entries at or after from_pos by offset after text was inserted or removed"""
+        for entry in self.entries:
+            if entry[0] >= from_pos:
+                entry[0] = max(0, entry[0] + offset)
+        self.styled_positions = [
+            max(from_pos, position + offset) if position >= from_pos else position
+            for position in self.styled_positions
+        ]
+    
+    def remove_range(self, start, end):
+        """Drop the parts of entries that fall inside [start, end)"""
+        remaining = []
+        for entry in self.entries:
+            entry_start, entry_end = entry[0], entry[0] + entry[1]
+            if entry_end <= start or entry_start >= end:
+                remaining.append(entry)
+                continue
+            # Keep whatever sticks out on either side of the removed range
+            if entry_start < start:
+                remaining.append([entry_start, start - entry_start] + entry[2:])
+            if entry_end > end:
+                remaining.append([end, entry_end - end] + entry[2:])
+        self.entries = remaining
+    
+    def clear(self):
+        """Stop all fades and remove their formats"""
+        self.entries = []
+        self.timer.stop()
         try:
-            self.timer.stop()
-            self.completed = True
+            self._apply_formats({})
         except Exception as e:
-            print(f"Error stopping character animation: {str(e)}")
+            print(f"Error clearing fade overlay: {str(e)}")
             traceback.print_exc()
+        self.styled_positions = []
+    
+    def is_active(self):
+        """Check if any glyphs are currently fading"""
+        return bool(self.entries)
+    
+    def _progress(self, entry, now):
+        """Return the visible opacity (0.0 - 1.0) of an entry's glyphs"""
+        start_time, duration, fade_in = entry[2], entry[3], entry[4]
+        progress = min(1.0, max(0.0, (now - start_time) / duration))
+        return progress if fade_in else 1.0 - progress
     
-    def animation_step(self):
-        """Process one step of the animation"""
+    def _tick(self):
+        """Advance one frame: retire finished entries and restyle the visible fading glyphs"""
         try:
-            # Update step counter
-            if self.animation_type == self.FADE_IN:
-                self.current_step += 1
-                opacity = self.current_step / self.steps
-                done = self.current_step >= self.steps
-            else:  # FADE_OUT
-                self.current_step -= 1
-                opacity = self.current_step / self.steps
-                done = self.current_step <= 0
-            
-            # Check if text still exists and position is valid
-            document = self.text_widget.document()
-            if self.position >= len(self.text_widget.toPlainText()):
-                self.stop()
-                return
-                
-            # Apply the opacity to the character
-            cursor = QTextCursor(document)
-            cursor_position = self.text_widget.textCursor().position()  # Save current position
-            
-            # Get text format - different widgets have different methods
-            if hasattr(self.text_widget, 'textColor'):
-                # For QTextEdit
-                format = QTextCharFormat()
-                color = self.text_widget.textColor()
-                color.setAlphaF(opacity)
-                format.setForeground(color)
-            elif isinstance(self.text_widget, QPlainTextEdit):
-                # For any QPlainTextEdit (including custom editors)
-                # Try to get format from cursor to preserve syntax highlighting if available
-                try:
-                    # Select the character at the position
-                    cursor.setPosition(self.position)
-                    cursor.setPosition(self.position + 1, QTextCursor.MoveMode.KeepAnchor)
-                    format = cursor.charFormat()
-                    color = format.foreground().color()
-                    # If color is not valid, use a default
-                    if not color.isValid():
-                        color = QColor(Qt.GlobalColor.white)
-                except:
-                    # If we can't get valid format, create a new one with default color
-                    format = QTextCharFormat()
-                    color = QColor(Qt.GlobalColor.black if self.text_widget.palette().text().color().lightness() > 128 else Qt.GlobalColor.white)
-                color.setAlphaF(opacity)
-                format.setForeground(color)
-            else:
-                # For other widget types
-                format = QTextCharFormat()
-                color = QColor(Qt.GlobalColor.black if self.text_widget.palette().text().color().lightness() > 128 else Qt.GlobalColor.white)
-                color.setAlphaF(opacity)
-                format.setForeground(color)
-            
-            # Try to apply the format to the character at position
-            try:
-                # Select the character at the position
-                cursor.setPosition(self.position)
-                cursor.setPosition(self.position + 1, QTextCursor.MoveMode.KeepAnchor)
-                
-                # Apply the format
-                cursor.mergeCharFormat(format)
-                
-                # Restore cursor position
-                cursor.setPosition(cursor_position)
-                self.text_widget.setTextCursor(cursor)
-            except Exception as e:
-                print(f"Error updating format at position {self.position}: {str(e)}")
-                self.stop()
-                return
-            
-            # Check if animation is complete
-            if done:
-                if self.animation_type == self.FADE_OUT:
-                    # For fade out, we want the character to be fully invisible before stopping
-                    color.setAlphaF(0)
-                    format.setForeground(color)
-                    cursor.mergeCharFormat(format)
-                self.stop()
-                if hasattr(self.text_widget, 'animation_completed'):
-                    self.text_widget.animation_completed(self)
-                
+            now = time.monotonic()
+            self.entries = [entry for entry in self.entries if now < entry[2] + entry[3]]
+            if not self.entries:
+                self.timer.stop()
+            self._apply_formats(self._frame_formats(now))
         except Exception as e:
-            print(f"Error in animation step: {str(e)}")
+            print(f"Error in fade overlay frame: {str(e)}")
             traceback.print_exc()
-            self.stop()
+            self.clear()
+    
+    def _visible_range(self):
+        """Return the first and last document positions shown in the viewport"""
+        viewport_rect = self.text_widget.viewport().rect()
+        first = self.text_widget.cursorForPosition(viewport_rect.topLeft()).position()
+        last = self.text_widget.cursorForPosition(viewport_rect.bottomRight()).position()
+        return first, last
+    
+    def _text_color(self, char_format):
+        """Return the resting color of glyphs with the given character format"""
+        foreground = char_format.foreground()
+        if foreground.style() != Qt.BrushStyle.NoBrush:
+            return QColor(foreground.color())
+        return QColor(self.text_widget.palette().color(QPalette.ColorRole.Text))
+    
+    def _frame_formats(self, now):
+        """Return {block number: (block, [FormatRange])} for the visible fading glyphs
+        
+        Only the part of each entry between the visible positions is looked at, so a
+        large paste costs as much as the glyphs on screen.
+        """
+        frame = {}
+        if not self.entries:
+            return frame
+        
+        document = self.text_widget.document()
+        last_position = document.characterCount() - 1
+        first_visible, last_visible = self._visible_range()
+        for entry in self.entries:
+            opacity = self._progress(entry, now)
+            if opacity >= 1.0:
+                continue  # Fully shown; the document's own format applies
+            start = min(max(entry[0], first_visible), last_position)
+            end = min(entry[0] + entry[1], last_visible + 1, last_position)
+            
+            block = document.findBlock(start)
+            while block.isValid() and block.position() < end:
+                block_start = block.position()
+                block_end = block_start + block.length() - 1  # Without the separator
+                formats = frame.setdefault(block.blockNumber(), (block, []))[1]
+                
+                # One range per fragment, since fragments can differ in color
+                iterator = block.begin()
+                while not iterator.atEnd():
+                    fragment = iterator.fragment()
+                    run_start = max(start, fragment.position())
+                    run_end = min(end, fragment.position() + fragment.length(), block_end)
+                    if run_start < run_end:
+                        color = self._text_color(fragment.charFormat())
+                        color.setAlphaF(color.alphaF() * opacity)
+                        format = QTextCharFormat()
+                        format.setForeground(color)
+                        format.setProperty(ANIMATION_FORMAT_PROPERTY, True)
+                        format_range = QTextLayout.FormatRange()
+                        format_range.start = run_start - block_start
+                        format_range.length = run_end - run_start
+                        format_range.format = format
+                        formats.append(format_range)
+                    iterator += 1
+                block = block.next()
+        return frame
+    
+    def _apply_formats(self, frame):
+        """Set this frame's fade formats, touching each affected block layout once
+        
+        Blocks styled by the previous frame but not this one get their fade formats
+        removed. Foreign formats, e.g. syntax highlighting, are kept.
+        """
+        document = self.text_widget.document()
+        blocks = {number: block for number, (block, _) in frame.items()}
+        for position in self.styled_positions:
+            block = document.findBlock(position)
+            if block.isValid():
+                blocks.setdefault(block.blockNumber(), block)
+        
+        for number, block in blocks.items():
+            layout = block.layout()
+            if layout is None:
+                continue
+            formats = [
+                format_range for format_range in layout.formats()
+                if not format_range.format.hasProperty(ANIMATION_FORMAT_PROPERTY)
+            ]
+            fade_formats = frame[number][1] if number in frame else []
+            if not fade_formats and len(formats) == len(layout.formats()):
+                continue  # Nothing of ours to remove
+            layout.setFormats(formats + fade_formats)
+            # Relayout and repaint just this block, the way QSyntaxHighlighter does
+            document.markContentsDirty(block.position(), block.length())
+        
+        self.styled_positions = [block.position() for block, _ in frame.values()]
 
 class AnimatedTextEdit(QTextEdit):
     """TextEdit with text fade-in animations when typing"""
@@ -197,10 +256,12 @@ class AnimatedTextEdit(QTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.animations_enabled = False  # Disabled by default for snappier standard mode
-        self.active_animations = {}  # Maps positions to animation objects
         self.animation_duration = 200  # ms
         self.prev_text = ""
         
+        # Fades are layout overlay formats, never written into the document
+        self.fade_overlay = FadeOverlay(self)
+        
         # Connect text change signal
         self.textChanged.connect(self.handle_text_changed)
     
@@ -225,10 +286,9 @@ class AnimatedTextEdit(QTextEdit):
                 # Calculate how many characters were inserted
                 inserted_chars = len(current_text) - len(self.prev_text)
                 
-                # Animate each new character
-                for i in range(inserted_chars):
-                    position = diff_pos + i
-                    self.start_animation(position, CharacterAnimation.FADE_IN)
+                # Move existing fades out of the way, then fade in the new characters
+                self.shift_animations(diff_pos, inserted_chars)
+                self.fade_overlay.add(diff_pos, inserted_chars, duration=self.animation_duration)
                 
             elif len(current_text) < len(self.prev_text):
                 # Text deletion case
@@ -237,7 +297,8 @@ class AnimatedTextEdit(QTextEdit):
                 # Calculate how many characters were deleted
                 deleted_chars = len(self.prev_text) - len(current_text)
                 
-                # Shift existing animations after deletion point
+                # Drop fades for the deleted characters and shift the rest
+                self.fade_overlay.remove_range(diff_pos, diff_pos + deleted_chars)
                 self.shift_animations(diff_pos, -deleted_chars)
                 
             # Update previous text
@@ -257,69 +318,39 @@ class AnimatedTextEdit(QTextEdit):
     
     def shift_animations(self, from_pos, offset):
         """Shift animation positions after text modifications"""
-        try:
-            # Create a new dictionary with updated positions
-            new_animations = {}
-            
-            for pos, animation in self.active_animations.items():
-                if pos >= from_pos:
-                    # This animation is after the modification point
-                    new_pos = pos + offset
-                    if new_pos >= 0:  # Ensure we don't get negative positions
-                        animation.position = new_pos
-                        new_animations[new_pos] = animation
-                else:
-                    # This animation is before the modification point, no change needed
-                    new_animations[pos] = animation
-                    
-            # Update the animations dictionary
-            self.active_animations = new_animations
-        except Exception as e:
-            print(f"Error shifting animations: {str(e)}")
-            traceback.print_exc()
+        self.fade_overlay.shift(from_pos, offset)
     
     def start_animation(self, position, animation_type):
         """Start a character animation at the given position"""
-        try:
-            # Stop any existing animation at this position
-            if position in self.active_animations:
-                self.active_animations[position].stop()
-                
-            # Create and start new animation
-            animation = CharacterAnimation(self, position, animation_type, self.animation_duration)
-            self.active_animations[position] = animation
-            animation.start()
-            
-        except Exception as e:
-            print(f"Error starting animation: {str(e)}")
-            traceback.print_exc()
-    
-    def animation_completed(self, animation):
-        """Called when an animation completes"""
-        try:
-            # Find and remove the animation from our tracking dictionary
-            for pos, anim in list(self.active_animations.items()):
-                if anim == animation:
-                    del self.active_animations[pos]
-                    break
-        except Exception as e:
-            print(f"Error handling animation completion: {str(e)}")
-            traceback.print_exc()
+        self.fade_overlay.add(
+            position, 1,
+            fade_in=animation_type == FadeOverlay.FADE_IN,
+            duration=self.animation_duration
+        )
     
     def set_animations_enabled(self, enabled=True):
         """Enable or disable text animations"""
         self.animations_enabled = enabled
         # Clear any active animations
         if not enabled:
-            for animation in list(self.active_animations.values()):
-                animation.stop()
-            self.active_animations.clear()
-            
+            self.fade_overlay.clear()
+    
+    def setDocument(self, document):
+        """Swap in another document (buffer) without animating its whole text in"""
+        self.fade_overlay.clear()
+        enabled = self.animations_enabled
+        self.animations_enabled = False
+        try:
+            super().setDocument(document)
+        finally:
+            self.animations_enabled = enabled
+        self.prev_text = self.toPlainText() if enabled else ""
+
     def clear(self):
         """Override clear to clean up animations"""
         super().clear()
         # Reset animations and text tracking
-        self.active_animations.clear()
+        self.fade_overlay.clear()
         self.prev_text = ""
 
 class MenuFader:
@@ -388,12 +419,14 @@ class SmoothTextEdit(QTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.animations_enabled = True
-        self.active_animations = {}
         self.animation_duration = 300  # Longer for smoother fade
         self.fade_steps = 10  # More steps for smoother animation
         self.prev_text = ""
         self.typing_sound_enabled = False
         
+        # Fades are layout overlay formats, never written into the document
+        self.fade_overlay = FadeOverlay(self)
+        
         # Connect text change signal
         self.textChanged.connect(self.handle_text_changed)
         
@@ -426,10 +459,13 @@ class SmoothTextEdit(QTextEdit):
                 # Calculate how many characters were inserted
                 inserted_chars = len(current_text) - len(self.prev_text)
                 
+                # Move existing fades out of the way of the inserted text
+                self.shift_animations(diff_pos, inserted_chars)
+                
                 # Create a smooth word fade-in effect when typing
                 # If multiple characters were inserted at once, animate them as a group
                 if inserted_chars > 1:
-                    # Word or paste insertion - use a single animation for the group
+                    # Word or paste insertion - use a staggered animation for the group
                     self.start_smooth_animation(diff_pos, inserted_chars, fade_in=True)
                 else:
                     # Single character - use character animation
@@ -464,102 +500,35 @@ class SmoothTextEdit(QTextEdit):
     
     def start_character_animation(self, position, fade_in=True):
         """Start a simple character animation at the given position"""
-        try:
-            # Stop any existing animation at this position
-            if position in self.active_animations:
-                animation = self.active_animations[position]
-                if hasattr(animation, 'stop'):
-                    animation.stop()
-            
-            # Create character animation
-            animation = CharacterAnimation(
-                self, 
-                position, 
-                CharacterAnimation.FADE_IN if fade_in else CharacterAnimation.FADE_OUT,
-                self.animation_duration
-            )
-            
-            # Track and start
-            self.active_animations[position] = animation
-            animation.start()
-            
-        except Exception as e:
-            print(f"Error starting character animation: {str(e)}")
-            traceback.print_exc()
+        self.fade_overlay.add(position, 1, fade_in=fade_in, duration=self.animation_duration)
     
     def start_smooth_animation(self, start_position, length, fade_in=True):
         """Start a smooth animation for multiple characters (like a word)"""
         try:
-            # Create animations for each character, staggered for a flowing effect
-            for i in range(length):
-                pos = start_position + i
-                delay = min(i * 15, 150)  # Stagger with max 150ms delay
-                
-                # Use a timer to delay the start of each character's animation
-                timer = QTimer(self)
-                timer.setSingleShot(True)
-                timer.timeout.connect(lambda p=pos, fi=fade_in: self.start_character_animation(p, fi))
-                timer.start(delay)
-                
-                # Store the timer in active_animations for tracking
-                self.active_animations[f"timer_{pos}"] = timer
-                
+            # Stagger each character's start for a flowing effect, capped at 150ms.
+            # Characters past the cap share one entry since they start together.
+            staggered = min(length, 10)
+            for i in range(staggered):
+                self.fade_overlay.add(
+                    start_position + i, 1,
+                    fade_in=fade_in, duration=self.animation_duration, delay=i * 15
+                )
+            if length > staggered:
+                self.fade_overlay.add(
+                    start_position + staggered, length - staggered,
+                    fade_in=fade_in, duration=self.animation_duration, delay=150
+                )
         except Exception as e:
             print(f"Error starting smooth animation: {str(e)}")
             traceback.print_exc()
     
     def cleanup_animations_in_range(self, start, end):
         """Clean up animations in a specific range"""
-        try:
-            for pos in list(self.active_animations.keys()):
-                if isinstance(pos, int) and start <= pos < end:
-                    animation = self.active_animations[pos]
-                    if hasattr(animation, 'stop'):
-                        animation.stop()
-                    del self.active_animations[pos]
-        except Exception as e:
-            print(f"Error cleaning up animations: {str(e)}")
-            traceback.print_exc()
+        self.fade_overlay.remove_range(start, end)
     
     def shift_animations(self, from_pos, offset):
         """Shift animation positions after text modifications"""
-        try:
-            # Create a new dictionary with updated positions
-            new_animations = {}
-            
-            for pos, animation in self.active_animations.items():
-                # Only process integer keys (position-based animations)
-                if isinstance(pos, int) and pos >= from_pos:
-                    # This animation is after the modification point
-                    new_pos = pos + offset
-                    if new_pos >= 0:  # Ensure we don't get negative positions
-                        if hasattr(animation, 'position'):
-                            animation.position = new_pos
-                        new_animations[new_pos] = animation
-                elif isinstance(pos, int):
-                    # This animation is before the modification point, no change needed
-                    new_animations[pos] = animation
-                else:
-                    # Non-integer keys (like timers) are preserved as-is
-                    new_animations[pos] = animation
-                    
-            # Update the animations dictionary
-            self.active_animations = new_animations
-        except Exception as e:
-            print(f"Error shifting animations: {str(e)}")
-            traceback.print_exc()
-    
-    def animation_completed(self, animation):
-        """Called when an animation completes"""
-        try:
-            # Find and remove the animation from our tracking dictionary
-            for pos, anim in list(self.active_animations.items()):
-                if anim == animation:
-                    del self.active_animations[pos]
-                    break
-        except Exception as e:
-            print(f"Error handling animation completion: {str(e)}")
-            traceback.print_exc()
+        self.fade_overlay.shift(from_pos, offset)
     
     def set_animations_enabled(self, enabled=True):
         """Enable or disable text animations"""
@@ -570,16 +539,7 @@ class SmoothTextEdit(QTextEdit):
     
     def clear_all_animations(self):
         """Clear all active animations"""
-        try:
-            for key, animation in list(self.active_animations.items()):
-                if hasattr(animation, 'stop'):
-                    animation.stop()
-                elif hasattr(animation, 'deleteLater'):
-                    animation.deleteLater()
-            self.active_animations.clear()
-        except Exception as e:
-            print(f"Error clearing animations: {str(e)}")
-            traceback.print_exc()
+        self.fade_overlay.clear()
     
     def clear(self):
         """Override clear to clean up animations"""
@@ -590,4 +550,4 @@ class SmoothTextEdit(QTextEdit):
         
     def set_typing_sound(self, enabled=True):
         """Enable or disable typing sound effects"""
-        self.typing_sound_enabled = enabled 
\ No newline at end of file
+        self.typing_sound_enabled = enabled
\ No newline at end of file
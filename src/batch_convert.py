@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+HyprText Batch Converter
+========================
+
+Headless entry point that applies HyprText's save rules (UTF-8, Unix line endings,
+see text_io) to many files at once. No window is created and no theme, mode or
+extension is loaded; files are processed in parallel by a process pool and streamed
+in chunks, so memory use stays flat regardless of file size.
+
+Usage:
+    ./run.sh --batch [--jobs N] [--check] [--ext .conf,.ini] PATH [PATH ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from text_io import normalize_file
+
+# Directories never worth descending into
+SKIPPED_DIRECTORIES = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', 'venv', '.venv'}
+
+def iter_input_files(paths, extensions=None):
+    """Yield every regular file under the given paths, optionally filtered by extension"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRECTORIES]
+            for filename in files:
+                if extensions and os.path.splitext(filename)[1].lower() not in extensions:
+                    continue
+                file_path = os.path.join(root, filename)
+                if os.path.isfile(file_path) and not os.path.islink(file_path):
+                    yield file_path
+
+def _convert_one(task):
+    """Normalize a single file in a worker process; never raises"""
+    file_path, dry_run = task
+    try:
+        return normalize_file(file_path, dry_run=dry_run)
+    except Exception as e:
+        return {"path": file_path, "bytes_in": 0, "bytes_out": 0, "encoding": None,
+                "changed": False, "skipped": None, "error": str(e)}
+
+def run_batch(paths, jobs=None, dry_run=False, extensions=None, verbose=False):
+    """Normalize all files under paths and return a summary dictionary"""
+    summary = {"files": 0, "changed": 0, "skipped": 0, "failed": 0, "bytes": 0, "seconds": 0.0}
+    tasks = ((file_path, dry_run) for file_path in iter_input_files(paths, extensions))
+
+    start = time.perf_counter()
+    if jobs == 1:
+        results = map(_convert_one, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        # Small files dominate config trees, so hand them out in chunks to cut IPC overhead
+        results = executor.map(_convert_one, tasks, chunksize=32)
+
+    try:
+        for result in results:
+            summary["files"] += 1
+            summary["bytes"] += result["bytes_in"]
+            if result.get("error"):
+                summary["failed"] += 1
+                print(f"error: {result['path']}: {result['error']}", file=sys.stderr)
+            elif result["skipped"]:
+                summary["skipped"] += 1
+                if verbose:
+                    print(f"skipped ({result['skipped']}): {result['path']}")
+            elif result["changed"]:
+                summary["changed"] += 1
+                action = "would convert" if dry_run else "converted"
+                print(f"{action} ({result['encoding']}): {result['path']}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def format_summary(summary):
+    """Format the throughput report printed at the end of a run"""
+    seconds = max(summary["seconds"], 1e-9)
+    megabytes = summary["bytes"] / (1024 * 1024)
+    return (f"Processed {summary['files']} files ({megabytes:.2f} MB) in {summary['seconds']:.2f}s: "
+            f"{summary['changed']} changed, {summary['skipped']} skipped, {summary['failed']} failed -- "
+            f"{summary['files'] / seconds:.1f} files/s, {megabytes / seconds:.2f} MB/s")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        prog="hyprtext --batch",
+        description="Normalize files to UTF-8 with Unix line endings, as HyprText saves them."
+    )
+    parser.add_argument("paths", nargs="+", help="files or directories to process")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: one per CPU, 1 disables the pool)")
+    parser.add_argument("--ext", default=None,
+                        help="comma separated extensions to include when walking directories, e.g. .conf,.ini")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="report changes without writing")
+    parser.add_argument("--check", action="store_true",
+                        help="like --dry-run, but exit with status 1 if any file would change")
+    parser.add_argument("-v", "--verbose", action="store_true", help="also list skipped files")
+    args = parser.parse_args(argv)
+
+    extensions = None
+    if args.ext:
+        extensions = {e.strip().lower() if e.strip().startswith('.') else f".{e.strip().lower()}"
+                      for e in args.ext.split(',') if e.strip()}
+
+    try:
+        summary = run_batch(args.paths, jobs=args.jobs, dry_run=args.dry_run or args.check,
+                            extensions=extensions, verbose=args.verbose)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"Fatal error: {str(e)}", file=sys.stderr)
+        traceback.print_exc()
+        return 1
+
+    print(format_summary(summary))
+    if summary["failed"]:
+        return 1
+    if args.check and summary["changed"]:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""
+Buffer Manager for HyprText
+===========================
+
+This module keeps every file open in a window as a buffer: its own QTextDocument,
+encoding, dirty state and a hash of the last saved content. Switching buffers just
+hands another document to the editor, so nothing is re-read from disk.
+
+Inactive buffers are accounted against a memory budget. When the budget is exceeded
+the least recently used ones are compressed with zlib, and large compressed buffers
+are paged out to a cache file. A stashed buffer is restored on its next activation;
+its undo history does not survive the round trip.
+
+When a window closes with unsaved buffers, each of them is written to a recovery
+file so the next session can offer to restore it.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+import traceback
+import zlib
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QTextDocument
+
+from file_manager import FileManager
+
+# Resident size of inactive buffers above which they get compressed (bytes)
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Compressed buffers larger than this are written to a cache file instead of kept in memory
+PAGE_OUT_THRESHOLD = 1024 * 1024
+
+# zlib level used for stashed buffers; speed matters more than ratio here
+COMPRESSION_LEVEL = 1
+
+# Recovery file older versions wrote to the working directory
+LEGACY_RECOVERY_FILE = "tmp.txt"
+
+def content_hash(text):
+    """Hash used to tell whether a buffer differs from what was last saved"""
+    return hashlib.sha1(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+def get_page_directory():
+    """Return the directory paged-out buffers are written to"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "hyprtext", "buffers")
+
+def get_recovery_directory():
+    """Return the directory unsaved buffers are written to when a window closes"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "hyprtext", "recovery")
+
+def write_recovery_file(buffer, text, tag):
+    """Store an unsaved buffer's text for the next session; tag keeps file names unique"""
+    recovery_dir = get_recovery_directory()
+    os.makedirs(recovery_dir, exist_ok=True)
+    path = os.path.join(recovery_dir, f"{tag}-{buffer.id}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', errors='surrogatepass') as f:
+        json.dump({"file_path": buffer.file_path, "encoding": buffer.encoding, "content": text}, f)
+    os.replace(tmp_path, path)
+    return path
+
+def migrate_legacy_recovery_file():
+    """Move the tmp.txt recovery file older versions wrote to the working directory
+
+    Its content becomes an untitled recovery entry, so the next check offers it like any
+    other unsaved buffer.
+    """
+    legacy_path = os.path.join(os.getcwd(), LEGACY_RECOVERY_FILE)
+    if not os.path.isfile(legacy_path):
+        return None
+    try:
+        text, encoding = FileManager.read_file_with_encoding(legacy_path)
+        recovery_dir = get_recovery_directory()
+        os.makedirs(recovery_dir, exist_ok=True)
+        path = os.path.join(recovery_dir, f"legacy-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', errors='surrogatepass') as f:
+            json.dump({"file_path": None, "encoding": encoding, "content": text}, f)
+        os.replace(tmp_path, path)
+        os.remove(legacy_path)
+        return path
+    except Exception as e:
+        print(f"Failed to migrate legacy recovery file {legacy_path}: {str(e)}")
+        traceback.print_exc()
+        return None
+
+def find_recovery_files():
+    """Return a list of (recovery file path, entry) for every recoverable buffer, oldest first"""
+    migrate_legacy_recovery_file()
+    recovery_dir = get_recovery_directory()
+    try:
+        paths = [os.path.join(recovery_dir, name) for name in os.listdir(recovery_dir) if name.endswith(".json")]
+    except OSError:
+        return []
+
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+    entries = []
+    for path in sorted(paths, key=mtime):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='surrogatepass') as f:
+                entry = json.load(f)
+            if isinstance(entry, dict) and isinstance(entry.get("content"), str):
+                entries.append((path, entry))
+        except Exception as e:
+            print(f"Skipping unreadable recovery file {path}: {str(e)}")
+    return entries
+
+class Buffer:
+    """One open file (or untitled document)"""
+
+    def __init__(self, buffer_id, file_path=None, encoding='utf-8'):
+        self.id = buffer_id
+        self.file_path = file_path
+        self.encoding = encoding
+        self.document = None  # None while the buffer is stashed
+        self.saved_hash = content_hash("")
+        self.cursor_position = 0
+        self.last_used = time.monotonic()
+        self._stash = None  # Compressed UTF-8 text while stashed in memory
+        self._page_path = None  # Cache file while paged out to disk
+        self._stashed_dirty = False
+
+    @property
+    def display_name(self):
+        return "Untitled" if self.file_path is None else os.path.basename(self.file_path)
+
+    def is_loaded(self):
+        """Check whether the buffer's document is resident"""
+        return self.document is not None
+
+    def is_paged_out(self):
+        return self._page_path is not None
+
+    def text(self):
+        """Return the buffer's text without restoring its document"""
+        if self.document is not None:
+            return self.document.toPlainText()
+        return self._read_stash()
+
+    def set_text(self, text):
+        """Replace the buffer's text (e.g. from a mode editor), keeping the dirty state honest"""
+        if self.document is None:
+            # A stashed buffer takes the new text as its stash; it is restored on activation
+            if self._read_stash() == text:
+                return
+            self._store_stash(text)
+            self._stashed_dirty = bool(text) if self.file_path is None else self.is_content_modified(text)
+            return
+        if self.document.toPlainText() == text:
+            return
+        self.document.setPlainText(text)
+        self.document.setModified(content_hash(text) != self.saved_hash)
+
+    def mark_saved(self, text=None):
+        """Record the current content as what's on disk"""
+        self.saved_hash = content_hash(self.text() if text is None else text)
+        if self.document is not None:
+            self.document.setModified(False)
+        self._stashed_dirty = False
+
+    def is_dirty(self):
+        """Check whether the buffer has unsaved changes"""
+        if self.document is None:
+            return self._stashed_dirty
+        if self.file_path is None:
+            return not self.document.isEmpty()
+        # Only hash when Qt says something changed; typing and undoing back is still clean
+        if not self.document.isModified():
+            return False
+        return content_hash(self.document.toPlainText()) != self.saved_hash
+
+    def is_content_modified(self, text):
+        """Check whether the given text differs from the last saved content"""
+        return content_hash(text) != self.saved_hash
+
+    def resident_size(self):
+        """Estimated memory held by the buffer's text, in bytes"""
+        if self.document is not None:
+            # QString stores UTF-16
+            return self.document.characterCount() * 2
+        if self._stash is not None:
+            return len(self._stash)
+        return 0
+
+    def _store_stash(self, text):
+        """Compress text into the stash, paging it to disk if it is still large"""
+        data = zlib.compress(text.encode('utf-8', errors='surrogatepass'), COMPRESSION_LEVEL)
+        old_page_path = self._page_path
+        if len(data) > PAGE_OUT_THRESHOLD:
+            page_dir = get_page_directory()
+            os.makedirs(page_dir, exist_ok=True)
+            fd, page_path = tempfile.mkstemp(prefix=f"{os.getpid()}-{self.id}-", suffix=".z", dir=page_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._page_path = page_path
+            self._stash = None
+        else:
+            self._page_path = None
+            self._stash = data
+        if old_page_path is not None:
+            try:
+                os.remove(old_page_path)
+            except OSError:
+                pass
+
+    def _read_stash(self):
+        """Decompress the stashed text"""
+        if self._page_path is not None:
+            with open(self._page_path, 'rb') as f:
+                data = f.read()
+        else:
+            data = self._stash or b''
+        return zlib.decompress(data).decode('utf-8', errors='surrogatepass') if data else ""
+
+class BufferManager(QObject):
+    """Holds the buffers open in a window, keyed by id"""
+
+    # Emitted whenever buffers are opened, closed, renamed or switched
+    buffers_changed = pyqtSignal()
+
+    def __init__(self, parent=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        super().__init__(parent)
+        self.memory_budget = memory_budget
+        self.buffers = {}  # Dictionary of buffer_id: Buffer, in opening order
+        self.active_id = None
+        self._ids = itertools.count(1)
+        self._paths = {}  # Dictionary of absolute path: buffer_id
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def __iter__(self):
+        return iter(list(self.buffers.values()))
+
+    @property
+    def active(self):
+        """The buffer shown in the editor"""
+        return self.buffers.get(self.active_id)
+
+    def _new_document(self, text=""):
+        document = QTextDocument(self)
+        document.setPlainText(text)
+        document.setModified(False)
+        return document
+
+    def new_buffer(self):
+        """Create an empty, untitled buffer"""
+        buffer = Buffer(next(self._ids))
+        buffer.document = self._new_document()
+        self.buffers[buffer.id] = buffer
+        self.buffers_changed.emit()
+        return buffer
+
+    def find(self, file_path):
+        """Return the buffer already holding a file, if any"""
+        buffer_id = self._paths.get(os.path.abspath(file_path))
+        return self.buffers.get(buffer_id) if buffer_id is not None else None
+
+    def open(self, file_path):
+        """Return the buffer for a file, reading it from disk only if it isn't open yet"""
+        buffer = self.find(file_path)
+        if buffer is not None:
+            return buffer
+
+        text, encoding = FileManager.read_file_with_encoding(file_path)
+        buffer = Buffer(next(self._ids), os.path.abspath(file_path), encoding)
+        buffer.document = self._new_document(text)
+        buffer.mark_saved()
+        self.buffers[buffer.id] = buffer
+        self._paths[buffer.file_path] = buffer.id
+        self.buffers_changed.emit()
+        return buffer
+
+    def set_file_path(self, buffer, file_path):
+        """Point a buffer at a new file (Save As on an untitled buffer)"""
+        if buffer.file_path is not None:
+            self._paths.pop(buffer.file_path, None)
+        buffer.file_path = os.path.abspath(file_path)
+        self._paths[buffer.file_path] = buffer.id
+        self.buffers_changed.emit()
+
+    def activate(self, buffer_id):
+        """Make a buffer active, restoring it if it was stashed, and return it"""
+        buffer = self.buffers[buffer_id]
+        if buffer.document is None:
+            self._restore(buffer)
+        buffer.last_used = time.monotonic()
+        self.active_id = buffer_id
+        self.enforce_budget()
+        self.buffers_changed.emit()
+        return buffer
+
+    def close(self, buffer_id):
+        """Forget a buffer and release its document or stash"""
+        buffer = self.buffers.pop(buffer_id, None)
+        if buffer is None:
+            return
+        if buffer.file_path is not None:
+            self._paths.pop(buffer.file_path, None)
+        self._drop_stash(buffer)
+        if buffer.document is not None:
+            buffer.document.deleteLater()
+            buffer.document = None
+        if self.active_id == buffer_id:
+            self.active_id = None
+        self.buffers_changed.emit()
+
+    def neighbour(self, buffer_id, step):
+        """Return the id of the buffer `step` places away from buffer_id, wrapping around"""
+        ids = list(self.buffers)
+        if not ids:
+            return None
+        index = ids.index(buffer_id) if buffer_id in ids else 0
+        return ids[(index + step) % len(ids)]
+
+    def memory_usage(self):
+        """Return (resident bytes of documents, bytes held compressed in memory, number paged out)"""
+        resident = stashed = paged = 0
+        for buffer in self.buffers.values():
+            if buffer.document is not None:
+                resident += buffer.resident_size()
+            elif buffer.is_paged_out():
+                paged += 1
+            else:
+                stashed += buffer.resident_size()
+        return resident, stashed, paged
+
+    def enforce_budget(self):
+        """Stash least recently used inactive buffers until the rest fit the budget"""
+        inactive = [b for b in self.buffers.values() if b.id != self.active_id and b.document is not None]
+        total = sum(b.resident_size() for b in inactive)
+        for buffer in sorted(inactive, key=lambda b: b.last_used):
+            if total <= self.memory_budget:
+                break
+            total -= buffer.resident_size()
+            self._stash_buffer(buffer)
+
+    def _stash_buffer(self, buffer):
+        """Compress an inactive buffer, paging it to disk if it is still large"""
+        try:
+            buffer._stashed_dirty = buffer.is_dirty()
+            buffer._store_stash(buffer.document.toPlainText())
+            buffer.document.deleteLater()
+            buffer.document = None
+        except Exception as e:
+            # Keep the buffer resident rather than risk losing it
+            print(f"Failed to stash buffer {buffer.display_name}: {str(e)}")
+            traceback.print_exc()
+            self._drop_stash(buffer)
+
+    def _restore(self, buffer):
+        """Rebuild a stashed buffer's document"""
+        text = buffer._read_stash()
+        buffer.document = self._new_document(text)
+        buffer.document.setModified(buffer._stashed_dirty)
+        self._drop_stash(buffer)
+
+    def _drop_stash(self, buffer):
+        """Release a buffer's compressed copy and cache file"""
+        buffer._stash = None
+        if buffer._page_path is not None:
+            try:
+                os.remove(buffer._page_path)
+            except OSError:
+                pass
+            buffer._page_path = None
+
+    def shutdown(self):
+        """Remove any cache files left by paged-out buffers"""
+        for buffer in self.buffers.values():
+            if buffer.is_paged_out():
+                self._drop_stash(buffer)
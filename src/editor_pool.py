@@ -0,0 +1,160 @@
+"""
+Mode Editor Pool for HyprText
+=============================
+
+This module manages the editor widgets created for custom modes.
+Editors are built lazily on first use, can be pre-warmed during idle time so the
+first switch is instant, and are evicted once they haven't been used for a while
+so they release their document copy, timers and graphics effects.
+"""
+
+import time
+import traceback
+from PyQt6.QtCore import QTimer
+
+from theme_manager import ThemeManager
+from mode_manager import mode_manager
+
+# Editors for modes that haven't been used for this long are evicted (ms)
+DEFAULT_IDLE_TIMEOUT = 5 * 60 * 1000
+
+# Maximum number of mode editors kept alive at the same time
+DEFAULT_MAX_EDITORS = 3
+
+class ModeEditorPool:
+    """Pool of mode editors keyed by mode name
+
+    The pool can be read like a dictionary (`name in pool`, `pool[name]`, `pool.values()`),
+    so mods that look up `app.mode_editors[app.current_mode]` keep working.
+    """
+
+    def __init__(self, parent, layout, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_editors=DEFAULT_MAX_EDITORS):
+        self.parent = parent
+        self.layout = layout
+        self.idle_timeout = idle_timeout
+        self.max_editors = max_editors
+        self.active_mode = None  # The active mode's editor is never evicted
+        self._editors = {}  # Dictionary of mode_name: editor widget
+        self._last_used = {}  # Dictionary of mode_name: monotonic time it was last active (or built)
+
+        # Periodically drop editors that have been idle for too long
+        self._eviction_timer = QTimer(parent)
+        self._eviction_timer.setInterval(max(1000, idle_timeout // 2))
+        self._eviction_timer.timeout.connect(self.evict_idle)
+        self._eviction_timer.start()
+
+    def __contains__(self, mode_name):
+        return mode_name in self._editors
+
+    def __getitem__(self, mode_name):
+        return self._editors[mode_name]
+
+    def __iter__(self):
+        return iter(list(self._editors))
+
+    def __len__(self):
+        return len(self._editors)
+
+    def get(self, mode_name, default=None):
+        """Return the editor for a mode if it has been built"""
+        return self._editors.get(mode_name, default)
+
+    def keys(self):
+        return list(self._editors.keys())
+
+    def values(self):
+        return list(self._editors.values())
+
+    def items(self):
+        return list(self._editors.items())
+
+    def acquire(self, mode_name):
+        """Return the editor for a mode, building it on first use, and mark it active"""
+        editor = self._editors.get(mode_name)
+        if editor is None:
+            editor = self._create_editor(mode_name)
+        self.set_active(mode_name)
+        self._enforce_limit()
+        return editor
+
+    def set_active(self, mode_name):
+        """Record which mode is active (None for Standard Mode)"""
+        now = time.monotonic()
+        # The outgoing mode was in use until now; its idle time starts here, not when it was activated
+        if self.active_mode in self._editors:
+            self._last_used[self.active_mode] = now
+        self.active_mode = mode_name
+        if mode_name in self._editors:
+            self._last_used[mode_name] = now
+
+    def prewarm(self, mode_name, delay=0):
+        """Build a mode's editor in the background once the event loop is idle"""
+        QTimer.singleShot(delay, lambda: self._prewarm_now(mode_name))
+
+    def _prewarm_now(self, mode_name):
+        """Build a hidden editor for a mode unless it already exists"""
+        try:
+            if mode_name in self._editors or mode_name not in mode_manager.modes:
+                return
+            self._create_editor(mode_name)
+            self._last_used[mode_name] = time.monotonic()
+            self._enforce_limit()
+            print(f"Pre-warmed editor for mode: {mode_name}")
+        except Exception as e:
+            print(f"Error pre-warming editor for {mode_name}: {str(e)}")
+            traceback.print_exc()
+
+    def _create_editor(self, mode_name):
+        """Create a hidden editor for a mode and add it to the content layout"""
+        editor = mode_manager.create_editor_for_mode(mode_name, self.parent)
+        editor.setVisible(False)
+        self.layout.addWidget(editor)
+        ThemeManager.apply_shadow_effect(editor)
+        self._editors[mode_name] = editor
+        self._last_used[mode_name] = time.monotonic()
+        return editor
+
+    def evict(self, mode_name):
+        """Destroy the editor for a mode, releasing its document and timers"""
+        if mode_name == self.active_mode:
+            return False
+        editor = self._editors.pop(mode_name, None)
+        self._last_used.pop(mode_name, None)
+        if editor is None:
+            return False
+
+        try:
+            # Stop timers right away rather than waiting for deleteLater
+            for timer in editor.findChildren(QTimer):
+                timer.stop()
+            self.layout.removeWidget(editor)
+            editor.setGraphicsEffect(None)
+            editor.deleteLater()
+            print(f"Evicted editor for mode: {mode_name}")
+            return True
+        except Exception as e:
+            print(f"Error evicting editor for {mode_name}: {str(e)}")
+            traceback.print_exc()
+            return False
+
+    def evict_idle(self):
+        """Evict editors that haven't been used within the idle timeout"""
+        now = time.monotonic()
+        for mode_name, last_used in list(self._last_used.items()):
+            if mode_name != self.active_mode and (now - last_used) * 1000 >= self.idle_timeout:
+                self.evict(mode_name)
+
+    def evict_missing(self, available_modes):
+        """Evict editors for modes that are no longer available"""
+        for mode_name in list(self._editors):
+            if mode_name not in available_modes:
+                self.evict(mode_name)
+
+    def _enforce_limit(self):
+        """Evict the least recently used editors beyond max_editors"""
+        candidates = sorted(
+            (name for name in self._editors if name != self.active_mode),
+            key=lambda name: self._last_used.get(name, 0)
+        )
+        while len(self._editors) > self.max_editors and candidates:
+            self.evict(candidates.pop(0))
@@ -0,0 +1,155 @@
+"""
+HyprText Extension Host
+=======================
+
+Runs extension hooks in a separate process, so a slow or crashing extension can't
+stall or take down the editor. The editor starts this module as a child process
+(see extension_host_client) and talks to it over its stdin/stdout pipes.
+
+Every message is a JSON object preceded by its length as a 4-byte big-endian
+integer. The editor sends:
+
+    {"op": "load", "name": ..., "path": ...}                  import an extension
+    {"op": "unload", "name": ...}                             forget an extension
+    {"op": "call", "id": n, "extension": ..., "hook": ...,    run one hook
+     "snapshot": {...}, "content_unchanged": false}
+
+and the host answers each call with {"id": n, "result": ..., "elapsed": seconds}
+or {"id": n, "error": "..."}. When "content_unchanged" is true the snapshot's text
+is the same as in the previous call and is not sent; the host reuses the text it
+already has. Otherwise "content" is the text itself, which may be null.
+
+Hooks run here receive a HookSnapshot, the same as background hooks, and must
+return something JSON can encode. This module does not import PyQt6.
+"""
+
+import asyncio
+import importlib.util
+import inspect
+import json
+import os
+import struct
+import sys
+import time
+import traceback
+from collections import namedtuple
+
+PROTOCOL_VERSION = 1
+
+# Refuse messages larger than this, which can only mean a corrupt stream (bytes)
+MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+HEADER = struct.Struct('>I')
+
+# What background and out-of-process hooks receive instead of the application window:
+#   hook       - hook name
+#   file_path  - the current file (None for untitled buffers)
+#   content    - the document text at the time the hook fired
+#   mode       - current mode name (None for Standard Mode)
+#   theme      - current theme name
+#   args       - the hook's remaining arguments, e.g. (file_path, content) for pre_save_file
+HookSnapshot = namedtuple('HookSnapshot', ['hook', 'file_path', 'content', 'mode', 'theme', 'args'])
+
+def encode_message(message):
+    """Return a message framed for the pipe"""
+    payload = json.dumps(message, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return HEADER.pack(len(payload)) + payload
+
+def decode_messages(buffer):
+    """Split complete messages off the front of a bytearray, leaving any partial one"""
+    messages = []
+    while len(buffer) >= HEADER.size:
+        (length,) = HEADER.unpack_from(buffer)
+        if length > MAX_MESSAGE_SIZE:
+            raise ValueError(f"Message of {length} bytes exceeds the limit")
+        end = HEADER.size + length
+        if len(buffer) < end:
+            break
+        messages.append(json.loads(bytes(buffer[HEADER.size:end]).decode('utf-8')))
+        del buffer[:end]
+    return messages
+
+def read_message(stream):
+    """Read one message from a binary stream; None at end of stream"""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message of {length} bytes exceeds the limit")
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+class ExtensionHost:
+    """The host side: loads extension modules and runs their hooks"""
+
+    def __init__(self, output):
+        self.output = output
+        self.modules = {}  # Dictionary of extension name: module
+        self.last_content = None
+
+    def send(self, message):
+        self.output.write(encode_message(message))
+        self.output.flush()
+
+    def load(self, name, path):
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        self.modules[name] = module
+
+    def call(self, message):
+        call_id = message["id"]
+        started = time.perf_counter()
+        try:
+            # Track the text first: the editor counts it as sent even if this call fails
+            fields = message["snapshot"]
+            if message.get("content_unchanged"):
+                fields["content"] = self.last_content
+            else:
+                self.last_content = fields["content"]
+
+            module = self.modules[message["extension"]]
+            hook = getattr(module, message["hook"])
+            fields["args"] = tuple(fields["args"])
+            snapshot = HookSnapshot(**fields)
+
+            if inspect.iscoroutinefunction(hook):
+                result = asyncio.run(hook(snapshot))
+            else:
+                result = hook(snapshot)
+            self.send({"id": call_id, "result": result, "elapsed": time.perf_counter() - started})
+        except Exception as e:
+            traceback.print_exc()
+            self.send({"id": call_id, "error": f"{type(e).__name__}: {str(e)}"})
+
+    def serve(self, stream):
+        """Handle messages until the editor closes the pipe"""
+        while True:
+            message = read_message(stream)
+            if message is None:
+                return
+            op = message.get("op")
+            if op == "call":
+                self.call(message)
+            elif op == "load":
+                try:
+                    self.load(message["name"], message["path"])
+                except Exception as e:
+                    print(f"Extension host failed to load {message['name']}: {str(e)}", file=sys.stderr)
+                    traceback.print_exc()
+            elif op == "unload":
+                self.modules.pop(message["name"], None)
+
+def main():
+    # Claim stdout for the protocol; anything extensions print goes to stderr instead
+    output = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    ExtensionHost(output).serve(sys.stdin.buffer)
+
+if __name__ == '__main__':
+    main()
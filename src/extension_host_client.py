@@ -0,0 +1,198 @@
+"""
+HyprText Extension Host Client
+==============================
+
+Starts the extension host process (see extension_host for the protocol), sends it
+hook calls and turns its answers back into results on the GUI thread. If the host
+crashes, or a call hangs for longer than HOST_CALL_TIMEOUT, the host is restarted
+and its extensions are loaded again; the calls in flight at the time are dropped.
+"""
+
+import os
+import sys
+import time
+import traceback
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+from extension_host import encode_message, decode_messages
+
+# A call still unanswered after this long means the host is stuck (seconds)
+HOST_CALL_TIMEOUT = 10.0
+
+# Delay before restarting a host that exited, doubled after every crash in a row (ms)
+RESTART_DELAY = 500
+MAX_RESTART_DELAY = 30000
+
+# Stands for "no text sent yet", since None is a valid snapshot content
+_NO_CONTENT = object()
+
+class ExtensionHostClient(QObject):
+    """Runs hooks in the extension host process"""
+
+    # (extension_name, hook_name, result, elapsed_seconds, context)
+    result_ready = pyqtSignal(str, str, object, float, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = None
+        self.extensions = {}  # Dictionary of extension name: module path, reloaded after a restart
+        self._buffer = bytearray()
+        self._next_id = 1
+        self._in_flight = {}  # Dictionary of call id: (extension_name, hook_name, context, sent_at)
+        self._busy = set()  # (extension_name, hook_name) pairs with a call in flight
+        self._queued = {}  # Dictionary of (extension_name, hook_name): (snapshot, context) waiting for the host
+        self._last_content = _NO_CONTENT
+        self._restart_delay = RESTART_DELAY
+        self._stopping = False
+
+        self._watchdog = QTimer(self)
+        self._watchdog.setInterval(1000)
+        self._watchdog.timeout.connect(self._checkTimeouts)
+
+    def start(self):
+        """Launch the host process if it isn't running"""
+        if self.process is not None:
+            return
+        self._stopping = False
+        self._buffer.clear()
+        self._last_content = _NO_CONTENT
+
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extension_host.py")
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.ForwardedErrorChannel)
+        self.process.readyReadStandardOutput.connect(self._onReadyRead)
+        self.process.finished.connect(self._onFinished)
+        self.process.start(sys.executable, [script])
+
+        for name, path in self.extensions.items():
+            self._send({"op": "load", "name": name, "path": path})
+        self._watchdog.start()
+
+    def stop(self):
+        """Close the host's input and let it exit"""
+        self._stopping = True
+        self._watchdog.stop()
+        if self.process is not None:
+            process, self.process = self.process, None
+            process.closeWriteChannel()
+            if not process.waitForFinished(1000):
+                process.kill()
+        self._dropCalls()
+
+    def load_extension(self, name, path):
+        """Make an extension's hooks callable in the host"""
+        self.extensions[name] = path
+        if self.process is not None:
+            self._send({"op": "load", "name": name, "path": path})
+
+    def unload_extension(self, name):
+        self.extensions.pop(name, None)
+        # Calls waiting for a busy hook must not reach an extension that was turned off
+        for key in [key for key in self._queued if key[0] == name]:
+            del self._queued[key]
+        if self.process is not None:
+            self._send({"op": "unload", "name": name})
+
+    def call(self, extension_name, hook_name, snapshot, context=None):
+        """Run a hook in the host; the answer arrives through result_ready
+
+        While a call for the same hook is in flight only the newest further call is kept.
+        """
+        self.start()
+        key = (extension_name, hook_name)
+        if key in self._busy:
+            self._queued[key] = (snapshot, context)
+            return
+        self._sendCall(extension_name, hook_name, snapshot, context)
+
+    def _sendCall(self, extension_name, hook_name, snapshot, context):
+        fields = snapshot._asdict()
+        # Consecutive hooks usually see the same text; don't pipe it again
+        content_unchanged = self._last_content is not _NO_CONTENT and fields["content"] == self._last_content
+        if content_unchanged:
+            fields["content"] = None
+        else:
+            self._last_content = fields["content"]
+
+        call_id = self._next_id
+        self._next_id += 1
+        self._in_flight[call_id] = (extension_name, hook_name, context, time.monotonic())
+        self._busy.add((extension_name, hook_name))
+        self._send({"op": "call", "id": call_id, "extension": extension_name, "hook": hook_name,
+                    "snapshot": fields, "content_unchanged": content_unchanged})
+
+    def _send(self, message):
+        try:
+            self.process.write(encode_message(message))
+        except Exception as e:
+            print(f"Failed to send to the extension host: {str(e)}")
+            traceback.print_exc()
+
+    def _onReadyRead(self):
+        if self.process is None:
+            return
+        self._buffer.extend(bytes(self.process.readAllStandardOutput()))
+        try:
+            messages = decode_messages(self._buffer)
+        except ValueError as e:
+            print(f"Corrupt message from the extension host, restarting it: {str(e)}")
+            self._restart()
+            return
+
+        for message in messages:
+            entry = self._in_flight.pop(message.get("id"), None)
+            if entry is None:
+                continue
+            extension_name, hook_name, context, _ = entry
+            key = (extension_name, hook_name)
+            self._busy.discard(key)
+            self._restart_delay = RESTART_DELAY
+
+            if "error" in message:
+                print(f"Error in out-of-process {hook_name} hook of {extension_name}: {message['error']}")
+            else:
+                self.result_ready.emit(extension_name, hook_name, message.get("result"),
+                                       float(message.get("elapsed", 0.0)), context)
+
+            queued = self._queued.pop(key, None)
+            if queued is not None and self.process is not None:
+                self._sendCall(extension_name, hook_name, *queued)
+
+    def _onFinished(self, exit_code, exit_status):
+        if self._stopping or self.sender() is not self.process:
+            return
+        print(f"Extension host exited (code {exit_code}), restarting in {self._restart_delay} ms")
+        self.process.deleteLater()
+        self.process = None
+        self._dropCalls()
+        QTimer.singleShot(self._restart_delay, self._restartIfNeeded)
+        self._restart_delay = min(self._restart_delay * 2, MAX_RESTART_DELAY)
+
+    def _restartIfNeeded(self):
+        if not self._stopping and self.process is None and self.extensions:
+            self.start()
+
+    def _restart(self):
+        process, self.process = self.process, None
+        if process is not None:
+            process.finished.disconnect(self._onFinished)
+            process.kill()
+            process.deleteLater()
+        self._dropCalls()
+        QTimer.singleShot(self._restart_delay, self._restartIfNeeded)
+        self._restart_delay = min(self._restart_delay * 2, MAX_RESTART_DELAY)
+
+    def _dropCalls(self):
+        for extension_name, hook_name, _, _ in self._in_flight.values():
+            print(f"Dropped out-of-process {hook_name} call of {extension_name}")
+        self._in_flight.clear()
+        self._busy.clear()
+        self._queued.clear()
+
+    def _checkTimeouts(self):
+        now = time.monotonic()
+        for extension_name, hook_name, _, sent_at in self._in_flight.values():
+            if now - sent_at > HOST_CALL_TIMEOUT:
+                print(f"Out-of-process {hook_name} hook of {extension_name} is stuck, restarting the extension host")
+                self._restart()
+                return
@@ -4,13 +4,29 @@ Extension Manager for HyprText
 
 This module manages extensions that can modify the behavior of HyprText without editing core files.
 Extensions can be toggled on and off independently of each other.
+
+Hooks listed in an extension's BACKGROUND_HOOKS run on a worker thread instead of the
+GUI thread. They receive an immutable HookSnapshot rather than the application, and
+whatever they return is handed back on the GUI thread to `<hook>_result(app, result)`.
+Hooks listed in OUT_OF_PROCESS_HOOKS work the same way but run in the extension host
+process (see extension_host), so they can't stall or crash the editor.
 """
 
 import os
 import sys
+import asyncio
 import importlib.util
+import inspect
+import bisect
+import time
 import traceback
-from PyQt6.QtCore import QSettings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from startup_profiler import startup_profiler
+from extension_host import HookSnapshot
+from settings_service import settings_service
 
 # Standard extension hooks that can be implemented
 EXTENSION_HOOKS = [
@@ -23,9 +39,87 @@ EXTENSION_HOOKS = [
     'post_theme_change',   # Called after the theme is changed
     'post_mode_change',    # Called after the mode is changed
     'process_keystroke',   # Hook to process keystrokes
-    'extend_menus'         # Hook to add items to menus
+    'extend_menus',        # Hook to add items to menus
+    'on_text_changed'      # Called with a batch of edits once typing pauses
 ]
 
+# Wall-time budget per hook call (ms). Override with the setting
+# "extension_hook_budgets/<hook_name>"
+DEFAULT_HOOK_BUDGET_MS = 50.0
+HOOK_BUDGETS_MS = {
+    'initialize': 250.0,
+    'cleanup': 250.0,
+    'modify_layout': 100.0,
+    'process_keystroke': 4.0,
+    'post_mode_change': 16.0,
+    'on_text_changed': 16.0,
+}
+
+# Quiet time after the last edit before on_text_changed fires (ms). Override with
+# the setting "text_change_debounce_ms"
+DEFAULT_TEXT_CHANGE_DEBOUNCE_MS = 250
+
+# Number of recent calls per extension kept for the rolling histogram
+HOOK_HISTORY_SIZE = 200
+
+# Histogram bucket upper bounds (ms); the last bucket catches everything slower
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 250, 500, 1000]
+
+# An extension is flagged slow once this many of its recent calls went over budget
+SLOW_OVERRUNS = 3
+
+# With auto-disable enabled, an extension is turned off after this many recent overruns
+AUTO_DISABLE_OVERRUNS = 5
+
+# Hooks that may be declared in BACKGROUND_HOOKS; the others touch widgets and must stay on the GUI thread
+BACKGROUND_CAPABLE_HOOKS = {'post_load_file', 'pre_save_file', 'post_theme_change', 'post_mode_change', 'pre_close',
+                            'on_text_changed'}
+
+# Worker threads shared by all background hooks
+BACKGROUND_WORKERS = 2
+
+class _HookResultBridge(QObject):
+    """Carries background hook results back to the GUI thread"""
+    
+    # (extension_name, hook_name, result, elapsed_seconds, app)
+    result_ready = pyqtSignal(str, str, object, float, object)
+
+class HookStats:
+    """Rolling wall-time statistics of one extension's hook calls"""
+    
+    def __init__(self, size=HOOK_HISTORY_SIZE):
+        self.samples = deque(maxlen=size)  # (hook_name, elapsed_ms, over_budget)
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.overruns = 0  # Over-budget calls among the samples
+        self.slow_hooks = {}  # Dictionary of hook_name: worst elapsed ms while over budget
+    
+    def record(self, hook_name, elapsed_ms, over_budget):
+        """Add a sample, dropping the oldest one from the histogram once full"""
+        if len(self.samples) == self.samples.maxlen:
+            _, old_ms, old_over = self.samples[0]
+            self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, old_ms)] -= 1
+            self.overruns -= old_over
+        self.samples.append((hook_name, elapsed_ms, over_budget))
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, elapsed_ms)] += 1
+        self.overruns += over_budget
+        if over_budget:
+            self.slow_hooks[hook_name] = max(elapsed_ms, self.slow_hooks.get(hook_name, 0.0))
+    
+    def is_slow(self):
+        return self.overruns >= SLOW_OVERRUNS
+    
+    def percentile(self, fraction):
+        """Return the given percentile (0-1) of recent call times in ms"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(sample[1] for sample in self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    
+    def histogram(self):
+        """Return [(bucket label, count)] over the recent calls"""
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return list(zip(labels, self.buckets))
+
 class ExtensionManager:
     """Manages HyprText extensions that modify application behavior"""
     
@@ -33,6 +127,20 @@ class ExtensionManager:
     _available_extensions = {}  # Dictionary of available extensions
     _active_extensions = {}  # Dictionary of currently active extensions
     _extension_states = {}  # Track individual extension states
+    _reload_pending = {}  # Dictionary of module path: name of an active extension whose file failed to reload
+    _hook_subscribers = {}  # Dictionary of hook_name: tuple of (extension_name, callable), active only
+    _hook_timings = {}  # Dictionary of hook_name: {extension_name: [calls, total_seconds, max_seconds]}
+    _hook_stats = {}  # Dictionary of extension_name: HookStats
+    _hook_budgets = {}  # Dictionary of hook_name: budget in ms
+    _background_subscribers = {}  # Dictionary of hook_name: tuple of (extension_name, callable)
+    _background_executor = None  # ThreadPoolExecutor, created on first use
+    _background_bridge = None  # _HookResultBridge, created on first use
+    _pending_background = {}  # Dictionary of (extension_name, hook_name): last queued Future; GUI thread only
+    _host_subscribers = {}  # Dictionary of hook_name: tuple of extension names served by the extension host
+    _extension_host = None  # ExtensionHostClient, started on first use
+    use_extension_host = True
+    _slow_hook_listeners = []  # Callables notified as (extension_name, hook_name, elapsed_ms, budget_ms, disabled)
+    auto_disable_slow = False  # Turn off extensions that keep exceeding their budgets
     
     @classmethod
     def get_instance(cls):
@@ -47,6 +155,7 @@ class ExtensionManager:
             raise RuntimeError("ExtensionManager is a singleton. Use get_instance() instead.")
         
         ExtensionManager._instance = self
+        self._load_hook_budgets()
         self._discover_extensions()
         self._load_active_extensions()
     
@@ -71,42 +180,101 @@ class ExtensionManager:
             # Find all Python files in the directory
             for filename in os.listdir(extensions_dir):
                 if filename.endswith(".py") and filename != "__init__.py":
-                    extension_name = filename[:-3]  # Remove .py extension
-                    module_path = os.path.join(extensions_dir, filename)
-                    
-                    try:
-                        # Load the module
-                        spec = importlib.util.spec_from_file_location(extension_name, module_path)
-                        module = importlib.util.module_from_spec(spec)
-                        sys.modules[extension_name] = module
-                        spec.loader.exec_module(module)
-                        
-                        # Check for required attributes
-                        if hasattr(module, 'EXTENSION_NAME') and hasattr(module, 'EXTENSION_DESCRIPTION'):
-                            extension_name = module.EXTENSION_NAME
-                            self._available_extensions[extension_name] = {
-                                "module_path": module_path,
-                                "name": extension_name,
-                                "description": module.EXTENSION_DESCRIPTION,
-                                "author": getattr(module, 'EXTENSION_AUTHOR', "Unknown"),
-                                "version": getattr(module, 'EXTENSION_VERSION', "1.0"),
-                                "module": module,
-                                "hooks": self._get_extension_hooks(module)
-                            }
-                            # Initialize state tracking for this extension
-                            self._extension_states[extension_name] = {
-                                "active": False,
-                                "has_modified_layout": False
-                            }
-                            print(f"Loaded extension: {extension_name}")
-                        else:
-                            print(f"Skipping {filename}: Missing required attributes")
-                    except Exception as e:
-                        print(f"Error loading extension {filename}: {str(e)}")
-                        traceback.print_exc()
+                    self._load_extension_file(os.path.join(extensions_dir, filename))
         except Exception as e:
             print(f"Error discovering extensions: {str(e)}")
             traceback.print_exc()
+        self._rebuild_dispatch_table()
+    
+    def _load_extension_file(self, module_path):
+        """Import one extension file and register it; returns the extension name or None"""
+        filename = os.path.basename(module_path)
+        extension_name = filename[:-3]  # Remove .py extension
+        try:
+            # Load the module
+            started = time.perf_counter()
+            spec = importlib.util.spec_from_file_location(extension_name, module_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[extension_name] = module
+            spec.loader.exec_module(module)
+            startup_profiler.record_plugin("extension", extension_name, started)
+            
+            # Check for required attributes
+            if hasattr(module, 'EXTENSION_NAME') and hasattr(module, 'EXTENSION_DESCRIPTION'):
+                extension_name = module.EXTENSION_NAME
+                self._available_extensions[extension_name] = {
+                    "module_path": module_path,
+                    "name": extension_name,
+                    "description": module.EXTENSION_DESCRIPTION,
+                    "author": getattr(module, 'EXTENSION_AUTHOR', "Unknown"),
+                    "version": getattr(module, 'EXTENSION_VERSION', "1.0"),
+                    "module": module,
+                    "hooks": self._get_extension_hooks(module),
+                    "background_hooks": self._get_background_hooks(module, extension_name, 'BACKGROUND_HOOKS'),
+                    "out_of_process_hooks": self._get_background_hooks(module, extension_name, 'OUT_OF_PROCESS_HOOKS')
+                }
+                # Initialize state tracking for this extension
+                self._extension_states.setdefault(extension_name, {
+                    "active": False,
+                    "has_modified_layout": False
+                })
+                print(f"Loaded extension: {extension_name}")
+                return extension_name
+            print(f"Skipping {filename}: Missing required attributes")
+        except Exception as e:
+            print(f"Error loading extension {filename}: {str(e)}")
+            traceback.print_exc()
+        return None
+    
+    def reload_extension_file(self, module_path, app_instance=None):
+        """Re-import a single extension file that was added, changed or removed
+        
+        An active extension is cleaned up with its old code and initialized again with
+        the new code; applying its layout is left to the caller. Returns
+        (old_name, new_name, active); old_name is None for a new file and new_name is
+        None if the file is gone or broken.
+        
+        An active extension whose file is briefly broken or missing (e.g. halfway
+        through a save) stays active in the settings and is turned back on once the
+        file loads again.
+        """
+        old_name = None
+        was_active = False
+        pending_name = self._reload_pending.pop(module_path, None)
+        for extension_name, extension in list(self._available_extensions.items()):
+            if extension["module_path"] == module_path:
+                old_name = extension_name
+                if self.is_extension_active(extension_name):
+                    was_active = True
+                    self._call_hook(extension_name, 'cleanup', app_instance)
+                    self._active_extensions.pop(extension_name)
+                del self._available_extensions[extension_name]
+                self._extension_states.pop(extension_name, None)
+        
+        previous_name = old_name
+        if pending_name is not None:
+            was_active = True
+            previous_name = previous_name or pending_name
+        
+        new_name = self._load_extension_file(module_path) if os.path.exists(module_path) else None
+        active = was_active and new_name is not None
+        if was_active and new_name is None:
+            self._reload_pending[module_path] = previous_name
+        if active:
+            self._active_extensions[new_name] = self._available_extensions[new_name]
+            self._extension_states[new_name]["active"] = True
+            self._hook_stats.pop(new_name, None)
+        
+        # The host has the old code loaded; have it import the file again
+        if self._extension_host is not None and old_name in self._extension_host.extensions:
+            self._extension_host.unload_extension(old_name)
+        self._rebuild_dispatch_table()
+        
+        if active:
+            self._call_hook(new_name, 'initialize', app_instance)
+        if active and new_name != previous_name:
+            self._save_active_extensions()
+        return old_name, new_name, active
     
     def _get_extension_hooks(self, module):
         """Get available hooks from an extension module"""
@@ -116,10 +284,18 @@ class ExtensionManager:
                 hooks[hook_name] = getattr(module, hook_name)
         return hooks
     
+    def _get_background_hooks(self, module, extension_name, attribute):
+        """Return the hook names an extension lists in BACKGROUND_HOOKS or OUT_OF_PROCESS_HOOKS"""
+        declared = set(getattr(module, attribute, ()))
+        unsupported = declared - BACKGROUND_CAPABLE_HOOKS
+        if unsupported:
+            print(f"Extension {extension_name}: hooks {sorted(unsupported)} in {attribute} need the "
+                  f"application window, calling them on the GUI thread")
+        return declared & BACKGROUND_CAPABLE_HOOKS
+    
     def _load_active_extensions(self):
         """Load previously active extensions from settings"""
-        settings = QSettings("HyprText", "HyprText")
-        active_extensions = settings.value('active_extensions', [])
+        active_extensions = settings_service.value('active_extensions', [], type=list)
         
         if active_extensions:
             for ext_name in active_extensions:
@@ -128,13 +304,35 @@ class ExtensionManager:
                     # Update state tracking
                     if ext_name in self._extension_states:
                         self._extension_states[ext_name]["active"] = True
+                    self._rebuild_dispatch_table()
                     self._call_hook(ext_name, 'initialize')
                     print(f"Activated extension: {ext_name}")
     
+    def _load_hook_budgets(self):
+        """Read hook budgets and the auto-disable option from settings"""
+        settings = settings_service
+        for hook_name in EXTENSION_HOOKS:
+            default = HOOK_BUDGETS_MS.get(hook_name, DEFAULT_HOOK_BUDGET_MS)
+            self._hook_budgets[hook_name] = settings.value(f'extension_hook_budgets/{hook_name}', default, type=float)
+        ExtensionManager.auto_disable_slow = settings.value('auto_disable_slow_extensions', False, type=bool)
+        # Without the host, out-of-process hooks fall back to the background threads
+        ExtensionManager.use_extension_host = settings.value('use_extension_host', True, type=bool)
+    
+    def set_auto_disable_slow(self, enabled):
+        """Enable or disable turning off extensions that keep exceeding their budgets"""
+        ExtensionManager.auto_disable_slow = enabled
+        settings_service.setValue('auto_disable_slow_extensions', enabled)
+    
+    def get_hook_budget(self, hook_name):
+        """Return the wall-time budget of a hook in ms"""
+        return self._hook_budgets.get(hook_name, DEFAULT_HOOK_BUDGET_MS)
+    
     def _save_active_extensions(self):
         """Save active extensions to settings"""
-        settings = QSettings("HyprText", "HyprText")
-        settings.setValue('active_extensions', list(self._active_extensions.keys()))
+        active_extensions = list(self._active_extensions.keys())
+        # Extensions waiting for their file to load again are still meant to be on
+        active_extensions += [name for name in self._reload_pending.values() if name not in active_extensions]
+        settings_service.setValue('active_extensions', active_extensions)
     
     def get_available_extensions(self):
         """Return a list of available extension names"""
@@ -161,6 +359,8 @@ class ExtensionManager:
             print(f"Cleaning up extension: {extension_name}")
             self._call_hook(extension_name, 'cleanup', app_instance)
             self._active_extensions.pop(extension_name)
+            self._rebuild_dispatch_table()
+            self._drop_queued_hooks(extension_name)
             
             # Update state tracking
             if extension_name in self._extension_states:
@@ -171,8 +371,10 @@ class ExtensionManager:
             print(f"Deactivated extension: {extension_name}")
             return False
         else:
-            # Activate the extension
+            # Activate the extension, with a clean slate for the slow-hook watchdog
             self._active_extensions[extension_name] = self._available_extensions[extension_name]
+            self._rebuild_dispatch_table()
+            self._hook_stats.pop(extension_name, None)
             
             # Update state tracking
             if extension_name in self._extension_states:
@@ -183,33 +385,295 @@ class ExtensionManager:
             print(f"Activated extension: {extension_name}")
             return True
     
+    def _rebuild_dispatch_table(self):
+        """Precompute, per hook, the callables of the active extensions that implement it
+        
+        Called whenever the set of active extensions changes, so dispatching a hook
+        is a single lookup and a hook nobody implements costs nothing.
+        """
+        subscribers = {}
+        background = {}
+        hosted = {}
+        for ext_name, extension in self._active_extensions.items():
+            background_hooks = extension.get("background_hooks", set())
+            out_of_process_hooks = extension.get("out_of_process_hooks", set())
+            if not self.use_extension_host:
+                background_hooks = background_hooks | out_of_process_hooks
+                out_of_process_hooks = set()
+            for hook_name, hook in extension["hooks"].items():
+                if hook_name in out_of_process_hooks:
+                    hosted.setdefault(hook_name, []).append(ext_name)
+                    continue
+                table = background if hook_name in background_hooks else subscribers
+                table.setdefault(hook_name, []).append((ext_name, hook))
+        ExtensionManager._hook_subscribers = {name: tuple(hooks) for name, hooks in subscribers.items()}
+        ExtensionManager._background_subscribers = {name: tuple(hooks) for name, hooks in background.items()}
+        ExtensionManager._host_subscribers = {name: tuple(names) for name, names in hosted.items()}
+        
+        # Keep the host's set of loaded extensions in step with the active ones
+        if self._extension_host is not None:
+            wanted = {name for names in hosted.values() for name in names}
+            for name in set(self._extension_host.extensions) - wanted:
+                self._extension_host.unload_extension(name)
+            for name in wanted - set(self._extension_host.extensions):
+                self._extension_host.load_extension(name, self._active_extensions[name]["module_path"])
+    
+    def _drop_queued_hooks(self, extension_name):
+        """Cancel background hooks of an extension that are queued but not yet running"""
+        for key in [key for key in self._pending_background if key[0] == extension_name]:
+            self._pending_background.pop(key).cancel()
+    
+    def _invoke(self, extension_name, hook_name, hook, args, kwargs):
+        """Run one extension's hook, timing it and containing its errors"""
+        started = time.perf_counter()
+        try:
+            result = hook(*args, **kwargs)
+            
+            # Track layout modifications for better cleanup
+            if hook_name == 'modify_layout' and extension_name in self._extension_states:
+                self._extension_states[extension_name]["has_modified_layout"] = True
+                
+            return result
+        except Exception as e:
+            print(f"Error calling {hook_name} hook in {extension_name}: {str(e)}")
+            traceback.print_exc()
+            return False
+        finally:
+            elapsed = time.perf_counter() - started
+            self._record_timing(extension_name, hook_name, elapsed)
+            self._check_budget(extension_name, hook_name, elapsed * 1000.0, args)
+    
+    def _record_timing(self, extension_name, hook_name, elapsed):
+        """Add a call to the per-hook timing totals"""
+        timing = self._hook_timings.setdefault(hook_name, {}).get(extension_name)
+        if timing is None:
+            self._hook_timings[hook_name][extension_name] = [1, elapsed, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+    
+    def _check_budget(self, extension_name, hook_name, elapsed_ms, args):
+        """Record a call in the extension's rolling stats and react to budget overruns"""
+        budget_ms = self.get_hook_budget(hook_name)
+        over_budget = elapsed_ms > budget_ms
+        stats = self._hook_stats.get(extension_name)
+        if stats is None:
+            stats = self._hook_stats[extension_name] = HookStats()
+        stats.record(hook_name, elapsed_ms, over_budget)
+        if not over_budget:
+            return
+        
+        # Log the first overrun and every tenth after it, so a slow keystroke hook can't flood the log
+        if stats.overruns == 1 or stats.overruns % 10 == 0:
+            print(f"Slow extension hook: {extension_name}.{hook_name} took {elapsed_ms:.1f} ms "
+                  f"(budget {budget_ms:.0f} ms, {stats.overruns} of the last {len(stats.samples)} calls over budget)")
+        
+        disabled = False
+        if (self.auto_disable_slow and stats.overruns >= AUTO_DISABLE_OVERRUNS
+                and hook_name != 'cleanup' and self.is_extension_active(extension_name)):
+            # Hooks receive the application window as their first argument
+            app_instance = args[0] if args else None
+            print(f"Disabling extension {extension_name}: it repeatedly exceeded its hook budgets")
+            self.toggle_extension(extension_name, app_instance)
+            disabled = True
+        
+        for listener in list(self._slow_hook_listeners):
+            try:
+                listener(extension_name, hook_name, elapsed_ms, budget_ms, disabled)
+            except Exception as e:
+                print(f"Error in slow hook listener: {str(e)}")
+                traceback.print_exc()
+    
+    def add_slow_hook_listener(self, listener):
+        """Call listener(extension_name, hook_name, elapsed_ms, budget_ms, disabled) on every overrun"""
+        if listener not in self._slow_hook_listeners:
+            self._slow_hook_listeners.append(listener)
+    
+    def remove_slow_hook_listener(self, listener):
+        if listener in self._slow_hook_listeners:
+            self._slow_hook_listeners.remove(listener)
+    
+    def is_extension_slow(self, extension_name):
+        """Check whether an extension has recently gone over its hook budgets repeatedly"""
+        stats = self._hook_stats.get(extension_name)
+        return stats is not None and stats.is_slow()
+    
+    def get_extension_stats(self, extension_name):
+        """Return rolling hook statistics for an extension, or None if it was never called
+        
+        Returns:
+            dict: calls, overruns, p50_ms, p95_ms, max_ms, histogram, slow_hooks
+        """
+        stats = self._hook_stats.get(extension_name)
+        if stats is None or not stats.samples:
+            return None
+        return {
+            "calls": len(stats.samples),
+            "overruns": stats.overruns,
+            "p50_ms": round(stats.percentile(0.5), 3),
+            "p95_ms": round(stats.percentile(0.95), 3),
+            "max_ms": round(max(sample[1] for sample in stats.samples), 3),
+            "histogram": stats.histogram(),
+            "slow_hooks": dict(stats.slow_hooks)
+        }
+    
     def _call_hook(self, extension_name, hook_name, *args, **kwargs):
         """Call a hook function for an extension if it exists"""
         if extension_name in self._active_extensions:
-            extension = self._active_extensions[extension_name]
-            if hook_name in extension["hooks"]:
-                try:
-                    result = extension["hooks"][hook_name](*args, **kwargs)
-                    
-                    # Track layout modifications for better cleanup
-                    if hook_name == 'modify_layout' and extension_name in self._extension_states:
-                        self._extension_states[extension_name]["has_modified_layout"] = True
-                        
-                    return result
-                except Exception as e:
-                    print(f"Error calling {hook_name} hook in {extension_name}: {str(e)}")
-                    traceback.print_exc()
+            hook = self._active_extensions[extension_name]["hooks"].get(hook_name)
+            if hook is not None:
+                return self._invoke(extension_name, hook_name, hook, args, kwargs)
         return False
     
     def call_hook_for_all(self, hook_name, *args, **kwargs):
-        """Call a hook function for all active extensions"""
-        results = []
-        # Make a copy of the keys to avoid modification during iteration
-        active_extension_names = list(self._active_extensions.keys())
-        for ext_name in active_extension_names:
-            result = self._call_hook(ext_name, hook_name, *args, **kwargs)
-            results.append((ext_name, result))
-        return results
+        """Call a hook function for all active extensions that implement it
+        
+        Background subscribers are queued and don't wait. Returns a list of
+        (extension_name, result) for the extensions that were called synchronously.
+        """
+        background = self._background_subscribers.get(hook_name)
+        hosted = self._host_subscribers.get(hook_name)
+        if background or hosted:
+            try:
+                snapshot = self._make_snapshot(hook_name, args)
+            except Exception as e:
+                print(f"Error capturing snapshot for {hook_name}: {str(e)}")
+                traceback.print_exc()
+            else:
+                app = args[0] if args else None
+                if background:
+                    self._dispatch_background(hook_name, background, snapshot, app)
+                if hosted:
+                    self._dispatch_to_host(hook_name, hosted, snapshot, app)
+        
+        subscribers = self._hook_subscribers.get(hook_name)
+        if not subscribers:
+            return []
+        # The tuple is replaced, not mutated, when extensions are toggled mid-dispatch
+        return [(ext_name, self._invoke(ext_name, hook_name, hook, args, kwargs))
+                for ext_name, hook in subscribers]
+    
+    def _make_snapshot(self, hook_name, args):
+        """Capture what a background hook may look at, on the GUI thread"""
+        app = args[0] if args else None
+        file_path = getattr(app, 'current_file', None)
+        mode = getattr(app, 'current_mode', None)
+        content = None
+        if hook_name == 'pre_save_file' and len(args) >= 3:
+            file_path, content = args[1] or file_path, args[2]
+        elif app is not None and hasattr(app, 'getCurrentEditor'):
+            editor = app.getCurrentEditor()
+            if hasattr(editor, 'toPlainText'):
+                content = editor.toPlainText()
+        if hook_name == 'post_load_file' and len(args) >= 2:
+            file_path = args[1]
+        
+        from theme_manager import ThemeManager
+        return HookSnapshot(hook_name, file_path, content, mode, ThemeManager.get_current_theme(), tuple(args[1:]))
+    
+    def _dispatch_background(self, hook_name, subscribers, snapshot, app):
+        """Queue background hooks with one shared snapshot"""
+        if self._background_executor is None:
+            ExtensionManager._background_executor = ThreadPoolExecutor(
+                max_workers=BACKGROUND_WORKERS, thread_name_prefix="hyprtext-hook")
+            ExtensionManager._background_bridge = _HookResultBridge()
+            self._background_bridge.result_ready.connect(self._deliver_background_result)
+        
+        for ext_name, hook in subscribers:
+            # A newer snapshot supersedes a queued one for the same hook (e.g. repeated saves).
+            # Cancelling a future that already started or finished does nothing
+            previous = self._pending_background.pop((ext_name, hook_name), None)
+            if previous is not None:
+                previous.cancel()
+            future = self._background_executor.submit(self._run_background, ext_name, hook_name, hook, snapshot, app)
+            self._pending_background[(ext_name, hook_name)] = future
+    
+    def _dispatch_to_host(self, hook_name, extension_names, snapshot, app):
+        """Send out-of-process hooks to the extension host"""
+        if self._extension_host is None:
+            from extension_host_client import ExtensionHostClient
+            ExtensionManager._extension_host = ExtensionHostClient()
+            self._extension_host.result_ready.connect(self._deliver_background_result)
+            for names in self._host_subscribers.values():
+                for name in names:
+                    if name not in self._extension_host.extensions:
+                        self._extension_host.load_extension(name, self._active_extensions[name]["module_path"])
+        
+        for ext_name in extension_names:
+            self._extension_host.call(ext_name, hook_name, snapshot, app)
+    
+    def _run_background(self, extension_name, hook_name, hook, snapshot, app):
+        """Worker thread: run one background hook and post its result to the GUI thread"""
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(hook):
+                result = asyncio.run(hook(snapshot))
+            else:
+                result = hook(snapshot)
+        except Exception as e:
+            print(f"Error in background {hook_name} hook of {extension_name}: {str(e)}")
+            traceback.print_exc()
+            return
+        self._background_bridge.result_ready.emit(extension_name, hook_name, result,
+                                                  time.perf_counter() - started, app)
+    
+    def _deliver_background_result(self, extension_name, hook_name, result, elapsed, app):
+        """GUI thread: hand a background result to the extension's `<hook>_result` callback"""
+        self._record_timing(extension_name, hook_name, elapsed)
+        extension = self._active_extensions.get(extension_name)
+        if extension is None:
+            return  # Disabled while the hook was running
+        callback = getattr(extension["module"], f"{hook_name}_result", None)
+        if callback is None:
+            return
+        try:
+            callback(app, result)
+        except RuntimeError as e:
+            # The window the hook fired for may have been closed meanwhile
+            print(f"Dropped {hook_name} result of {extension_name}: {str(e)}")
+        except Exception as e:
+            print(f"Error delivering {hook_name} result to {extension_name}: {str(e)}")
+            traceback.print_exc()
+    
+    def shutdown_background_hooks(self):
+        """Drop queued background hooks and stop the worker threads and extension host"""
+        if self._extension_host is not None:
+            self._extension_host.stop()
+        if self._background_executor is not None:
+            self._background_executor.shutdown(wait=False, cancel_futures=True)
+            ExtensionManager._background_executor = None
+        self._pending_background.clear()
+    
+    def has_subscribers(self, hook_name):
+        """Check whether any active extension implements a hook"""
+        return bool(self._hook_subscribers.get(hook_name) or self._background_subscribers.get(hook_name)
+                    or self._host_subscribers.get(hook_name))
+    
+    def get_hook_timings(self):
+        """Return per-hook, per-extension call statistics for profiling
+        
+        Returns:
+            dict: hook_name -> extension_name -> {"calls", "total_ms", "mean_ms", "max_ms"}
+        """
+        timings = {}
+        for hook_name, extensions in self._hook_timings.items():
+            timings[hook_name] = {
+                ext_name: {
+                    "calls": calls,
+                    "total_ms": round(total * 1000.0, 3),
+                    "mean_ms": round(total * 1000.0 / calls, 3),
+                    "max_ms": round(maximum * 1000.0, 3)
+                }
+                for ext_name, (calls, total, maximum) in extensions.items()
+            }
+        return timings
+    
+    def reset_hook_timings(self):
+        """Clear the collected hook timings and rolling statistics"""
+        self._hook_timings.clear()
+        self._hook_stats.clear()
     
     def get_extension_state(self, extension_name):
         """Get the current state of an extension"""
@@ -224,5 +688,81 @@ class ExtensionManager:
             return True
         return False
 
+def merge_text_change(changes, position, removed, inserted):
+    """Append an edit to a batch of (position, removed, inserted) changes
+    
+    An edit that touches the text inserted by the previous change is folded into it,
+    so typing a word or holding backspace yields one change rather than one per key.
+    """
+    if changes:
+        start, last_removed, last_inserted = changes[-1]
+        end = start + last_inserted
+        if position <= end and position + removed >= start:
+            overlap = max(0, min(position + removed, end) - max(position, start))
+            changes[-1] = (min(start, position), last_removed + removed - overlap,
+                           last_inserted - overlap + inserted)
+            return
+    changes.append((position, removed, inserted))
+
+class TextChangeBatcher(QObject):
+    """Collects edits to the current editor's document and delivers them to on_text_changed
+    
+    Nothing is connected to the document while no active extension implements the
+    hook, so plain typing pays nothing. Call follow() whenever the editor or its
+    document is swapped and after extensions are toggled.
+    """
+    
+    def __init__(self, app, get_editor):
+        super().__init__(app)
+        self.app = app
+        self.get_editor = get_editor
+        self._document = None
+        self._changes = []
+        self._revision = -1
+        
+        debounce = settings_service.value('text_change_debounce_ms', DEFAULT_TEXT_CHANGE_DEBOUNCE_MS, type=int)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(0, debounce))
+        self._timer.timeout.connect(self.flush)
+    
+    def follow(self):
+        """Watch the current editor's document, or nothing if no extension listens"""
+        document = None
+        if extension_manager.has_subscribers('on_text_changed'):
+            document = self.get_editor().document()
+        if document is self._document:
+            return
+        
+        # Edits made before the switch still belong to the previous document
+        self.flush()
+        if self._document is not None:
+            try:
+                self._document.contentsChange.disconnect(self._onContentsChange)
+            except (TypeError, RuntimeError):
+                pass  # Already deleted with its buffer
+        self._document = document
+        if document is not None:
+            self._revision = document.revision()
+            document.contentsChange.connect(self._onContentsChange)
+    
+    def _onContentsChange(self, position, removed, inserted):
+        # Re-highlighting reports an unchanged span as removed == inserted without a new revision
+        revision = self._document.revision()
+        if removed == inserted and revision == self._revision:
+            return
+        self._revision = revision
+        merge_text_change(self._changes, position, removed, inserted)
+        self._timer.start()
+    
+    def flush(self):
+        """Deliver the pending batch now"""
+        self._timer.stop()
+        if not self._changes:
+            return
+        changes, self._changes = self._changes, []
+        extension_manager.call_hook_for_all('on_text_changed', self.app, changes)
+
 # Initialize the singleton instance
-extension_manager = ExtensionManager.get_instance() 
\ No newline at end of file
+with startup_profiler.phase("extension discovery"):
+    extension_manager = ExtensionManager.get_instance() 
\ No newline at end of file
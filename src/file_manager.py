@@ -1,208 +1,119 @@
 import os
 from PyQt6.QtWidgets import QMessageBox, QFileDialog
 from theme_manager import ThemeManager
+from text_io import read_text, write_text
+
+# Name filters shared by the open and save dialogs
+FILE_NAME_FILTER = ';;'.join([
+    'All Supported Files (*.txt *.py *.js *.html *.css *.md *.json *.xml *.yaml *.yml *.ini *.conf *.cfg *.toml *.sh *.bash *.hyr *.c *.cpp *.h *.hpp *.java *.kt *.rs *.go *.rb *.php *.pl *.lua *.sql *.tex)',
+    'Text Files (*.txt)',
+    'Python Files (*.py)',
+    'JavaScript Files (*.js)',
+    'HTML Files (*.html *.htm)',
+    'CSS Files (*.css)',
+    'Markdown Files (*.md *.markdown)',
+    'JSON Files (*.json)',
+    'XML Files (*.xml)',
+    'YAML Files (*.yaml *.yml)',
+    'Config Files (*.ini *.conf *.cfg *.toml)',
+    'Shell Scripts (*.sh *.bash)',
+    'HyprText Files (*.hyr)',
+    'C/C++ Files (*.c *.cpp *.h *.hpp)',
+    'Java Files (*.java)',
+    'Kotlin Files (*.kt)',
+    'Rust Files (*.rs)',
+    'Go Files (*.go)',
+    'Ruby Files (*.rb)',
+    'PHP Files (*.php)',
+    'Perl Files (*.pl)',
+    'Lua Files (*.lua)',
+    'SQL Files (*.sql)',
+    'LaTeX Files (*.tex)',
+    'All Files (*)'
+])
 
 class FileManager:
     """Handles file operations such as open, save, and new files"""
     
+    # Reusable dialogs by kind ('open' or 'save'), created on first use
+    _dialogs = {}
+    
     @staticmethod
     def _get_themed_dialog_stylesheet():
-        """Generate a stylesheet for file dialogs based on the current theme"""
-        # Get current theme colors
-        theme_module = ThemeManager._get_theme_module()
-        is_dark = ThemeManager.is_dark_mode()
-        
-        # Get the theme's colors
-        if is_dark:
-            theme_colors = getattr(theme_module, 'DARK_MODE', {})
-        else:
-            theme_colors = getattr(theme_module, 'LIGHT_MODE', {})
-            
-        # Get specific colors from the theme
-        bg_color = theme_colors.get("background")
-        menu_bg = theme_colors.get("menu_bg")
-        text_color = theme_colors.get("text")
-        accent_color = theme_colors.get("accent")
-        hover_color = theme_colors.get("menu_hover")
-        active_color = theme_colors.get("menu_active")
-        
-        # Generate a stylesheet that matches the theme aesthetics
-        return f"""
-            QFileDialog {{
-                background-color: {menu_bg};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                border-radius: 8px;
-            }}
-            QDialog, QFileDialog QWidget {{
-                background-color: {menu_bg};
-                color: {text_color};
-            }}
-            QListView, QTreeView {{
-                background-color: {bg_color};
-                color: {text_color};
-                font-size: 12pt;
-                border: 1px solid {accent_color};
-                border-radius: 6px;
-                padding: 4px;
-                selection-background-color: {hover_color};
-                selection-color: {accent_color};
-            }}
-            QHeaderView::section {{
-                background-color: {menu_bg};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                padding: 4px;
-            }}
-            QPushButton {{
-                background-color: {menu_bg};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                border-radius: 6px;
-                padding: 6px 12px;
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background-color: {hover_color};
-                color: {accent_color};
-                border: 1px solid {accent_color};
-            }}
-            QPushButton:pressed {{
-                background-color: {active_color};
-            }}
-            QLineEdit {{
-                background-color: {bg_color};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                border-radius: 6px;
-                padding: 5px;
-                font-size: 12pt;
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {accent_color};
-            }}
-            QComboBox {{
-                background-color: {bg_color};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                border-radius: 6px;
-                padding: 5px;
-                font-size: 12pt;
-            }}
-            QComboBox:hover {{
-                background-color: {hover_color};
-                color: {accent_color};
-            }}
-            QComboBox::drop-down {{
-                border: none;
-                width: 24px;
-            }}
-            QComboBox QAbstractItemView {{
-                background-color: {menu_bg};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                selection-background-color: {hover_color};
-                selection-color: {accent_color};
-            }}
-            QToolButton {{
-                background-color: {menu_bg};
-                color: {text_color};
-                border: 1px solid {accent_color};
-                border-radius: 4px;
-            }}
-            QToolButton:hover {{
-                background-color: {hover_color};
-                color: {accent_color};
-            }}
-            QToolButton:pressed {{
-                background-color: {active_color};
-            }}
-            QLabel {{
-                color: {text_color};
-            }}
-            QScrollBar:vertical {{
-                border: none;
-                background-color: transparent;
-                width: 12px;
-                margin: 0px;
-            }}
-            QScrollBar::handle:vertical {{
-                background-color: {accent_color};
-                border-radius: 6px;
-                min-height: 20px;
-            }}
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                height: 0px;
-            }}
-            QScrollBar:horizontal {{
-                border: none;
-                background-color: transparent;
-                height: 12px;
-                margin: 0px;
-            }}
-            QScrollBar::handle:horizontal {{
-                background-color: {accent_color};
-                border-radius: 6px;
-                min-width: 20px;
-            }}
-            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
-                width: 0px;
-            }}
-        """
+        """Return the file dialog stylesheet compiled into the current theme's bundle"""
+        return ThemeManager.get_dialog_stylesheet(ThemeManager.is_dark_mode())
     
     @staticmethod
-    def get_open_file_path(parent):
-        """Open a file dialog and return the selected file path"""
-        try:
-            dialog = QFileDialog(parent, 'Open File')
+    def _get_dialog(kind, parent):
+        """Return the reusable open ('open') or save ('save') dialog, restyled only if the theme changed"""
+        dialog = FileManager._dialogs.get(kind)
+        if dialog is None:
+            dialog = QFileDialog(parent, 'Open File' if kind == 'open' else 'Save File')
             dialog.setOption(QFileDialog.Option.DontUseNativeDialog)
-            dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+            if kind == 'open':
+                dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+            else:
+                dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
             
             # Add support for many common text file formats
-            dialog.setNameFilter(
-                'All Supported Files (*.txt *.py *.js *.html *.css *.md *.json *.xml *.yaml *.yml *.ini *.conf *.cfg *.toml *.sh *.bash *.hyr *.c *.cpp *.h *.hpp *.java *.kt *.rs *.go *.rb *.php *.pl *.lua *.sql *.tex);;\
-                Text Files (*.txt);;\
-                Python Files (*.py);;\
-                JavaScript Files (*.js);;\
-                HTML Files (*.html *.htm);;\
-                CSS Files (*.css);;\
-                Markdown Files (*.md *.markdown);;\
-                JSON Files (*.json);;\
-                XML Files (*.xml);;\
-                YAML Files (*.yaml *.yml);;\
-                Config Files (*.ini *.conf *.cfg *.toml);;\
-                Shell Scripts (*.sh *.bash);;\
-                HyprText Files (*.hyr);;\
-                C/C++ Files (*.c *.cpp *.h *.hpp);;\
-                Java Files (*.java);;\
-                Kotlin Files (*.kt);;\
-                Rust Files (*.rs);;\
-                Go Files (*.go);;\
-                Ruby Files (*.rb);;\
-                PHP Files (*.php);;\
-                Perl Files (*.pl);;\
-                Lua Files (*.lua);;\
-                SQL Files (*.sql);;\
-                LaTeX Files (*.tex);;\
-                All Files (*)'
-            )
-            
-            # Apply themed stylesheet
-            dialog.setStyleSheet(FileManager._get_themed_dialog_stylesheet())
+            dialog.setNameFilter(FILE_NAME_FILTER)
             
             # Set a reasonable minimum size
             dialog.setMinimumSize(700, 500)
             
-            # Center dialog relative to parent
-            if parent:
-                dialog_size = dialog.sizeHint()
-                parent_center = parent.geometry().center()
-                dialog.setGeometry(
-                    parent_center.x() - dialog_size.width() // 2,
-                    parent_center.y() - dialog_size.height() // 2,
-                    dialog_size.width(),
-                    dialog_size.height()
-                )
+            # Forget the dialog if its parent window is deleted
+            dialog.destroyed.connect(lambda _=None, kind=kind: FileManager._dialogs.pop(kind, None))
+            FileManager._dialogs[kind] = dialog
+        elif parent is not None and dialog.parent() is not parent:
+            # Reuse the dialog for another window
+            dialog.setParent(parent, dialog.windowFlags())
+        
+        # Apply themed stylesheet, only when the theme or dark mode changed
+        style_key = (ThemeManager.get_current_theme(), ThemeManager.is_dark_mode())
+        if dialog.property('hyprtext_style_key') != repr(style_key):
+            dialog.setStyleSheet(FileManager._get_themed_dialog_stylesheet())
+            dialog.setProperty('hyprtext_style_key', repr(style_key))
+        return dialog
+    
+    @staticmethod
+    def _center_dialog(dialog, parent):
+        """Center dialog relative to parent"""
+        if parent:
+            dialog_size = dialog.sizeHint()
+            parent_center = parent.geometry().center()
+            dialog.setGeometry(
+                parent_center.x() - dialog_size.width() // 2,
+                parent_center.y() - dialog_size.height() // 2,
+                dialog_size.width(),
+                dialog_size.height()
+            )
+    
+    @staticmethod
+    def warm_dialogs(parent):
+        """Build and style both dialogs ahead of time so Ctrl+O/Ctrl+S open populated
+        
+        Creating a dialog starts its file system model's background gatherer on the
+        current directory, so the listing is ready by the time the dialog is shown.
+        """
+        try:
+            for kind in ('open', 'save'):
+                FileManager._get_dialog(kind, parent).ensurePolished()
+        except Exception as e:
+            print(f"Failed to prepare file dialogs: {str(e)}")
+    
+    @staticmethod
+    def invalidate_dialog_styles():
+        """Restyle the dialogs on next use (after themes were reloaded from disk)"""
+        for dialog in FileManager._dialogs.values():
+            dialog.setProperty('hyprtext_style_key', None)
+    
+    @staticmethod
+    def get_open_file_path(parent):
+        """Open a file dialog and return the selected file path"""
+        try:
+            dialog = FileManager._get_dialog('open', parent)
+            dialog.selectFile('')
+            FileManager._center_dialog(dialog, parent)
             
             if dialog.exec() == 1:  # QDialog.Accepted
                 filename = dialog.selectedFiles()[0]
@@ -216,55 +127,9 @@ class FileManager:
     def get_save_file_path(parent):
         """Open a save file dialog and return the selected file path"""
         try:
-            dialog = QFileDialog(parent, 'Save File')
-            dialog.setOption(QFileDialog.Option.DontUseNativeDialog)
-            dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
-            
-            # Add support for many common text file formats
-            dialog.setNameFilter(
-                'All Supported Files (*.txt *.py *.js *.html *.css *.md *.json *.xml *.yaml *.yml *.ini *.conf *.cfg *.toml *.sh *.bash *.hyr *.c *.cpp *.h *.hpp *.java *.kt *.rs *.go *.rb *.php *.pl *.lua *.sql *.tex);;\
-                Text Files (*.txt);;\
-                Python Files (*.py);;\
-                JavaScript Files (*.js);;\
-                HTML Files (*.html *.htm);;\
-                CSS Files (*.css);;\
-                Markdown Files (*.md *.markdown);;\
-                JSON Files (*.json);;\
-                XML Files (*.xml);;\
-                YAML Files (*.yaml *.yml);;\
-                Config Files (*.ini *.conf *.cfg *.toml);;\
-                Shell Scripts (*.sh *.bash);;\
-                HyprText Files (*.hyr);;\
-                C/C++ Files (*.c *.cpp *.h *.hpp);;\
-                Java Files (*.java);;\
-                Kotlin Files (*.kt);;\
-                Rust Files (*.rs);;\
-                Go Files (*.go);;\
-                Ruby Files (*.rb);;\
-                PHP Files (*.php);;\
-                Perl Files (*.pl);;\
-                Lua Files (*.lua);;\
-                SQL Files (*.sql);;\
-                LaTeX Files (*.tex);;\
-                All Files (*)'
-            )
-            
-            # Apply themed stylesheet
-            dialog.setStyleSheet(FileManager._get_themed_dialog_stylesheet())
-            
-            # Set a reasonable minimum size
-            dialog.setMinimumSize(700, 500)
-            
-            # Center dialog relative to parent
-            if parent:
-                dialog_size = dialog.sizeHint()
-                parent_center = parent.geometry().center()
-                dialog.setGeometry(
-                    parent_center.x() - dialog_size.width() // 2,
-                    parent_center.y() - dialog_size.height() // 2,
-                    dialog_size.width(),
-                    dialog_size.height()
-                )
+            dialog = FileManager._get_dialog('save', parent)
+            dialog.selectFile('')
+            FileManager._center_dialog(dialog, parent)
             
             if dialog.exec() == 1:  # QDialog.Accepted
                 filename = dialog.selectedFiles()[0]
@@ -277,29 +142,14 @@ class FileManager:
     @staticmethod
     def read_file(file_path):
         """Read content from a file and return it as a string"""
+        content, _ = FileManager.read_file_with_encoding(file_path)
+        return content
+    
+    @staticmethod
+    def read_file_with_encoding(file_path):
+        """Read content from a file and return (content, encoding)"""
         try:
-            # Try UTF-8 first (most common for text files)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                # If UTF-8 fails, try with other common encodings
-                for encoding in ['latin-1', 'cp1252', 'utf-16', 'utf-32']:
-                    try:
-                        with open(file_path, 'r', encoding=encoding) as f:
-                            return f.read()
-                    except UnicodeDecodeError:
-                        continue
-                
-                # If all text encodings fail, try binary mode as last resort
-                with open(file_path, 'rb') as f:
-                    binary_content = f.read()
-                    # Check if it's likely a text file with unknown encoding
-                    if b'\x00' not in binary_content[:1024]:  # No null bytes in first 1KB
-                        return binary_content.decode('latin-1', errors='replace')
-                    else:
-                        raise Exception(f"The file appears to be binary and cannot be opened in a text editor")
-                        
+            return read_text(file_path)
         except IOError as e:
             raise Exception(f"Error reading file {file_path}: {str(e)}")
         except Exception as e:
@@ -309,17 +159,8 @@ class FileManager:
     def write_file(file_path, content):
         """Write content to a file"""
         try:
-            # Determine encoding based on file extension
-            _, extension = os.path.splitext(file_path)
-            
-            # Default to UTF-8 for most files
-            encoding = 'utf-8'
-            
-            # Use platform-specific line endings
-            content = content.replace('\r\n', '\n').replace('\r', '\n')
-            
-            with open(file_path, 'w', encoding=encoding, newline='') as f:
-                f.write(content)
+            # Always UTF-8 with Unix line endings (see text_io)
+            write_text(file_path, content)
         except Exception as e:
             raise Exception(f"Error writing to file {file_path}: {str(e)}")
     
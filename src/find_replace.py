@@ -0,0 +1,560 @@
+"""
+Find and Replace for HyprText
+=============================
+
+This module provides the find/replace bar shown under the editor. Searching is
+incremental: the pattern is re-run shortly after each keystroke, on a worker thread
+from QThreadPool over a snapshot of the text, so even a very large buffer never
+blocks typing. The worker scans the snapshot in bounded slices, because `re` holds
+the GIL for the whole of a single scan; only patterns whose match length has no
+upper bound (e.g. "a.*b") still need one pass. Matches stream back in batches and
+only the ones inside the visible viewport are highlighted. Replace All is a single
+undo step.
+"""
+
+import bisect
+import re
+import time
+import traceback
+try:
+    from re import _parser as regex_parser, _constants as regex_constants
+except ImportError:  # Python < 3.11
+    import sre_parse as regex_parser, sre_constants as regex_constants
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QPoint, pyqtSignal
+from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor, QKeySequence, QShortcut
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QToolButton, QCheckBox, QLabel, QTextEdit
+
+from theme_manager import ThemeManager
+
+# Delay between the last keystroke and the search starting (ms)
+SEARCH_DEBOUNCE = 150
+
+# Delay before re-searching after the document itself was edited (ms)
+DOCUMENT_CHANGE_DEBOUNCE = 400
+
+# The first batch is small so the first hits show up immediately; later ones are larger
+FIRST_BATCH_SIZE = 100
+BATCH_SIZE = 5000
+
+# Characters scanned per slice; one slice holds the GIL for a few milliseconds at most
+SEARCH_SLICE_SIZE = 1024 * 1024
+
+# Upper bound on highlights drawn at once (a viewport never shows more than this)
+MAX_VISIBLE_HIGHLIGHTS = 2000
+
+# Above this many matches Replace All rewrites the text in one go instead of match by match
+BULK_REPLACE_THRESHOLD = 500
+
+# Characters outside the BMP take two UTF-16 code units in a QTextDocument
+_ASTRAL_CHARS = re.compile('[\U00010000-\U0010FFFF]')
+
+def compile_pattern(text, case_sensitive=False, use_regex=False):
+    """Compile the search text, returning None for an empty or invalid pattern"""
+    if not text:
+        return None
+    flags = 0 if case_sensitive else re.IGNORECASE
+    try:
+        return re.compile(text if use_regex else re.escape(text), flags | re.MULTILINE)
+    except re.error:
+        return None
+
+def utf16_offset_mapper(text):
+    """Return a function converting str indexes of text to QTextDocument positions"""
+    astral = [m.start() for m in _ASTRAL_CHARS.finditer(text)]
+    if not astral:
+        return lambda index: index
+    return lambda index: index + bisect.bisect_left(astral, index)
+
+def _nested_subpatterns(value):
+    """Yield the parsed subpatterns inside one opcode argument"""
+    if isinstance(value, regex_parser.SubPattern):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _nested_subpatterns(item)
+
+def _lookahead_width(subpattern):
+    """Return how far the lookaheads in a parsed pattern can read past the text they match"""
+    width = 0
+    for op, av in subpattern:
+        if op in (regex_constants.ASSERT, regex_constants.ASSERT_NOT) and av[0] == 1:
+            width = max(width, av[1].getwidth()[1] + _lookahead_width(av[1]))
+        else:
+            for nested in _nested_subpatterns(av):
+                width = max(width, _lookahead_width(nested))
+    return width
+
+def search_context_width(pattern):
+    """Return how much text past a match's start the pattern can read (its longest match
+    plus its longest lookahead), or None if that isn't bounded by a slice"""
+    try:
+        parsed = regex_parser.parse(pattern.pattern, pattern.flags)
+        width = parsed.getwidth()[1] + _lookahead_width(parsed)
+    except Exception:
+        return None
+    return width if width <= SEARCH_SLICE_SIZE else None
+
+def document_position_to_index(text, position):
+    """Convert a QTextDocument position in text to a str index (the inverse of utf16_offset_mapper)"""
+    if text.isascii():
+        return position
+    index = position
+    for match in _ASTRAL_CHARS.finditer(text):
+        if match.start() >= index:
+            break
+        index -= 1
+    return index
+
+class SearchSignals(QObject):
+    """Signals emitted by a SearchWorker (QRunnable can't define signals itself)"""
+
+    # (generation, list of (start, length) in document positions)
+    results = pyqtSignal(int, list)
+    # (generation, total match count)
+    finished = pyqtSignal(int, int)
+
+class SearchWorker(QRunnable):
+    """Finds every match of a pattern in a text snapshot on a pool thread"""
+
+    def __init__(self, generation, pattern, text):
+        super().__init__()
+        self.generation = generation
+        self.pattern = pattern
+        self.text = text
+        self.cancelled = False
+        self.signals = SearchSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        total = 0
+        try:
+            text = self.text
+            length = len(text)
+            astral = []  # str indexes of non-BMP characters before `scanned`
+            scanned = 0
+            batch = []
+            batch_size = FIRST_BATCH_SIZE
+
+            # Every match starting in a slice is found exactly when the scan can also see
+            # the text the pattern may read past it. A pattern without such a bound (e.g.
+            # "a.*b") could be cut short, so it is scanned in one go
+            context = search_context_width(self.pattern)
+            slice_size = SEARCH_SLICE_SIZE if context is not None else max(length, 1)
+            overlap = context + 1 if context is not None else 0  # +1 so "$" and "\b" see the next character
+
+            position = 0
+            while position < length:
+                if self.cancelled:
+                    return
+                slice_end = min(length, position + slice_size)
+                next_position = slice_end
+                for match in self.pattern.finditer(text, position, min(length, slice_end + overlap)):
+                    start, end = match.span()
+                    if start >= slice_end:
+                        break  # Found again by the next slice
+                    next_position = max(next_position, end)
+                    if start == end:
+                        continue  # Zero-width matches (e.g. "^") can't be highlighted or replaced
+
+                    if scanned < end and not text.isascii():
+                        scan_to = min(length, slice_end + overlap)
+                        astral.extend(m.start() for m in _ASTRAL_CHARS.finditer(text, scanned, scan_to))
+                        scanned = scan_to
+                    start_position = start + bisect.bisect_left(astral, start)
+                    end_position = end + bisect.bisect_left(astral, end)
+                    batch.append((start_position, end_position - start_position))
+                    if len(batch) >= batch_size:
+                        total += len(batch)
+                        self.signals.results.emit(self.generation, batch)
+                        batch = []
+                        batch_size = BATCH_SIZE
+
+                position = next_position
+                # Let the GUI thread have the GIL between slices
+                time.sleep(0)
+
+            if batch and not self.cancelled:
+                total += len(batch)
+                self.signals.results.emit(self.generation, batch)
+        except Exception as e:
+            print(f"Error while searching: {str(e)}")
+            traceback.print_exc()
+        finally:
+            # Drop the snapshot as soon as possible
+            self.text = None
+            if not self.cancelled:
+                self.signals.finished.emit(self.generation, total)
+
+class FindReplaceBar(QWidget):
+    """Find/replace bar that searches whichever editor get_editor returns"""
+
+    def __init__(self, get_editor, parent=None):
+        super().__init__(parent)
+        self.get_editor = get_editor
+        self.editor = None
+        self.matches = []  # Sorted list of (start, length)
+        self.current_index = -1
+        self.searching = False
+        self._generation = 0
+        self._worker = None
+        self._pattern = None
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self.startSearch)
+
+        self._highlight_timer = QTimer(self)
+        self._highlight_timer.setSingleShot(True)
+        self._highlight_timer.setInterval(30)
+        self._highlight_timer.timeout.connect(self.updateHighlights)
+
+        self.initUI()
+        self.setVisible(False)
+
+    def initUI(self):
+        """Build the bar's widgets"""
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(10, 4, 10, 4)
+        layout.setSpacing(6)
+
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("Find")
+        self.find_edit.textChanged.connect(lambda _: self.scheduleSearch(SEARCH_DEBOUNCE))
+        self.find_edit.returnPressed.connect(self.findNext)
+        layout.addWidget(self.find_edit, 2)
+
+        self.replace_edit = QLineEdit()
+        self.replace_edit.setPlaceholderText("Replace")
+        self.replace_edit.returnPressed.connect(self.replaceCurrent)
+        layout.addWidget(self.replace_edit, 2)
+
+        self.case_box = QCheckBox("Aa")
+        self.case_box.setToolTip("Match case")
+        self.case_box.toggled.connect(lambda _: self.scheduleSearch(0))
+        layout.addWidget(self.case_box)
+
+        self.regex_box = QCheckBox(".*")
+        self.regex_box.setToolTip("Regular expression")
+        self.regex_box.toggled.connect(lambda _: self.scheduleSearch(0))
+        layout.addWidget(self.regex_box)
+
+        self.count_label = QLabel("")
+        self.count_label.setMinimumWidth(90)
+        self.count_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.count_label)
+
+        buttons = [
+            ("↑", "Previous match (Shift+Enter)", self.findPrevious),
+            ("↓", "Next match (Enter)", self.findNext),
+            ("Replace", "Replace the current match", self.replaceCurrent),
+            ("All", "Replace all matches", self.replaceAll),
+            ("✕", "Close (Esc)", self.hideBar),
+        ]
+        self.replace_buttons = []
+        for text, tooltip, callback in buttons:
+            button = QToolButton()
+            button.setText(text)
+            button.setToolTip(tooltip)
+            button.clicked.connect(callback)
+            layout.addWidget(button)
+            if callback in (self.replaceCurrent, self.replaceAll):
+                self.replace_buttons.append(button)
+
+        QShortcut(QKeySequence("Shift+Return"), self.find_edit, self.findPrevious,
+                  context=Qt.ShortcutContext.WidgetShortcut)
+        QShortcut(QKeySequence("Escape"), self, self.hideBar,
+                  context=Qt.ShortcutContext.WidgetWithChildrenShortcut)
+
+    def showFind(self, replace=False):
+        """Show the bar, seeded with the editor's selection"""
+        self._attach(self.get_editor())
+        self.replace_edit.setVisible(replace)
+        for button in self.replace_buttons:
+            button.setVisible(replace)
+
+        if self.editor is not None:
+            selected = self.editor.textCursor().selectedText()
+            if selected and ' ' not in selected:
+                self.find_edit.setText(selected)
+
+        self.setVisible(True)
+        self.find_edit.setFocus()
+        self.find_edit.selectAll()
+        self.scheduleSearch(0)
+
+    def hideBar(self):
+        """Hide the bar, stop searching and drop the highlights"""
+        self._cancelWorker()
+        self._search_timer.stop()
+        self.matches = []
+        self.current_index = -1
+        if self.editor is not None:
+            self.editor.setExtraSelections([])
+            self.editor.setFocus()
+        self.setVisible(False)
+
+    def _attach(self, editor):
+        """Follow a different editor (after a mode or buffer switch)"""
+        if editor is self.editor:
+            return
+        if self.editor is not None:
+            try:
+                self.editor.setExtraSelections([])
+                self.editor.verticalScrollBar().valueChanged.disconnect(self._scheduleHighlights)
+                self.editor.textChanged.disconnect(self._onDocumentChanged)
+            except (TypeError, RuntimeError):
+                pass  # Already disconnected, or the editor was deleted
+
+        self.editor = editor if hasattr(editor, 'setExtraSelections') else None
+        if self.editor is not None:
+            self.editor.verticalScrollBar().valueChanged.connect(self._scheduleHighlights)
+            self.editor.textChanged.connect(self._onDocumentChanged)
+
+    def _scheduleHighlights(self, *_):
+        """Refresh the highlights shortly after scrolling"""
+        if self.isVisible() and not self._highlight_timer.isActive():
+            self._highlight_timer.start()
+
+    def _onDocumentChanged(self):
+        """Match positions are stale after an edit, so search again once typing pauses"""
+        if self.isVisible() and self.find_edit.text():
+            self.scheduleSearch(DOCUMENT_CHANGE_DEBOUNCE)
+
+    def scheduleSearch(self, delay):
+        """(Re)start the debounce timer for a search"""
+        self._search_timer.start(delay)
+
+    def _cancelWorker(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self.searching = False
+
+    def startSearch(self):
+        """Start a background search over a snapshot of the editor's text"""
+        try:
+            self._attach(self.get_editor())
+            self._cancelWorker()
+            self._generation += 1
+            self.matches = []
+            self.current_index = -1
+
+            self._pattern = compile_pattern(self.find_edit.text(), self.case_box.isChecked(),
+                                            self.regex_box.isChecked())
+            if self._pattern is None or self.editor is None:
+                self.count_label.setText("Invalid pattern" if self.find_edit.text() else "")
+                self.updateHighlights()
+                return
+
+            self.searching = True
+            self.count_label.setText("Searching…")
+            worker = SearchWorker(self._generation, self._pattern, self.editor.toPlainText())
+            worker.signals.results.connect(self._onResults)
+            worker.signals.finished.connect(self._onFinished)
+            self._worker = worker
+            QThreadPool.globalInstance().start(worker)
+        except Exception as e:
+            print(f"Error starting search: {str(e)}")
+            traceback.print_exc()
+
+    def _onResults(self, generation, batch):
+        """Append a streamed batch of matches"""
+        if generation != self._generation:
+            return
+        self.matches.extend(batch)
+        if self.current_index < 0:
+            self._selectNearest(select=False)
+        self._updateCountLabel()
+        self._scheduleHighlights()
+
+    def _onFinished(self, generation, total):
+        if generation != self._generation:
+            return
+        self.searching = False
+        self._worker = None
+        self._updateCountLabel()
+        self.updateHighlights()
+
+    def _updateCountLabel(self):
+        if not self.matches:
+            self.count_label.setText("Searching…" if self.searching else "No results")
+        elif self.searching:
+            self.count_label.setText(f"{len(self.matches):,}…")
+        else:
+            self.count_label.setText(f"{self.current_index + 1:,} of {len(self.matches):,}")
+
+    def _selectNearest(self, select=True):
+        """Make the first match at or after the cursor current"""
+        if not self.matches or self.editor is None:
+            return
+        position = self.editor.textCursor().selectionStart()
+        index = bisect.bisect_left(self.matches, (position, 0))
+        self.current_index = index if index < len(self.matches) else 0
+        if select:
+            self._selectCurrent()
+
+    def _selectCurrent(self):
+        """Select the current match in the editor and scroll it into view"""
+        start, length = self.matches[self.current_index]
+        cursor = self.editor.textCursor()
+        cursor.setPosition(start)
+        cursor.setPosition(start + length, QTextCursor.MoveMode.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.ensureCursorVisible()
+        self._updateCountLabel()
+        self.updateHighlights()
+
+    def findNext(self):
+        """Go to the next match"""
+        self._step(1)
+
+    def findPrevious(self):
+        """Go to the previous match"""
+        self._step(-1)
+
+    def _step(self, step):
+        if not self.matches:
+            return
+        if self.current_index < 0:
+            self._selectNearest()
+            return
+        self.current_index = (self.current_index + step) % len(self.matches)
+        self._selectCurrent()
+
+    def gotoMatch(self, index):
+        """Select the match with the given index"""
+        if 0 <= index < len(self.matches):
+            self.current_index = index
+            self._selectCurrent()
+
+    def _visibleRange(self):
+        """Return the document positions shown in the viewport"""
+        viewport = self.editor.viewport()
+        first = self.editor.cursorForPosition(QPoint(0, 0)).position()
+        last = self.editor.cursorForPosition(QPoint(viewport.width(), viewport.height())).position()
+        return first, last
+
+    def _highlightColors(self):
+        """Return (match, current match) background colors from the theme accent"""
+        theme_colors = ThemeManager.get_theme_colors()
+        accent = QColor(theme_colors.get("accent", "#64ffda"))
+        current = QColor(accent)
+        accent.setAlpha(70)
+        current.setAlpha(170)
+        return accent, current
+
+    def updateHighlights(self):
+        """Highlight the matches inside the visible viewport only"""
+        if self.editor is None:
+            return
+        try:
+            if not self.matches or not self.isVisible():
+                self.editor.setExtraSelections([])
+                return
+
+            first, last = self._visibleRange()
+            lo = bisect.bisect_left(self.matches, (first, 0))
+            # Include a match that starts just above the viewport and runs into it
+            lo = max(0, lo - 1)
+            hi = bisect.bisect_right(self.matches, (last, float('inf')))
+            hi = min(hi, lo + MAX_VISIBLE_HIGHLIGHTS)
+
+            match_color, current_color = self._highlightColors()
+            document = self.editor.document()
+            selections = []
+            for index in range(lo, hi):
+                start, length = self.matches[index]
+                selection = QTextEdit.ExtraSelection()
+                selection.cursor = QTextCursor(document)
+                selection.cursor.setPosition(start)
+                selection.cursor.setPosition(start + length, QTextCursor.MoveMode.KeepAnchor)
+                char_format = QTextCharFormat()
+                char_format.setBackground(current_color if index == self.current_index else match_color)
+                selection.format = char_format
+                selections.append(selection)
+            self.editor.setExtraSelections(selections)
+        except Exception as e:
+            print(f"Error updating search highlights: {str(e)}")
+            traceback.print_exc()
+
+    def _replacementFor(self, start, length):
+        """Return the replacement for the match at a document span, or None if it no longer matches
+
+        The pattern is matched again at that position in the full text, so lookarounds,
+        anchors and newlines see the same context the search did.
+        """
+        text = self.editor.toPlainText()
+        index = document_position_to_index(text, start)
+        match = self._pattern.match(text, index)
+        if match is None or utf16_offset_mapper(text)(match.end()) != start + length:
+            return None
+        replacement = self.replace_edit.text()
+        if self.regex_box.isChecked():
+            return match.expand(replacement)
+        return replacement
+
+    def replaceCurrent(self):
+        """Replace the current match and move to the next one"""
+        try:
+            if self.editor is None or self.current_index < 0 or not self.matches:
+                return
+            start, length = self.matches[self.current_index]
+            cursor = self.editor.textCursor()
+            if cursor.selectionStart() != start or cursor.selectionEnd() != start + length:
+                # The current match isn't selected yet; select it first
+                self._selectCurrent()
+                return
+
+            replacement = self._replacementFor(start, length)
+            if replacement is None:
+                # The text changed since the search; look again
+                self.scheduleSearch(0)
+                return
+            cursor.insertText(replacement)
+            # The edit triggers a re-search; keep the cursor after the replacement
+        except Exception as e:
+            print(f"Error replacing match: {str(e)}")
+            traceback.print_exc()
+
+    def replaceAll(self):
+        """Replace every match as a single undo step"""
+        try:
+            self._attach(self.get_editor())
+            pattern = compile_pattern(self.find_edit.text(), self.case_box.isChecked(),
+                                      self.regex_box.isChecked())
+            if pattern is None or self.editor is None:
+                return
+
+            # Work on the current text rather than possibly stale streamed results
+            text = self.editor.toPlainText()
+            replacement = self.replace_edit.text()
+            if not self.regex_box.isChecked():
+                replacement = replacement.replace('\\', '\\\\')
+
+            cursor = QTextCursor(self.editor.document())
+            spans = [m for m in pattern.finditer(text) if m.start() != m.end()]
+            if not spans:
+                return
+
+            cursor.beginEditBlock()
+            try:
+                if len(spans) > BULK_REPLACE_THRESHOLD:
+                    # One big edit is far cheaper than thousands of small ones
+                    new_text = pattern.sub(lambda m: m.expand(replacement) if m.start() != m.end() else m.group(0), text)
+                    cursor.select(QTextCursor.SelectionType.Document)
+                    cursor.insertText(new_text)
+                else:
+                    to_position = utf16_offset_mapper(text)
+                    for match in reversed(spans):
+                        cursor.setPosition(to_position(match.start()))
+                        cursor.setPosition(to_position(match.end()), QTextCursor.MoveMode.KeepAnchor)
+                        cursor.insertText(match.expand(replacement))
+            finally:
+                cursor.endEditBlock()
+
+            self.count_label.setText(f"Replaced {len(spans):,}")
+        except Exception as e:
+            print(f"Error replacing all matches: {str(e)}")
+            traceback.print_exc()
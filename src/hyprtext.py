@@ -0,0 +1,1801 @@
+"""
+HyprText
+========
+
+The editor window and the application entry point, main(). Launched through
+main.py, which hands the launch to a running instance first when it can.
+Importing this module loads PyQt6 and runs theme and extension discovery.
+"""
+
+import sys
+import itertools
+import os
+import time
+import traceback
+
+# The profiler is set up before any other import so it can time them
+from startup_profiler import startup_profiler
+startup_profiler.configure_from_argv(sys.argv)
+
+with startup_profiler.phase("import PyQt6"):
+    from PyQt6.QtWidgets import (
+        QApplication, QMainWindow, QVBoxLayout, QWidget, 
+        QMenuBar, QMenu, QMessageBox, QHBoxLayout, QTextEdit,
+        QPushButton, QToolButton, QGraphicsOpacityEffect, QLabel, QGraphicsDropShadowEffect
+    )
+    from PyQt6.QtGui import QAction, QPalette, QColor, QActionGroup, QIcon
+    from PyQt6.QtCore import Qt, QSize, QPoint, QPropertyAnimation, QEasingCurve, QTimer
+
+# Import our modules (theme and extension discovery run at import time)
+with startup_profiler.phase("import HyprText modules"):
+    from settings_service import settings_service
+    from theme_manager import ThemeManager, APP_NAME
+    from animation import AnimatedTextEdit, MenuFader
+    from file_manager import FileManager
+    from mode_manager import mode_manager
+    from editor_pool import ModeEditorPool
+    from buffer_manager import BufferManager, DEFAULT_MEMORY_BUDGET, find_recovery_files, write_recovery_file
+    from find_replace import FindReplaceBar
+    from extension_manager import extension_manager, TextChangeBatcher
+    from icon_manager import get_icon, ICON_FILE, ICON_EDIT, ICON_MODE, ICON_THEME, ICON_EXTENSION
+    from instance_client import parse_launch_args, strip_launch_flags
+
+class CircularMenuButton(QToolButton):
+    """Custom circular button for menu activation"""
+    
+    def __init__(self, icon_name, tooltip, parent=None):
+        super().__init__(parent)
+        self.setToolTip(tooltip)
+        
+        # Store the icon name as a property for theme changes
+        self.setProperty("icon_name", icon_name)
+        
+        # Theme key of the last applied style, to skip redundant restyles
+        self._style_key = None
+        
+        # Set properties for circular appearance
+        self.setFixedSize(40, 40)
+        self.setIconSize(QSize(24, 24))
+        
+        # Set the icon using our icon manager
+        self._update_icon()
+        
+        # Apply theme-based styling
+        self.updateStyle()
+        
+        # Add drop shadow effect
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(10)
+        shadow.setColor(QColor(0, 0, 0, 80))
+        shadow.setOffset(0, 0)
+        self.setGraphicsEffect(shadow)
+    
+    def _update_icon(self, text_color=None):
+        """Set the icon based on the stored icon name property and optional text color"""
+        icon_name = self.property("icon_name")
+        if not icon_name:
+            return
+            
+        # Map icon names to icon constants and fallback system icons
+        icon_mapping = {
+            "file": (ICON_FILE, self.style().StandardPixmap.SP_FileIcon),
+            "edit": (ICON_EDIT, self.style().StandardPixmap.SP_FileDialogContentsView),
+            "mode": (ICON_MODE, self.style().StandardPixmap.SP_FileDialogDetailedView),
+            "theme": (ICON_THEME, self.style().StandardPixmap.SP_DesktopIcon),
+            "extension": (ICON_EXTENSION, self.style().StandardPixmap.SP_FileDialogContentsView)
+        }
+        
+        if icon_name in icon_mapping:
+            icon_constant, fallback_icon = icon_mapping[icon_name]
+            self.setIcon(get_icon(icon_constant, 
+                fallback=self.style().standardIcon(fallback_icon),
+                textColor=text_color))
+    
+    def updateStyle(self):
+        """Update styling based on current theme"""
+        # Get theme colors
+        is_dark = ThemeManager.is_dark_mode()
+        
+        # Import directly from theme_default to avoid circular imports
+        from theme_default import DARK_MODE, LIGHT_MODE
+        
+        # Get the appropriate colors
+        colors = DARK_MODE if is_dark else LIGHT_MODE
+        
+        # Re-setting an identical stylesheet still re-polishes the button, so skip it
+        if self._style_key == is_dark:
+            return
+        self._style_key = is_dark
+        
+        # Use textbox colors for styling (more sleek and consistent)
+        background_color = colors.get("background", "#282c34")
+        border_color = colors.get("border", "#3f4451") 
+        text_color = colors.get("text", "#abb2bf")
+        hover_color = colors.get("menu_hover", "#353b45")
+        active_color = colors.get("menu_active", "#3f4451")
+        
+        # Set rounded style via stylesheet with theme colors
+        self.setStyleSheet(f"""
+            QToolButton {{
+                border-radius: 20px;
+                background-color: {background_color};
+                color: {text_color};
+                border: 1px solid {border_color};
+            }}
+            QToolButton:hover {{
+                background-color: {hover_color};
+                border: 1px solid {text_color};
+            }}
+            QToolButton:pressed {{
+                background-color: {active_color};
+            }}
+        """)
+        
+        # Update icon with current text color
+        self._update_icon(text_color)
+    
+    def showEvent(self, event):
+        """Update styling when shown"""
+        self.updateStyle()
+        super().showEvent(event)
+
+class HyprText(QMainWindow):
+    """Main application window for HyprText editor"""
+    
+    # Numbers the windows of this process, so their recovery files don't collide
+    _window_ids = itertools.count(1)
+    
+    # primary is False for standby and additional windows, which reuse the already
+    # discovered modes and don't offer to recover unsaved content
+    def __init__(self, primary=True):
+        super().__init__()
+        self.window_id = next(HyprText._window_ids)
+        try:
+            # Set window flags - always use frameless window for Hyprland
+            self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
+            
+            # We'll handle transparency during theme application
+            # For now, start with transparency OFF by default
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, False)
+            
+            # Create a background widget to control opacity
+            self.background_widget = QWidget(self)
+            self.setCentralWidget(self.background_widget)
+            
+            self.current_mode = None
+            self.current_file = None
+            self.app_name = APP_NAME
+            
+            # Discover available modes
+            if primary:
+                with startup_profiler.phase("mode_manager.discover_modes"):
+                    mode_manager.discover_modes()
+            
+            with startup_profiler.phase("initUI"):
+                self.initUI()
+            with startup_profiler.phase("loadSettings"):
+                self.loadSettings()
+            
+            # Single theme commit (stylesheet, shadows and palette) once the widget tree exists
+            with startup_profiler.phase("applyTheme"):
+                self.applyTheme()
+            
+            # Check for temporary file from previous session
+            if primary:
+                with startup_profiler.phase("checkForRecoveryFile"):
+                    self.checkForRecoveryFile()
+        except Exception as e:
+            self._show_error("Failed to initialize application", e)
+            sys.exit(1)
+        
+    def initUI(self):
+        """Initialize the user interface"""
+        try:
+            # Set window properties
+            self.setWindowTitle(f'{self.app_name} - Untitled')
+            self.setGeometry(100, 100, 800, 600)
+            
+            # Create layout for the background widget
+            main_layout = QVBoxLayout(self.background_widget)
+            main_layout.setContentsMargins(10, 10, 10, 10)
+            
+            # Create top navigation bar with circular buttons
+            top_bar = QWidget()
+            top_layout = QHBoxLayout(top_bar)
+            top_layout.setContentsMargins(5, 5, 5, 0)
+            
+            # Enable mouse tracking for window drag functionality
+            top_bar.setMouseTracking(True)
+            top_bar.mousePressEvent = self.topBarMousePressEvent
+            top_bar.mouseMoveEvent = self.topBarMouseMoveEvent
+            
+            # Left side buttons (File and Edit)
+            left_buttons = QWidget()
+            left_layout = QHBoxLayout(left_buttons)
+            left_layout.setContentsMargins(10, 10, 10, 10)  # Add padding to prevent shadow cutoff
+            left_layout.setSpacing(15)  # Increase spacing between buttons
+            
+            # Create File button
+            self.file_button = CircularMenuButton("file", "File Menu", self)
+            self.file_button.clicked.connect(self.showFileMenu)
+            left_layout.addWidget(self.file_button)
+            
+            # Create Edit button
+            self.edit_button = CircularMenuButton("edit", "Edit Menu", self)
+            self.edit_button.clicked.connect(self.showEditMenu)
+            left_layout.addWidget(self.edit_button)
+            
+            left_layout.addStretch()
+            
+            # Center file name label
+            self.file_label = QLabel("New File -- Spike's HyprText")
+            self.file_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.file_label.setMinimumWidth(300)
+            
+            # Mode and theme info label below the file name
+            self.info_label = QLabel("Standard Mode -- in Default")
+            self.info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.info_label.setMinimumWidth(300)
+            
+            # Create a container for the labels
+            labels_container = QWidget()
+            labels_layout = QVBoxLayout(labels_container)
+            labels_layout.setContentsMargins(0, 0, 0, 0)
+            labels_layout.setSpacing(1)  # Minimal spacing between labels
+            
+            # Add labels to container
+            labels_layout.addWidget(self.file_label)
+            labels_layout.addWidget(self.info_label)
+            
+            # Right side buttons (Modes and Themes)
+            right_buttons = QWidget()
+            right_layout = QHBoxLayout(right_buttons)
+            right_layout.setContentsMargins(10, 10, 10, 10)  # Add padding to prevent shadow cutoff
+            right_layout.setSpacing(15)  # Increase spacing between buttons
+            
+            right_layout.addStretch()
+            
+            # Create Modes button
+            self.modes_button = CircularMenuButton("mode", "Modes Menu", self)
+            self.modes_button.clicked.connect(self.showModesMenu)
+            right_layout.addWidget(self.modes_button)
+            
+            # Create Themes button
+            self.themes_button = CircularMenuButton("theme", "Themes Menu", self)
+            self.themes_button.clicked.connect(self.showThemesMenu)
+            right_layout.addWidget(self.themes_button)
+            
+            # Create Extensions button
+            self.extensions_button = CircularMenuButton("extension", "Extensions Menu", self)
+            self.extensions_button.clicked.connect(self.showExtensionsMenu)
+            right_layout.addWidget(self.extensions_button)
+            
+            # Add left, center, and right components to top bar
+            top_layout.addWidget(left_buttons)
+            top_layout.addWidget(labels_container, 1)  # 1 for stretch factor
+            top_layout.addWidget(right_buttons)
+            
+            # Add top bar to main layout
+            main_layout.addWidget(top_bar)
+            
+            # Create content area
+            self.content_widget = QWidget()
+            content_layout = QVBoxLayout(self.content_widget)
+            content_layout.setContentsMargins(0, 0, 0, 0)
+            
+            # Create default text editor
+            self.text_edit = AnimatedTextEdit()
+            self.text_edit.setFont(ThemeManager.get_editor_font())
+            content_layout.addWidget(self.text_edit)
+            
+            # Open files; the standard editor always shows the active buffer's document
+            self.buffers = BufferManager(self)
+            untitled = self.buffers.new_buffer()
+            self.buffers.activate(untitled.id)
+            self._showBufferDocument(untitled)
+            
+            # Add content area to main layout
+            main_layout.addWidget(self.content_widget)
+            
+            # Find/replace bar below the editors, hidden until Ctrl+F / Ctrl+H
+            self.find_bar = FindReplaceBar(self.getCurrentEditor, self)
+            main_layout.addWidget(self.find_bar)
+            
+            # Batched edits for extensions implementing on_text_changed
+            self.text_changes = TextChangeBatcher(self, self.getCurrentEditor)
+            self.text_changes.follow()
+            
+            # Set layout for central widget
+            self.layout = content_layout
+            
+            # Pool of editor widgets for each mode, built lazily and evicted when idle
+            self.mode_editors = ModeEditorPool(self, content_layout)
+            self.last_custom_mode = None
+            
+            # Create menus (invisible until triggered by buttons)
+            self.createMenus()
+            
+            # The theme is applied once by __init__ after settings are loaded
+            
+            # Ensure we're in Standard Mode by default
+            self.text_edit.setVisible(True)
+            self.current_mode = None
+            
+            # Update window title to reflect Standard Mode
+            theme_name = ThemeManager.get_current_theme()
+            self.setWindowTitle(f'{self.app_name} - Untitled (Standard Mode) [{theme_name}]')
+            
+            # Initialize the drag position for moving the window
+            self.drag_position = None
+            
+            # Update the info label for the initial state
+            self.updateInfoLabel()
+            
+            # Apply active extensions' layout modifications
+            self.refreshExtensionLayouts()
+        except Exception as e:
+            self._show_error("Failed to initialize UI", e)
+        
+    def _create_action(self, text, callback, shortcut=None, icon_name=None, fallback_icon=None, icon_color=None, checkable=False, checked=False):
+        """Helper method to create QActions with consistent formatting
+        
+        Args:
+            text (str): The action text
+            callback (callable): Function to call when triggered
+            shortcut (str, optional): Keyboard shortcut
+            icon_name (str, optional): Name of the SVG icon to use
+            fallback_icon (StandardPixmap, optional): Fallback system icon
+            icon_color (str, optional): Color for the icon
+            checkable (bool, optional): Whether the action is checkable
+            checked (bool, optional): Whether the action is checked (if checkable)
+            
+        Returns:
+            QAction: The created action
+        """
+        action = QAction(text, self)
+        
+        # Set shortcut if provided
+        if shortcut:
+            action.setShortcut(shortcut)
+            
+        # Connect the callback
+        action.triggered.connect(callback)
+        
+        # Set the icon if provided
+        if icon_name:
+            fallback = self.style().standardIcon(fallback_icon) if fallback_icon else None
+            action.setIcon(get_icon(icon_name, fallback=fallback, textColor=icon_color))
+            
+        # Set checkable state if needed
+        if checkable:
+            action.setCheckable(True)
+            action.setChecked(checked)
+            
+        return action
+        
+    def createMenus(self):
+        """Create application menus (without menubar)"""
+        try:
+            # Get the theme's text color for icons
+            is_dark = ThemeManager.is_dark_mode()
+            icon_color = "#FFFFFF" if is_dark else "#000000"
+            
+            # File menu
+            self.file_menu = QMenu(self)
+            
+            # Add file actions
+            file_actions = [
+                self._create_action('New', self.newFile, 'Ctrl+N', 'new', 
+                                   self.style().StandardPixmap.SP_FileIcon, icon_color),
+                self._create_action('Open', self.openFile, 'Ctrl+O', 'open', 
+                                   self.style().StandardPixmap.SP_DialogOpenButton, icon_color),
+                self._create_action('Quick Open', self.showQuickOpen, 'Ctrl+P', 'quick_open',
+                                   self.style().StandardPixmap.SP_FileDialogListView, icon_color),
+                self._create_action('Save', self.saveFile, 'Ctrl+S', 'save', 
+                                   self.style().StandardPixmap.SP_DialogSaveButton, icon_color),
+                None,  # Separator
+                self._create_action('Next Buffer', self.nextBuffer, 'Ctrl+PgDown', 'next_buffer',
+                                   self.style().StandardPixmap.SP_ArrowRight, icon_color),
+                self._create_action('Previous Buffer', self.previousBuffer, 'Ctrl+PgUp', 'previous_buffer',
+                                   self.style().StandardPixmap.SP_ArrowLeft, icon_color),
+                self._create_action('Close Buffer', self.closeBuffer, 'Ctrl+W', 'close_buffer',
+                                   self.style().StandardPixmap.SP_DialogDiscardButton, icon_color),
+                None,  # Separator
+                self._create_action('Exit', self.close, 'Ctrl+Q', 'exit', 
+                                   self.style().StandardPixmap.SP_DialogCloseButton, icon_color)
+            ]
+            
+            for action in file_actions:
+                if action is None:
+                    self.file_menu.addSeparator()
+                else:
+                    self.file_menu.addAction(action)
+            
+            # Open buffers, listed when the submenu is shown
+            self.buffers_menu = QMenu('Buffers', self)
+            self.buffers_menu.aboutToShow.connect(self.buildBuffersMenu)
+            self.file_menu.insertMenu(file_actions[-1], self.buffers_menu)
+            self.file_menu.insertSeparator(file_actions[-1])
+            
+            # Edit menu
+            self.edit_menu = QMenu(self)
+            
+            # Add edit actions
+            edit_actions = [
+                self._create_action('Undo', self.undo, 'Ctrl+Z', 'undo', 
+                                   self.style().StandardPixmap.SP_ArrowBack, icon_color),
+                self._create_action('Redo', self.redo, 'Ctrl+Y', 'redo', 
+                                   self.style().StandardPixmap.SP_ArrowForward, icon_color),
+                None,  # Separator
+                self._create_action('Cut', self.cut, 'Ctrl+X', 'cut', 
+                                   self.style().StandardPixmap.SP_DialogResetButton, icon_color),
+                self._create_action('Copy', self.copy, 'Ctrl+C', 'copy', 
+                                   self.style().StandardPixmap.SP_FileLinkIcon, icon_color),
+                self._create_action('Paste', self.paste, 'Ctrl+V', 'paste', 
+                                   self.style().StandardPixmap.SP_ArrowDown, icon_color),
+                None,  # Separator
+                self._create_action('Find', self.showFindBar, 'Ctrl+F', 'find',
+                                   self.style().StandardPixmap.SP_FileDialogContentsView, icon_color),
+                self._create_action('Replace', self.showReplaceBar, 'Ctrl+H', 'replace',
+                                   self.style().StandardPixmap.SP_FileDialogDetailedView, icon_color),
+                self._create_action('Find in Files', self.showProjectSearch, 'Ctrl+Shift+F', 'find_in_files',
+                                   self.style().StandardPixmap.SP_DirOpenIcon, icon_color)
+            ]
+            
+            for action in edit_actions:
+                if action is None:
+                    self.edit_menu.addSeparator()
+                else:
+                    self.edit_menu.addAction(action)
+            
+            # Modes menu
+            self.modes_menu = QMenu(self)
+            
+            # Add refresh action first
+            refresh_action = self._create_action('Refresh Modes', self.refreshModes, 'Ctrl+R', 
+                                               'refresh', self.style().StandardPixmap.SP_BrowserReload, icon_color)
+            self.modes_menu.addAction(refresh_action)
+            self.modes_menu.addSeparator()
+            
+            # Mode entries are kept between rebuilds and only added or removed as modes come and go
+            self.mode_group = QActionGroup(self)
+            self.mode_group.setExclusive(True)
+            self._mode_actions = {}  # Dictionary of mode name (None for Standard Mode): QAction
+            
+            # Build the modes menu
+            self.buildModesMenu()
+            
+            # Themes menu
+            self.themes_menu = QMenu(self)
+            
+            # Add refresh action for themes
+            refresh_themes_action = self._create_action('Refresh Themes', self.refreshThemes, 'Ctrl+T', 
+                                                     'refresh', self.style().StandardPixmap.SP_BrowserReload, icon_color)
+            self.themes_menu.addAction(refresh_themes_action)
+            self.themes_menu.addSeparator()
+            
+            self.theme_group = QActionGroup(self)
+            self.theme_group.setExclusive(True)
+            self._theme_actions = {}  # Dictionary of theme name: QAction
+            
+            # Build the themes menu
+            self.buildThemesMenu()
+            
+            # Extensions menu
+            self.extensions_menu = QMenu(self)
+            self.extensions_menu.setToolTipsVisible(True)  # Tooltips carry hook timings
+            
+            # Add refresh action for extensions
+            refresh_extensions_action = self._create_action('Refresh Extensions', self.refreshExtensions, 'Ctrl+E', 
+                                                         'refresh', self.style().StandardPixmap.SP_BrowserReload, icon_color)
+            self.extensions_menu.addAction(refresh_extensions_action)
+            
+            # Watchdog option for extensions that keep exceeding their hook budgets
+            auto_disable_action = self._create_action('Auto-disable Slow Extensions',
+                                                      extension_manager.set_auto_disable_slow,
+                                                      checkable=True, checked=extension_manager.auto_disable_slow)
+            auto_disable_action.setToolTip('Turn off extensions whose hooks repeatedly exceed their time budget')
+            self.extensions_menu.addAction(auto_disable_action)
+            self.extensions_menu.addSeparator()
+            
+            self._extension_actions = {}  # Dictionary of extension name: QAction
+            self._no_extensions_action = self._create_action('No extensions found', lambda: None)
+            self._no_extensions_action.setEnabled(False)
+            
+            # Flag slow extensions in the menu the next time it opens
+            self._extensions_menu_stale = False
+            extension_manager.add_slow_hook_listener(self._onSlowExtensionHook)
+            self.destroyed.connect(lambda _=None, listener=self._onSlowExtensionHook:
+                                   extension_manager.remove_slow_hook_listener(listener))
+            
+            # Build the extensions menu
+            self.buildExtensionsMenu()
+            
+        except Exception as e:
+            self._show_error("Failed to create menus", e)
+    
+    def _showMenu(self, button, menu):
+        """Generic function to show a menu under a button and reset its state when menu closes"""
+        # Position the menu below the button
+        pos = button.mapToGlobal(QPoint(0, button.height()))
+        menu.popup(pos)
+        # Connect aboutToHide signal to reset button state
+        menu.aboutToHide.connect(lambda: self.resetButtonState(button))
+    
+    def showFileMenu(self):
+        """Show the file menu when the file button is clicked"""
+        self._showMenu(self.file_button, self.file_menu)
+    
+    def showEditMenu(self):
+        """Show the edit menu when the edit button is clicked"""
+        self._showMenu(self.edit_button, self.edit_menu)
+    
+    def showModesMenu(self):
+        """Show the modes menu when the modes button is clicked"""
+        self._showMenu(self.modes_button, self.modes_menu)
+    
+    def showThemesMenu(self):
+        """Show the themes menu when the themes button is clicked"""
+        self._showMenu(self.themes_button, self.themes_menu)
+    
+    def showExtensionsMenu(self):
+        """Show the extensions menu when the extensions button is clicked"""
+        if self._extensions_menu_stale:
+            self.buildExtensionsMenu()
+        self._showMenu(self.extensions_button, self.extensions_menu)
+    
+    def _onSlowExtensionHook(self, extension_name, hook_name, elapsed_ms, budget_ms, disabled):
+        """Watchdog listener: rebuild the extensions menu (slow flags, checked state) before it is next shown"""
+        self._extensions_menu_stale = True
+        if disabled:
+            # Stop collecting edits if the disabled extension was the last on_text_changed subscriber
+            self.text_changes.follow()
+    
+    def buildBuffersMenu(self):
+        """Build the list of open buffers, with dirty markers and memory use"""
+        try:
+            self.buffers_menu.clear()
+            buffer_group = QActionGroup(self.buffers_menu)
+            buffer_group.setExclusive(True)
+            
+            for buffer in self.buffers:
+                marker = "*" if buffer.is_dirty() else ""
+                action = QAction(f"{buffer.display_name}{marker}", self.buffers_menu)
+                action.setCheckable(True)
+                action.setChecked(buffer.id == self.buffers.active_id)
+                if buffer.file_path:
+                    action.setToolTip(buffer.file_path)
+                action.triggered.connect(lambda checked, buffer_id=buffer.id: self.switchToBuffer(buffer_id))
+                buffer_group.addAction(action)
+                self.buffers_menu.addAction(action)
+            
+            # Memory accounting footer
+            resident, stashed, paged = self.buffers.memory_usage()
+            summary = f"{resident / (1024 * 1024):.1f} MB resident, {stashed / (1024 * 1024):.1f} MB compressed"
+            if paged:
+                summary += f", {paged} paged out"
+            self.buffers_menu.addSeparator()
+            info_action = self.buffers_menu.addAction(summary)
+            info_action.setEnabled(False)
+        except Exception as e:
+            print(f"Error building buffers menu: {str(e)}")
+            traceback.print_exc()
+    
+    def _syncMenuActions(self, menu, actions, names, create, group=None):
+        """Bring a plugin submenu in line with names, reusing the actions it already has
+        
+        actions is a dictionary of name: QAction for the entries after the menu's fixed
+        items. Entries whose plugin is gone are removed, create(name) builds actions for
+        new ones, and the entries are kept in the order of names.
+        """
+        wanted = set(names)
+        for name in [name for name in actions if name not in wanted]:
+            action = actions.pop(name)
+            menu.removeAction(action)
+            if group is not None:
+                group.removeAction(action)
+            action.deleteLater()
+        
+        added = False
+        for name in names:
+            if name not in actions:
+                action = create(name)
+                if group is not None:
+                    group.addAction(action)
+                actions[name] = action
+                added = True
+        
+        # Re-adding an action moves it to the end, so this only reorders
+        if added or list(actions) != list(names):
+            ordered = [(name, actions[name]) for name in names]
+            actions.clear()
+            for name, action in ordered:
+                actions[name] = action
+                menu.addAction(action)
+    
+    def buildModesMenu(self):
+        """Build or update the modes menu items"""
+        try:
+            def create(mode_name):
+                if mode_name is None:
+                    return self._create_action('Standard Mode', lambda: self.switchToMode(None), checkable=True)
+                return self._create_action(mode_name, lambda checked, name=mode_name: self.switchToMode(name),
+                                           checkable=True)
+            
+            # Standard mode first, then the available modes
+            names = [None] + mode_manager.get_mode_names()
+            self._syncMenuActions(self.modes_menu, self._mode_actions, names, create, self.mode_group)
+            
+            for mode_name, mode_action in self._mode_actions.items():
+                if mode_name is not None:
+                    mode_action.setToolTip(mode_manager.get_mode_description(mode_name))
+                mode_action.setChecked(self.current_mode == mode_name)
+        except Exception as e:
+            self._show_error("Failed to build modes menu", e)
+    
+    def buildThemesMenu(self):
+        """Build or update the themes menu items"""
+        try:
+            def create(theme_name):
+                return self._create_action(theme_name, lambda checked, name=theme_name: self.switchTheme(name),
+                                           checkable=True)
+            
+            self._syncMenuActions(self.themes_menu, self._theme_actions, ThemeManager.get_available_themes(),
+                                  create, self.theme_group)
+            
+            current_theme = ThemeManager.get_current_theme()
+            for theme_name, theme_action in self._theme_actions.items():
+                theme_action.setToolTip(ThemeManager.get_theme_description(theme_name))
+                theme_action.setChecked(current_theme == theme_name)
+        except Exception as e:
+            self._show_error("Failed to build themes menu", e)
+    
+    def buildExtensionsMenu(self):
+        """Build or update the extensions menu items"""
+        try:
+            self._extensions_menu_stale = False
+            
+            def create(extension_name):
+                extension_action = self._create_action(
+                    extension_name,
+                    lambda checked, name=extension_name: self.toggleExtension(name, checked),
+                    checkable=True
+                )
+                extension_action.setData(extension_name)
+                return extension_action
+            
+            extension_names = extension_manager.get_available_extensions()
+            self.extensions_menu.removeAction(self._no_extensions_action)
+            self._syncMenuActions(self.extensions_menu, self._extension_actions, extension_names, create)
+            
+            for extension_name, extension_action in self._extension_actions.items():
+                extension_desc = extension_manager.get_extension_description(extension_name)
+                
+                # Flag extensions whose hooks keep going over budget
+                label = extension_name
+                stats = extension_manager.get_extension_stats(extension_name)
+                if extension_manager.is_extension_slow(extension_name):
+                    label = f"{extension_name} ⚠ slow"
+                    slow_hooks = ", ".join(f"{hook} {ms:.0f} ms (budget {extension_manager.get_hook_budget(hook):.0f} ms)"
+                                           for hook, ms in stats["slow_hooks"].items())
+                    extension_desc += f"\nSlow hooks: {slow_hooks}"
+                if stats:
+                    extension_desc += f"\np50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms over {stats['calls']} calls"
+                
+                extension_action.setText(label)
+                extension_action.setToolTip(extension_desc)
+                extension_action.setChecked(extension_manager.is_extension_active(extension_name))
+            
+            # Status entry if empty
+            if not extension_names:
+                self.extensions_menu.addAction(self._no_extensions_action)
+        except Exception as e:
+            self._show_error("Failed to build extensions menu", e)
+    
+    def refreshModes(self):
+        """Refresh the available modes"""
+        try:
+            # Remember current mode
+            current_mode = self.current_mode
+            
+            # Rescan for modes
+            mode_manager.discover_modes()
+            
+            # Drop editors built from modes that no longer exist
+            self.mode_editors.evict_missing(mode_manager.get_mode_names())
+            
+            # Rebuild the modes menu
+            self.buildModesMenu()
+            
+            # Get debug information
+            modes = mode_manager.get_mode_names()
+            debug_info = f"Found {len(modes)} editor modes:\n"
+            if modes:
+                for mode in modes:
+                    debug_info += f"• {mode}: {mode_manager.get_mode_description(mode)}\n"
+            else:
+                debug_info += "No modes found. Check the paths:\n"
+                debug_info += f"Working directory: {os.getcwd()}\n"
+                src_dir = os.path.dirname(os.path.abspath(__file__))
+                app_dir = os.path.dirname(src_dir)
+                modes_dir = os.path.join(app_dir, "mods", "modes")
+                debug_info += f"Expected modes directory: {modes_dir}\n"
+                if os.path.exists(modes_dir):
+                    debug_info += "Directory exists. Contents:\n"
+                    for f in os.listdir(modes_dir):
+                        debug_info += f"  - {f}\n"
+                else:
+                    debug_info += "Directory does not exist!\n"
+                    
+                # Try the current working directory path
+                modes_dir = os.path.join(os.getcwd(), "mods", "modes")
+                debug_info += f"Alternative modes directory: {modes_dir}\n"
+                if os.path.exists(modes_dir):
+                    debug_info += "Directory exists. Contents:\n"
+                    for f in os.listdir(modes_dir):
+                        debug_info += f"  - {f}\n"
+                else:
+                    debug_info += "Directory does not exist!\n"
+            
+            # Show a message about the refresh with debug info
+            QMessageBox.information(self, 'Modes Refreshed', debug_info)
+            
+            # If current mode is no longer available, switch to standard
+            if current_mode is not None and current_mode not in mode_manager.get_mode_names():
+                self.switchToMode(None)
+                
+        except Exception as e:
+            self._show_error("Failed to refresh modes", e)
+    
+    def refreshThemes(self):
+        """Refresh the available themes"""
+        try:
+            # Remember current theme
+            current_theme = ThemeManager.get_current_theme()
+            
+            # Rescan for themes
+            ThemeManager.discover_themes()
+            FileManager.invalidate_dialog_styles()
+            
+            # Rebuild the themes menu
+            self.buildThemesMenu()
+            
+            # Get debug information
+            themes = ThemeManager.get_available_themes()
+            debug_info = f"Found {len(themes)} themes:\n"
+            if themes:
+                for theme in themes:
+                    debug_info += f"• {theme}: {ThemeManager.get_theme_description(theme)}\n"
+            else:
+                debug_info += "No themes found. Check the paths:\n"
+                debug_info += f"Working directory: {os.getcwd()}\n"
+                src_dir = os.path.dirname(os.path.abspath(__file__))
+                app_dir = os.path.dirname(src_dir)
+                themes_dir = os.path.join(app_dir, "mods", "themes")
+                debug_info += f"Expected themes directory: {themes_dir}\n"
+                if os.path.exists(themes_dir):
+                    debug_info += "Directory exists. Contents:\n"
+                    for f in os.listdir(themes_dir):
+                        debug_info += f"  - {f}\n"
+                else:
+                    debug_info += "Directory does not exist!\n"
+            
+            # Show a message about the refresh with debug info
+            QMessageBox.information(self, 'Themes Refreshed', debug_info)
+            
+            # If current theme is no longer available, switch to default
+            if current_theme not in ThemeManager.get_available_themes():
+                self.switchTheme("Default")
+                
+        except Exception as e:
+            self._show_error("Failed to refresh themes", e)
+    
+    def refreshExtensions(self):
+        """Refresh the available extensions"""
+        try:
+            # Re-initialize the extension manager (discovers new extensions)
+            extension_manager._discover_extensions()
+            
+            # Rebuild the extensions menu
+            self.buildExtensionsMenu()
+            
+            # Get debug information
+            extensions = extension_manager.get_available_extensions()
+            debug_info = f"Found {len(extensions)} extensions:\n"
+            if extensions:
+                for ext in extensions:
+                    is_active = extension_manager.is_extension_active(ext)
+                    status = "Active" if is_active else "Inactive"
+                    debug_info += f"• {ext}: {extension_manager.get_extension_description(ext)} ({status})\n"
+            else:
+                debug_info += "No extensions found. Check the paths:\n"
+                debug_info += f"Working directory: {os.getcwd()}\n"
+                src_dir = os.path.dirname(os.path.abspath(__file__))
+                app_dir = os.path.dirname(src_dir)
+                extensions_dir = os.path.join(app_dir, "mods", "extensions")
+                debug_info += f"Expected extensions directory: {extensions_dir}\n"
+                if os.path.exists(extensions_dir):
+                    debug_info += "Directory exists. Contents:\n"
+                    for f in os.listdir(extensions_dir):
+                        debug_info += f"  - {f}\n"
+                else:
+                    debug_info += "Directory does not exist!\n"
+            
+            # Show a message about the refresh with debug info
+            QMessageBox.information(self, 'Extensions Refreshed', debug_info)
+            
+        except Exception as e:
+            self._show_error("Failed to refresh extensions", e)
+    
+    def switchTheme(self, theme_name):
+        """Switch to the specified theme"""
+        try:
+            if ThemeManager.load_theme(theme_name):
+                # Apply the new theme
+                self.applyTheme()
+                
+                # Update window title to show current theme
+                file_name = "Untitled" if self.current_file is None else os.path.basename(self.current_file)
+                mode_display = "Standard Mode" if self.current_mode is None else self.current_mode
+                self.setWindowTitle(f'{self.app_name} - {file_name} ({mode_display}) [{theme_name}]')
+                
+                # Update info label
+                self.updateInfoLabel()
+                
+                # If the current mode has a post_theme_change hook, call it directly
+                if self.current_mode is not None:
+                    mode_module = mode_manager.modes.get(self.current_mode)
+                    if mode_module and hasattr(mode_module, 'post_theme_change'):
+                        print(f"Calling mode-specific post_theme_change for {self.current_mode}")
+                        mode_module.post_theme_change(self, theme_name)
+                
+                # Call post_theme_change hook for extensions
+                extension_manager.call_hook_for_all('post_theme_change', self, theme_name)
+                
+                # Show a message indicating the theme change with styled dialog
+                QMessageBox.information(self, 'Theme Changed', f'Switched to the {theme_name} theme')
+        except Exception as e:
+            self._show_error(f"Failed to switch to theme: {theme_name}", e)
+    
+    def switchToMode(self, mode_name):
+        """Switch to the specified editor mode"""
+        try:
+            current_text = ""
+            
+            # Get text from current editor
+            if self.current_mode is None:
+                current_text = self.text_edit.toPlainText()
+            elif self.current_mode in self.mode_editors:
+                current_text = self.mode_editors[self.current_mode].toPlainText()
+            
+            # Hide all editors
+            self.text_edit.setVisible(False)
+            for editor in self.mode_editors.values():
+                editor.setVisible(False)
+            
+            if mode_name is None:
+                # Switch to standard mode
+                self.text_edit.setVisible(True)
+                self.buffers.active.set_text(current_text)
+                self.mode_editors.set_active(None)
+                self.current_mode = None
+            else:
+                # Switch to custom mode, creating its editor on first use
+                editor = self.mode_editors.acquire(mode_name)
+                
+                # Show the editor for this mode
+                editor.setVisible(True)
+                editor.setPlainText(current_text)
+                self.current_mode = mode_name
+                self.last_custom_mode = mode_name
+            
+            # Reapply the theme to apply any mode-specific color overrides
+            self.applyTheme()
+            
+            # Update window title to reflect mode
+            mode_display = "Standard Mode" if mode_name is None else mode_name
+            file_name = "Untitled" if self.current_file is None else os.path.basename(self.current_file)
+            theme_name = ThemeManager.get_current_theme()
+            self.setWindowTitle(f'{self.app_name} - {file_name} ({mode_display}) [{theme_name}]')
+            
+            # Update info label
+            self.updateInfoLabel()
+            
+            self.text_changes.follow()
+            
+            # Call post_mode_change hook for extensions
+            extension_manager.call_hook_for_all('post_mode_change', self, mode_name)
+            
+        except Exception as e:
+            self._show_error(f"Failed to switch to mode: {mode_name}", e)
+            
+    def undo(self):
+        """Undo the last action in the active editor"""
+        try:
+            if self.current_mode is None:
+                self.text_edit.undo()
+            elif self.current_mode in self.mode_editors:
+                self.mode_editors[self.current_mode].undo()
+        except Exception as e:
+            self._show_error("Undo operation failed", e)
+            
+    def redo(self):
+        """Redo the last undone action in the active editor"""
+        try:
+            if self.current_mode is None:
+                self.text_edit.redo()
+            elif self.current_mode in self.mode_editors:
+                self.mode_editors[self.current_mode].redo()
+        except Exception as e:
+            self._show_error("Redo operation failed", e)
+            
+    def cut(self):
+        """Cut selected text in the active editor"""
+        try:
+            if self.current_mode is None:
+                self.text_edit.cut()
+            elif self.current_mode in self.mode_editors:
+                self.mode_editors[self.current_mode].cut()
+        except Exception as e:
+            self._show_error("Cut operation failed", e)
+            
+    def copy(self):
+        """Copy selected text in the active editor"""
+        try:
+            if self.current_mode is None:
+                self.text_edit.copy()
+            elif self.current_mode in self.mode_editors:
+                self.mode_editors[self.current_mode].copy()
+        except Exception as e:
+            self._show_error("Copy operation failed", e)
+            
+    def paste(self):
+        """Paste clipboard content in the active editor"""
+        try:
+            if self.current_mode is None:
+                self.text_edit.paste()
+            elif self.current_mode in self.mode_editors:
+                self.mode_editors[self.current_mode].paste()
+        except Exception as e:
+            self._show_error("Paste operation failed", e)
+        
+    def showFindBar(self):
+        """Show the find bar for the active editor"""
+        try:
+            self.find_bar.showFind(replace=False)
+        except Exception as e:
+            self._show_error("Failed to open find bar", e)
+    
+    def showReplaceBar(self):
+        """Show the find bar with replace controls for the active editor"""
+        try:
+            self.find_bar.showFind(replace=True)
+        except Exception as e:
+            self._show_error("Failed to open replace bar", e)
+        
+    def showProjectSearch(self):
+        """Show the Find in Files panel, searching the current file's directory by default"""
+        try:
+            if getattr(self, 'project_search', None) is None:
+                # Imported on first use so the process pool stays out of startup
+                from project_search import ProjectSearchDialog
+                self.project_search = ProjectSearchDialog(self)
+            directory = os.path.dirname(self.current_file) if self.current_file else os.getcwd()
+            self.project_search.showPanel(directory)
+        except Exception as e:
+            self._show_error("Failed to open project search", e)
+    
+    def gotoLine(self, line_number, column=0):
+        """Move the cursor of the active editor to a 1-based line"""
+        editor = self.getCurrentEditor()
+        if not hasattr(editor, 'textCursor'):
+            return
+        block = editor.document().findBlockByNumber(max(0, line_number - 1))
+        if not block.isValid():
+            return
+        cursor = editor.textCursor()
+        cursor.setPosition(block.position() + min(column, max(0, block.length() - 1)))
+        editor.setTextCursor(cursor)
+        editor.ensureCursorVisible()
+        editor.setFocus()
+        
+    def getCurrentEditor(self):
+        """Return the currently active editor widget"""
+        if self.current_mode is None:
+            return self.text_edit
+        elif self.current_mode in self.mode_editors:
+            return self.mode_editors[self.current_mode]
+        return self.text_edit
+        
+    def applyTheme(self):
+        """Apply theme settings to the application"""
+        try:
+            is_dark = ThemeManager.is_dark_mode()
+            
+            # Get the current theme's compiled colors
+            theme_name = ThemeManager.get_current_theme()
+            theme_colors = ThemeManager.get_theme_colors(is_dark)
+                
+            # Apply mode-specific color overrides if available
+            if self.current_mode is not None:
+                mode_overrides = mode_manager.get_theme_color_overrides(self.current_mode)
+                if mode_overrides:
+                    # Create a copy of theme_colors and update it with mode overrides
+                    theme_colors = theme_colors.copy()
+                    theme_colors.update(mode_overrides)
+                    print(f"Applied color overrides for {self.current_mode} mode")
+                
+            # Check if theme wants transparency
+            wants_transparency = ThemeManager.uses_transparency()
+            
+            # Apply transparency setting
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, wants_transparency)
+            
+            # Set the background color based on transparency
+            if wants_transparency:
+                # For transparent themes, use gradient from stylesheet
+                bg_style = """
+                    QWidget#backgroundWidget {
+                        background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                                      stop:0 %s,
+                                      stop:1 %s);
+                    }
+                """ % (
+                    theme_colors.get("window_bg_gradient_start", "rgba(0,0,0,0.9)"),
+                    theme_colors.get("window_bg_gradient_end", "rgba(10,10,26,0.9)")
+                )
+            else:
+                # For solid themes, use a solid color
+                solid_bg = theme_colors.get("background", "#000000" if is_dark else "#FFFFFF")
+                bg_style = f"""
+                    QWidget#backgroundWidget {{
+                        background-color: {solid_bg};
+                    }}
+                """
+            
+            # Set object name for the background widget so we can target it with CSS
+            self.background_widget.setObjectName("backgroundWidget")
+            
+            # Apply style directly to background widget
+            if self.background_widget.styleSheet() != bg_style:
+                self.background_widget.setStyleSheet(bg_style)
+            
+            # Get the general stylesheet for the application
+            stylesheet = ThemeManager.get_stylesheet(is_dark)
+            
+            # Apply stylesheet to application; setting it re-polishes every widget,
+            # so only do so when it actually changed (e.g. not on plain mode switches)
+            app = QApplication.instance()
+            palette = ThemeManager.get_palette(is_dark)
+            if app.palette() != palette:
+                app.setPalette(palette)
+            if app.styleSheet() != stylesheet:
+                app.setStyleSheet(stylesheet)
+            
+            # Update all UI elements
+            self.updateUIElementsForTheme(theme_colors)
+            
+            print(f"Applied theme: {theme_name} (Transparency: {wants_transparency})")
+            
+        except Exception as e:
+            self._show_error(f"Failed to apply theme: {str(e)}", e)
+            import traceback
+            traceback.print_exc()
+    
+    def updateUIElementsForTheme(self, colors):
+        """Update UI elements to match the current theme"""
+        try:
+            # Helper function to apply updateStyle to a list of components
+            def update_style_for_components(components):
+                for component in components:
+                    component.updateStyle()
+            
+            # Helper function to apply shadow effect to a list of components
+            def apply_shadow_to_components(components):
+                for component in components:
+                    ThemeManager.apply_shadow_effect(component)
+            
+            # Update all circular menu buttons
+            menu_buttons = [
+                self.file_button, self.edit_button, self.modes_button, 
+                self.themes_button, self.extensions_button
+            ]
+            update_style_for_components(menu_buttons)
+            
+            # Style the file label
+            text_color = colors.get("text", "#ffffff")
+            secondary_color = colors.get("accent", "#64ffda")
+            
+            self.file_label.setStyleSheet(f"""
+                QLabel {{
+                    color: {text_color};
+                    font-weight: bold;
+                    font-size: 12pt;
+                    padding: 5px 5px 0px 5px;
+                }}
+            """)
+            
+            # Style the info label with faded text
+            self.info_label.setStyleSheet(f"""
+                QLabel {{
+                    color: {secondary_color};
+                    font-size: 9pt;
+                    padding: 0px 5px 5px 5px;
+                    opacity: 0.7;
+                }}
+            """)
+            
+            # Apply shadow effects to all editors
+            editors = [self.text_edit] + list(self.mode_editors.values())
+            apply_shadow_to_components(editors)
+            
+            # Apply shadow effects to all buttons and labels
+            ui_elements = menu_buttons + [self.file_label]
+            apply_shadow_to_components(ui_elements)
+            
+        except Exception as e:
+            self._show_error(f"Failed to update UI elements: {str(e)}", e)
+    
+    def newFile(self):
+        """Create a new file in its own buffer"""
+        try:
+            # An untouched untitled buffer is already what we want
+            if self.isPristine():
+                return
+            
+            buffer = self.buffers.new_buffer()
+            self.switchToBuffer(buffer.id)
+        except Exception as e:
+            self._show_error("Failed to create new file", e)
+        
+    def openFile(self):
+        """Open a file"""
+        try:
+            file_path = FileManager.get_open_file_path(self)
+            if file_path:
+                self.openFilePath(file_path)
+        except Exception as e:
+            self._show_error("Failed to open file", e)
+    
+    def showQuickOpen(self):
+        """Show the fuzzy file picker for the current file's directory"""
+        try:
+            if getattr(self, 'quick_open', None) is None:
+                from quick_open import QuickOpenPalette
+                self.quick_open = QuickOpenPalette(self)
+            root = os.path.dirname(self.current_file) if self.current_file else os.getcwd()
+            self.quick_open.showPalette(root)
+        except Exception as e:
+            self._show_error("Failed to open quick open", e)
+    
+    def isPristine(self):
+        """Check if the window is an untouched, untitled document (safe to reuse)"""
+        return self.current_file is None and not self.getCurrentEditor().toPlainText()
+    
+    def openFilePath(self, file_path):
+        """Open the given file in a buffer, or switch to it if it is already open"""
+        try:
+            if file_path:
+                already_open = self.buffers.find(file_path) is not None
+                
+                # Replace an untouched untitled buffer instead of keeping it around
+                replaced_id = self.buffers.active_id if self.isPristine() else None
+                
+                buffer = self.buffers.open(file_path)
+                self.switchToBuffer(buffer.id)
+                if replaced_id is not None and replaced_id != buffer.id:
+                    self.buffers.close(replaced_id)
+                
+                # Call post_load_file hook for extensions
+                if not already_open:
+                    extension_manager.call_hook_for_all('post_load_file', self, file_path)
+        except Exception as e:
+            self._show_error("Failed to open file", e)
+    
+    def _showBufferDocument(self, buffer):
+        """Show a buffer's document in the standard editor"""
+        buffer.document.setDefaultFont(self.text_edit.font())
+        self.text_edit.setDocument(buffer.document)
+        cursor = self.text_edit.textCursor()
+        cursor.setPosition(min(buffer.cursor_position, buffer.document.characterCount() - 1))
+        self.text_edit.setTextCursor(cursor)
+    
+    def _syncModeEditorToBuffer(self):
+        """Copy a custom mode editor's text back into the active buffer"""
+        if self.current_mode is not None and self.current_mode in self.mode_editors:
+            self.buffers.active.set_text(self.mode_editors[self.current_mode].toPlainText())
+    
+    def switchToBuffer(self, buffer_id):
+        """Show another open buffer without re-reading it from disk"""
+        try:
+            previous = self.buffers.active
+            if previous is not None:
+                if previous.id == buffer_id:
+                    return
+                self._syncModeEditorToBuffer()
+                previous.cursor_position = self.text_edit.textCursor().position()
+            
+            buffer = self.buffers.activate(buffer_id)
+            self._showBufferDocument(buffer)
+            
+            # Mode editors keep their own document, so hand them the text
+            if self.current_mode is not None and self.current_mode in self.mode_editors:
+                self.mode_editors[self.current_mode].setPlainText(buffer.text())
+            
+            self.current_file = buffer.file_path
+            self.text_changes.follow()
+            mode_display = "Standard Mode" if self.current_mode is None else self.current_mode
+            theme_name = ThemeManager.get_current_theme()
+            self.setWindowTitle(f'{self.app_name} - {buffer.display_name} ({mode_display}) [{theme_name}]')
+            
+            # Update the file label
+            self.updateFileLabel()
+        except Exception as e:
+            self._show_error("Failed to switch buffer", e)
+    
+    def nextBuffer(self):
+        """Switch to the next open buffer"""
+        if len(self.buffers) > 1:
+            self.switchToBuffer(self.buffers.neighbour(self.buffers.active_id, 1))
+    
+    def previousBuffer(self):
+        """Switch to the previous open buffer"""
+        if len(self.buffers) > 1:
+            self.switchToBuffer(self.buffers.neighbour(self.buffers.active_id, -1))
+    
+    def closeBuffer(self):
+        """Close the active buffer, offering to save unsaved changes"""
+        try:
+            self._syncModeEditorToBuffer()
+            buffer = self.buffers.active
+            if buffer.is_dirty():
+                reply = QMessageBox.question(
+                    self,
+                    'Close Buffer',
+                    f'Save changes to {buffer.display_name}?',
+                    QMessageBox.StandardButton.Save |
+                    QMessageBox.StandardButton.Discard |
+                    QMessageBox.StandardButton.Cancel
+                )
+                if reply == QMessageBox.StandardButton.Cancel:
+                    return
+                if reply == QMessageBox.StandardButton.Save:
+                    self.saveFile()
+                    if buffer.is_dirty():
+                        return
+            
+            # Always keep one buffer open
+            if len(self.buffers) == 1:
+                replacement = self.buffers.new_buffer()
+            else:
+                replacement = self.buffers.buffers[self.buffers.neighbour(buffer.id, -1)]
+            self.switchToBuffer(replacement.id)
+            self.buffers.close(buffer.id)
+        except Exception as e:
+            self._show_error("Failed to close buffer", e)
+                
+    def saveFile(self):
+        """Save the current file"""
+        try:
+            current_editor = self.getCurrentEditor()
+            
+            if hasattr(current_editor, 'toPlainText'):
+                content = current_editor.toPlainText()
+            else:
+                content = current_editor.toHtml() if hasattr(current_editor, 'toHtml') else ""
+            
+            # Call pre_save_file hook for extensions
+            extension_manager.call_hook_for_all('pre_save_file', self, self.current_file, content)
+            
+            buffer = self.buffers.active
+            if not self.current_file:
+                file_path = FileManager.get_save_file_path(self)
+                if not file_path:
+                    return
+                self.buffers.set_file_path(buffer, file_path)
+                self.current_file = buffer.file_path
+            
+            FileManager.write_file(self.current_file, content)
+            buffer.mark_saved(content)
+            mode_display = "Standard Mode" if self.current_mode is None else self.current_mode
+            theme_name = ThemeManager.get_current_theme()
+            self.setWindowTitle(f'{self.app_name} - {os.path.basename(self.current_file)} ({mode_display}) [{theme_name}]')
+            
+            # Update the file label
+            self.updateFileLabel()
+            
+            # Update the info label
+            self.updateInfoLabel()
+        except Exception as e:
+            self._show_error("Failed to save file", e)
+                
+    def loadSettings(self):
+        """Load application settings"""
+        try:
+            settings = settings_service
+            geometry = settings.value('geometry')
+            if geometry:
+                self.restoreGeometry(geometry)
+            
+            budget_mb = settings.value('buffer_memory_budget_mb', DEFAULT_MEMORY_BUDGET // (1024 * 1024), type=int)
+            self.buffers.memory_budget = budget_mb * 1024 * 1024
+            
+            # Build the most recently used mode's editor once startup has settled,
+            # so the first switch to it is instant
+            self.last_custom_mode = settings.value('last_custom_mode', None)
+            prewarm = settings.value('prewarm_last_mode', True, type=bool)
+            if prewarm and self.last_custom_mode in mode_manager.get_mode_names():
+                self.mode_editors.prewarm(self.last_custom_mode, delay=1000)
+                
+            # Always start in Standard Mode
+            # Clear any previously saved mode. The editor is empty and initUI already
+            # shows it, so there's no need to go through switchToMode (and restyle)
+            self.current_mode = None
+            self.mode_editors.set_active(None)
+            self.text_edit.setVisible(True)
+            extension_manager.call_hook_for_all('post_mode_change', self, None)
+            
+            # Update menu to reflect Standard Mode is active
+            self._mode_actions[None].setChecked(True)
+        except Exception as e:
+            self._show_error("Failed to load settings", e)
+            
+    def checkForRecoveryFile(self):
+        """Check for and load buffers left unsaved by a previous session"""
+        try:
+            entries = find_recovery_files()
+            if entries:
+                # Ask user if they want to recover the unsaved content
+                count = len(entries)
+                documents = "an unsaved document" if count == 1 else f"{count} unsaved documents"
+                reply = QMessageBox.question(
+                    self, 
+                    'Recover Unsaved Content',
+                    f'HyprText found {documents} from a previous session. Would you like to recover them?',
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                
+                if reply == QMessageBox.StandardButton.Yes:
+                    # Each recovered document gets its own buffer, reusing the untouched startup one
+                    replaced_id = self.buffers.active_id if self.isPristine() else None
+                    buffer = None
+                    for _, entry in entries:
+                        file_path = entry.get("file_path")
+                        if file_path and os.path.exists(file_path):
+                            buffer = self.buffers.open(file_path)
+                        else:
+                            buffer = self.buffers.new_buffer()
+                        buffer.set_text(entry["content"])
+                    
+                    self.switchToBuffer(buffer.id)
+                    if replaced_id is not None and replaced_id != buffer.id:
+                        self.buffers.close(replaced_id)
+                    
+                    # Update the file label
+                    if self.current_file is None:
+                        self.file_label.setText(f"Recovered Content -- Spike's HyprText")
+                    
+                    # Update the info label
+                    self.updateInfoLabel()
+                    
+                    # Notify the user
+                    QMessageBox.information(
+                        self,
+                        'Content Recovered',
+                        'Unsaved content has been successfully recovered.'
+                    )
+                
+                # Delete the recovery files regardless of choice
+                for path, _ in entries:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        except Exception as e:
+            self._show_error(f"Failed to check for recovery file: {str(e)}", e)
+
+    def closeEvent(self, event):
+        """Handle window close event"""
+        try:
+            # Call pre_close hook for active extensions
+            extension_manager.call_hook_for_all('pre_close', self)
+            
+            # Save application settings
+            settings = settings_service
+            settings.setValue('geometry', self.saveGeometry())
+            settings.setValue('last_mode', self.current_mode)
+            settings.setValue('last_custom_mode', self.last_custom_mode)
+            
+            # Keep every buffer with unsaved content for the next session, not just the active one
+            self._syncModeEditorToBuffer()
+            for buffer in self.buffers:
+                try:
+                    current_text = buffer.text()
+                    if current_text.strip() and buffer.is_dirty():
+                        tmp_file_path = write_recovery_file(buffer, current_text, f"{os.getpid()}-{self.window_id}")
+                        print(f"Unsaved content of {buffer.display_name} saved to {tmp_file_path}")
+                except Exception as save_error:
+                    print(f"Failed to save temporary content of {buffer.display_name}: {str(save_error)}")
+            
+            # Remove cache files of paged-out buffers
+            self.buffers.shutdown()
+            
+            event.accept()
+        except Exception as e:
+            self._show_error("Failed to save settings", e)
+            event.accept()  # Accept anyway to allow closing
+    
+    def isContentModified(self):
+        """Check if the content has been modified since last save"""
+        try:
+            if self.current_file is None:
+                return False
+            
+            # Get current content
+            current_text = ""
+            if self.current_mode is None:
+                current_text = self.text_edit.toPlainText()
+            elif self.current_mode in self.mode_editors:
+                current_text = self.mode_editors[self.current_mode].toPlainText()
+            
+            # Compare with the hash recorded when the buffer was loaded or saved
+            return self.buffers.active.is_content_modified(current_text)
+        except Exception:
+            # If any error occurs, assume content is modified
+            return True
+
+    def _show_error(self, message, exception=None):
+        """Display an error message dialog"""
+        error_details = str(exception) if exception else ""
+        if exception:
+            traceback.print_exc()
+        QMessageBox.critical(self, 'Error', f"{message}: {error_details}")
+
+    def topBarMousePressEvent(self, event):
+        """Handle mouse press on the top bar to enable window dragging"""
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.drag_position = event.globalPosition().toPoint() - self.frameGeometry().topLeft()
+            event.accept()
+
+    def topBarMouseMoveEvent(self, event):
+        """Handle mouse move on the top bar to move the window"""
+        if event.buttons() & Qt.MouseButton.LeftButton and self.drag_position is not None:
+            self.move(event.globalPosition().toPoint() - self.drag_position)
+            event.accept()
+
+    def updateFileLabel(self):
+        """Update the file name label in the center of the top bar"""
+        if self.current_file is None:
+            self.file_label.setText("New File -- Spike's HyprText")
+        else:
+            file_name = os.path.basename(self.current_file)
+            self.file_label.setText(f"{file_name} -- Spike's HyprText")
+        
+        # Also update the info label
+        self.updateInfoLabel()
+
+    def updateInfoLabel(self):
+        """Update the info label with current mode and theme"""
+        try:
+            mode_display = "Standard Mode" if self.current_mode is None else self.current_mode
+            theme_name = ThemeManager.get_current_theme()
+            self.info_label.setText(f"{mode_display} -- in {theme_name}")
+        except Exception as e:
+            print(f"Failed to update info label: {str(e)}")
+
+    def applyExtensionLayouts(self):
+        """Apply layout modifications from active extensions"""
+        try:
+            extension_manager.call_hook_for_all('modify_layout', self)
+        except Exception as e:
+            print(f"Error applying extension layouts: {str(e)}")
+            traceback.print_exc()
+
+    def toggleExtension(self, extension_name, checked):
+        """Toggle an extension on or off"""
+        try:
+            # Check current states before toggling
+            was_active = extension_manager.is_extension_active(extension_name)
+            
+            # Toggle the extension individually - this calls cleanup for this specific extension
+            is_active = extension_manager.toggle_extension(extension_name, self)
+            
+            # Don't refresh all extensions, only handle the one that changed
+            if is_active:
+                # Extension was activated - apply its layout modifications only
+                print(f"Applying layout for newly activated extension: {extension_name}")
+                extension_manager._call_hook(extension_name, 'modify_layout', self)
+            else:
+                # Extension was deactivated - we don't need to do anything else 
+                # since the cleanup hook should have restored its changes
+                pass
+            
+            # Start or stop collecting edits if the extension implements on_text_changed
+            self.text_changes.follow()
+            
+            # Show message
+            QMessageBox.information(self, 
+                'Extension ' + ('Activated' if is_active else 'Deactivated'), 
+                f'The "{extension_name}" extension has been {"activated" if is_active else "deactivated"}.')
+            
+            # Ensure menu item reflects current state 
+            extension_action = self._extension_actions.get(extension_name)
+            if extension_action is not None:
+                extension_action.setChecked(is_active)
+                    
+        except Exception as e:
+            self._show_error(f"Failed to toggle extension: {extension_name}", e)
+    
+    def applyPluginReload(self, kind, old_name, new_name, active=False):
+        """Re-apply a single theme, mode or extension that was reloaded from disk
+        
+        Unlike the Refresh menu items this touches only what the plugin affects and
+        doesn't show a dialog. `active` is true when the reloaded theme is (or was) the
+        current one, or when the reloaded extension is active.
+        """
+        try:
+            if kind == "theme":
+                self.buildThemesMenu()
+                if active:
+                    self.applyTheme()
+            elif kind == "mode":
+                if new_name is None and mode_manager.is_reload_pending(old_name):
+                    # Broken mid-edit: keep using the editor built from the last good code
+                    pass
+                elif old_name is not None and self.current_mode == old_name:
+                    # Rebuild the editor from the new code, keeping the text
+                    self._syncModeEditorToBuffer()
+                    self.mode_editors.set_active(None)
+                    self.mode_editors.evict(old_name)
+                    self.current_mode = None
+                    self.switchToMode(new_name)
+                else:
+                    self.mode_editors.evict(old_name)
+                self.buildModesMenu()
+            elif kind == "extension":
+                if active:
+                    extension_manager._call_hook(new_name, 'modify_layout', self)
+                self.text_changes.follow()
+                self._extensions_menu_stale = True
+        except Exception as e:
+            print(f"Error applying reloaded {kind} {new_name or old_name}: {str(e)}")
+            traceback.print_exc()
+    
+    def refreshExtensionLayouts(self):
+        """Refresh and reapply all active extension layouts"""
+        try:
+            # Get the main layout (needed for potential layout changes)
+            main_layout = self.background_widget.layout()
+            
+            # Make a local copy of active extensions to avoid issues if the list changes during iteration
+            active_extensions = list(extension_manager._active_extensions.keys())
+            
+            print(f"Refreshing layouts for {len(active_extensions)} active extensions")
+            
+            # Call modify_layout for all active extensions in sequence
+            for ext_name in active_extensions:
+                # Skip extensions that aren't actually active (might have been disabled)
+                if not extension_manager.is_extension_active(ext_name):
+                    continue
+                    
+                print(f"Applying layout for extension: {ext_name}")
+                extension_manager._call_hook(ext_name, 'modify_layout', self)
+            
+            # Force layout update
+            if main_layout:
+                main_layout.update()
+                self.background_widget.updateGeometry()
+                
+        except Exception as e:
+            print(f"Error refreshing extension layouts: {str(e)}")
+            traceback.print_exc()
+
+    def resetButtonState(self, button):
+        """Reset the hover state of a button"""
+        # Force button to update its style
+        button.setAttribute(Qt.WidgetAttribute.WA_UnderMouse, False)
+        button.update()
+
+# Top-level windows of this process, so extra windows aren't garbage collected
+_windows = []
+
+# Hidden, fully built window handed out on the next request (daemon mode only)
+_standby_window = None
+_daemon_mode = False
+
+# Whether this process has offered to recover unsaved content yet
+_recovery_checked = False
+
+# Delay before the file dialogs are built and styled in the background (ms)
+DIALOG_WARM_DELAY = 1000
+
+# Delay before building the next standby window, so it doesn't compete with the
+# window that was just shown (ms)
+STANDBY_REFILL_DELAY = 500
+
+def build_window():
+    """Construct (but don't show) an additional editor window"""
+    window = HyprText(primary=False)
+    window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+    window.destroyed.connect(lambda _=None, w=window: _windows.remove(w) if w in _windows else None)
+    window.updateFileLabel()
+    return window
+
+def prepare_standby_window():
+    """Build the next window ahead of time: widgets, stylesheet, polish and native handle"""
+    global _standby_window
+    try:
+        if _standby_window is None:
+            _standby_window = build_window()
+            _standby_window.ensurePolished()
+            _standby_window.winId()  # Create the native window now rather than on show
+    except Exception as e:
+        print(f"Failed to prepare standby window: {str(e)}")
+        traceback.print_exc()
+
+def create_window():
+    """Show an additional editor window, using the standby window when one is ready"""
+    global _standby_window, _recovery_checked
+    window, _standby_window = _standby_window or build_window(), None
+    _windows.append(window)
+    window.show()
+    
+    # The daemon has no primary window; offer recovery in the first one it shows
+    if not _recovery_checked:
+        _recovery_checked = True
+        QTimer.singleShot(0, window.checkForRecoveryFile)
+    
+    # Refill the standby slot during idle time
+    if _daemon_mode:
+        QTimer.singleShot(STANDBY_REFILL_DELAY, prepare_standby_window)
+    return window
+
+def open_in_running_instance(paths, new_window):
+    """Handle an open request forwarded by another launch"""
+    try:
+        # Files open as buffers in the most recent window.
+        # The daemon always hands out its standby window instead
+        target = None
+        active = QApplication.activeWindow()
+        candidates = ([active] if active in _windows else []) + list(reversed(_windows))
+        if not new_window and not _daemon_mode:
+            target = next((w for w in candidates if w.isVisible()), None)
+        
+        if target is None:
+            target = create_window()
+        for file_path in paths:
+            target.openFilePath(file_path)
+        
+        target.show()
+        target.raise_()
+        target.activateWindow()
+    except Exception as e:
+        print(f"Failed to open forwarded files: {str(e)}")
+        traceback.print_exc()
+
+def start_instance_server(app):
+    """Listen for launches forwarded by instance_client"""
+    from instance_server import InstanceServer
+    server = InstanceServer(app)
+    server.open_requested.connect(open_in_running_instance)
+    server.quit_requested.connect(app.quit)
+    if not server.listen():
+        return None
+    app.aboutToQuit.connect(server.close)
+    return server
+
+def reload_plugin(kind, module_path):
+    """Re-import one changed plugin file and re-apply it in every window"""
+    started = time.perf_counter()
+    windows = list(_windows) + ([_standby_window] if _standby_window is not None else [])
+    active = False
+    if kind == "theme":
+        was_current = ThemeManager.get_current_theme()
+        old_name, new_name = ThemeManager.reload_theme_file(module_path)
+        active = was_current == old_name or ThemeManager.get_current_theme() == new_name
+        FileManager.invalidate_dialog_styles()
+    elif kind == "mode":
+        old_name, new_name = mode_manager.reload_mode_file(module_path)
+    else:
+        app_instance = QApplication.activeWindow() if QApplication.activeWindow() in windows else None
+        app_instance = app_instance or (windows[-1] if windows else None)
+        old_name, new_name, active = extension_manager.reload_extension_file(module_path, app_instance)
+    
+    for window in windows:
+        window.applyPluginReload(kind, old_name, new_name, active)
+    
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    action = "Removed" if new_name is None and old_name is not None else "Reloaded"
+    print(f"{action} {kind} {new_name or old_name or os.path.basename(module_path)} in {elapsed_ms:.1f} ms")
+
+def start_plugin_watcher(app):
+    """Reload themes, modes and extensions as their files are edited"""
+    if not settings_service.value('hot_reload_plugins', True, type=bool):
+        return None
+    from plugin_watcher import PluginWatcher
+    watcher = PluginWatcher(app)
+    watcher.plugin_changed.connect(reload_plugin)
+    watcher.start()
+    app.aboutToQuit.connect(watcher.stop)
+    return watcher
+
+def run_daemon(app, options):
+    """Keep a warm process with a pre-built window for instant window spawns"""
+    global _daemon_mode
+    _daemon_mode = True
+    
+    # Windows come and go; the process stays until asked to quit
+    app.setQuitOnLastWindowClosed(False)
+    
+    # Standby windows reuse the modes discovered here
+    with startup_profiler.phase("mode_manager.discover_modes"):
+        mode_manager.discover_modes()
+    
+    with startup_profiler.phase("standby window"):
+        prepare_standby_window()
+    
+    if start_instance_server(app) is None:
+        print("Not starting the daemon: another HyprText instance is already running")
+        sys.exit(1)
+    
+    if options["files"]:
+        open_in_running_instance(options["files"], True)
+    
+    start_plugin_watcher(app)
+    QTimer.singleShot(DIALOG_WARM_DELAY, lambda: FileManager.warm_dialogs(_standby_window))
+    QTimer.singleShot(0, startup_profiler.finish)
+    print("HyprText daemon ready")
+    sys.exit(app.exec())
+
+def main():
+    """Application entry point"""
+    global _recovery_checked
+    try:
+        options = parse_launch_args(sys.argv)
+        strip_launch_flags(sys.argv)
+        
+        with startup_profiler.phase("QApplication"):
+            app = QApplication(sys.argv)
+            app.setStyle('Fusion')  # Use Fusion style for better theming support
+            app.setApplicationName(APP_NAME)
+            app.setApplicationDisplayName(APP_NAME)
+        
+        # Don't let queued background extension hooks hold up exit
+        app.aboutToQuit.connect(extension_manager.shutdown_background_hooks)
+        app.aboutToQuit.connect(settings_service.flush)
+        
+        if options["daemon"]:
+            run_daemon(app, options)
+        
+        # The stylesheet is applied by HyprText once its widgets exist
+        with startup_profiler.phase("HyprText.__init__"):
+            ex = HyprText()
+        _windows.append(ex)
+        _recovery_checked = True
+        # Initialize the file label at startup
+        ex.updateFileLabel()
+        with startup_profiler.phase("show"):
+            ex.show()
+        
+        # Open files given on the command line, each in its own buffer
+        for file_path in options["files"]:
+            ex.openFilePath(file_path)
+        
+        # Build the open/save dialogs once the window is up, so Ctrl+O is instant
+        QTimer.singleShot(DIALOG_WARM_DELAY, lambda: FileManager.warm_dialogs(ex))
+        
+        # Let later launches hand their files to this process
+        if options["single_instance"]:
+            start_instance_server(app)
+        
+        # Pick up edits to files under mods/ without a restart
+        start_plugin_watcher(app)
+        
+        # Finish once the event loop is running and the first frame has been queued
+        QTimer.singleShot(0, startup_profiler.finish)
+        
+        sys.exit(app.exec())
+    except Exception as e:
+        print(f"Fatal error: {str(e)}")
+        traceback.print_exc()
+        sys.exit(1)
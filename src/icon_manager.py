@@ -4,18 +4,264 @@ HyprText Icon Manager
 
 This module manages SVG icons for the HyprText editor.
 It provides functions to load and retrieve icons by name.
+
+Colored icons come from an atlas: every SVG is parsed once, its shape is rasterized
+once per device pixel ratio, and a color is applied to all shapes in one pass by
+filling them with that color. Each (color, device pixel ratio) is rendered only
+once per session, so switching back to a theme reuses its icons.
+
+Both the icons handed out and the atlas's rendered colors live in LRU caches bounded
+by the approximate size of their pixmaps; get_icon_cache_stats() reports their hit,
+miss and eviction counts.
 """
 
 import os
-from PyQt6.QtGui import QIcon, QPixmap, QPainter
+import traceback
+from collections import OrderedDict
+from PyQt6.QtGui import QIcon, QPixmap, QPainter, QImage, QColor, QGuiApplication
 from PyQt6.QtCore import QSize, Qt
 from PyQt6.QtSvg import QSvgRenderer
 
 # Path to the icons directory
 ICONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icons')
 
+# Logical size colored icons are rendered at; each screen's device pixel ratio gets its own pixmap
+ICON_SIZE = 24
+
+# Byte budgets for the icons handed out and for the atlas's rendered colors
+ICON_CACHE_BUDGET = 2 * 1024 * 1024
+ATLAS_CACHE_BUDGET = 4 * 1024 * 1024
+
+# Byte budget for icons registered by extensions; registrations past it are refused
+PINNED_ICON_BUDGET = 1024 * 1024
+
+class IconCache:
+    """LRU cache bounded by the approximate pixmap memory of its entries
+    
+    Pinned entries (icons registered by extensions, which can't be re-created) are
+    never evicted. They have their own budget instead, and put() refuses a pinned
+    entry that would exceed it.
+    """
+    
+    def __init__(self, budget, pinned_budget=0):
+        self.budget = budget
+        self.pinned_budget = pinned_budget
+        self._entries = OrderedDict()  # Dictionary of key: (value, size in bytes)
+        self._pinned = set()
+        self.bytes = 0  # Size of the evictable entries
+        self.pinned_bytes = 0
+        self.rejected = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    def put(self, key, value, size, pinned=False):
+        """Store an entry; returns False if a pinned entry doesn't fit the pinned budget"""
+        previous = self._entries.get(key)
+        previous_pinned = previous[1] if previous is not None and key in self._pinned else 0
+        if pinned and self.pinned_bytes - previous_pinned + size > self.pinned_budget:
+            self.rejected += 1
+            return False
+        
+        self._remove(key)
+        self._entries[key] = (value, size)
+        if pinned:
+            self._pinned.add(key)
+            self.pinned_bytes += size
+        else:
+            self.bytes += size
+            self._evict()
+        return True
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if key in self._pinned:
+            self._pinned.discard(key)
+            self.pinned_bytes -= entry[1]
+        else:
+            self.bytes -= entry[1]
+    
+    def _evict(self):
+        if self.bytes <= self.budget:
+            return
+        # The newest entry stays even if it alone doesn't fit; the caller is about to use it
+        for key in list(self._entries)[:-1]:
+            if self.bytes <= self.budget:
+                break
+            if key in self._pinned:
+                continue
+            self._remove(key)
+            self.evictions += 1
+    
+    def clear(self):
+        """Drop everything except pinned entries"""
+        for key in list(self._entries):
+            if key not in self._pinned:
+                self._remove(key)
+    
+    def stats(self):
+        """Return counters for sizing the budget"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "pinned": len(self._pinned),
+            "bytes": self.bytes,
+            "budget": self.budget,
+            "pinned_bytes": self.pinned_bytes,
+            "pinned_budget": self.pinned_budget,
+            "rejected": self.rejected,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def pixmap_bytes(pixmap):
+    """Approximate memory of a 32-bit pixmap"""
+    return pixmap.width() * pixmap.height() * 4
+
+def icon_bytes(icon):
+    """Approximate memory of an icon's pixmaps"""
+    sizes = icon.availableSizes()
+    if sizes:
+        return sum(size.width() * size.height() * 4 for size in sizes)
+    # SVG-backed icons render on demand; assume one icon-sized pixmap per pixel ratio
+    return sum(round(ICON_SIZE * dpr) ** 2 * 4 for dpr in get_device_pixel_ratios())
+
 # Icon cache to avoid loading the same icon multiple times
-_icon_cache = {}
+_icon_cache = IconCache(ICON_CACHE_BUDGET, PINNED_ICON_BUDGET)
+
+def get_device_pixel_ratios():
+    """Return the device pixel ratios of the connected screens, always including 1.0"""
+    ratios = {1.0}
+    app = QGuiApplication.instance()
+    if app is not None:
+        for screen in app.screens():
+            ratios.add(screen.devicePixelRatio())
+    return sorted(ratios)
+
+class IconAtlas:
+    """Colorized renderings of the SVG icons, shared by every widget"""
+    
+    def __init__(self, icons_dir=ICONS_DIR, size=ICON_SIZE):
+        self.icons_dir = icons_dir
+        self.size = size
+        self._names = None  # Icon names found in icons_dir, listed on first use
+        self._renderers = {}  # Dictionary of name: (QSvgRenderer, colorizable) or None if unusable
+        self._masks = {}  # Dictionary of (name, dpr): QImage of the icon's shape
+        self._pixmaps = IconCache(ATLAS_CACHE_BUDGET)  # (color, dpr): {name: QPixmap}
+    
+    @property
+    def names(self):
+        if self._names is None:
+            try:
+                self._names = sorted(f[:-4] for f in os.listdir(self.icons_dir) if f.endswith('.svg'))
+            except OSError:
+                self._names = []
+        return self._names
+    
+    def _renderer(self, name):
+        """Parse an SVG once; icons drawn in currentColor are recolored, others kept as-is"""
+        if name not in self._renderers:
+            entry = None
+            try:
+                with open(os.path.join(self.icons_dir, f'{name}.svg'), 'r') as f:
+                    svg_content = f.read()
+                colorizable = 'currentColor' in svg_content
+                renderer = QSvgRenderer(bytes(svg_content.replace('currentColor', '#000000'), encoding='utf-8'))
+                if renderer.isValid():
+                    entry = (renderer, colorizable)
+                else:
+                    print(f"Invalid SVG icon: {name}")
+            except OSError:
+                pass
+            self._renderers[name] = entry
+        return self._renderers[name]
+    
+    def _mask(self, name, dpr):
+        """Rasterize an icon's shape at a device pixel ratio, once"""
+        key = (name, dpr)
+        mask = self._masks.get(key)
+        if mask is None:
+            entry = self._renderer(name)
+            if entry is None:
+                return None
+            pixels = round(self.size * dpr)
+            mask = QImage(pixels, pixels, QImage.Format.Format_ARGB32_Premultiplied)
+            mask.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(mask)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            entry[0].render(painter)
+            painter.end()
+            self._masks[key] = mask
+        return mask
+    
+    def _colorize(self, name, color, dpr):
+        mask = self._mask(name, dpr)
+        if mask is None:
+            return None
+        image = mask.copy()
+        if self._renderers[name][1]:
+            # Keep the shape's alpha, replace its color
+            painter = QPainter(image)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+            painter.fillRect(image.rect(), color)
+            painter.end()
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
+    
+    def render(self, color, dpr):
+        """Return {name: QPixmap} for every icon in one color, rendering them all on first use"""
+        key = (QColor(color).name(QColor.NameFormat.HexArgb), dpr)
+        pixmaps = self._pixmaps.get(key)
+        if pixmaps is None:
+            fill = QColor(color)
+            pixmaps = {}
+            for name in self.names:
+                pixmap = self._colorize(name, fill, dpr)
+                if pixmap is not None:
+                    pixmaps[name] = pixmap
+            self._pixmaps.put(key, pixmaps, sum(pixmap_bytes(p) for p in pixmaps.values()))
+        return pixmaps
+    
+    def icon(self, name, color):
+        """Return a QIcon of one icon in a color for every screen's pixel ratio, or None"""
+        icon = QIcon()
+        for dpr in get_device_pixel_ratios():
+            pixmaps = self.render(color, dpr)
+            pixmap = pixmaps.get(name)
+            if pixmap is None and self._renderers.get(name, True) is not None:
+                # An SVG added after this color was rendered
+                self._names = None
+                pixmap = self._colorize(name, QColor(color), dpr)
+                if pixmap is not None:
+                    pixmaps[name] = pixmap
+                    self._pixmaps.put((QColor(color).name(QColor.NameFormat.HexArgb), dpr), pixmaps,
+                                      sum(pixmap_bytes(p) for p in pixmaps.values()))
+            if pixmap is None:
+                return None
+            icon.addPixmap(pixmap)
+        return icon
+
+_atlas = IconAtlas()
 
 def ensure_icons_dir_exists():
     """
@@ -43,30 +289,28 @@ def get_icon(name, fallback=None, textColor=None):
     # Create a cache key that includes the color if provided
     cache_key = f"{name}_{textColor}" if textColor else name
     
-    if cache_key in _icon_cache:
-        return _icon_cache[cache_key]
+    icon = _icon_cache.get(cache_key)
+    if icon is not None:
+        return icon
         
     # Try to load the icon from the icon directory
     svg_path = os.path.join(ICONS_DIR, f'{name}.svg')
     if os.path.exists(svg_path):
-        # If textColor is provided, use colorize function
+        # If textColor is provided, take the icon from the atlas
         if textColor:
             try:
-                # Read SVG content
-                with open(svg_path, 'r') as f:
-                    svg_content = f.read()
-                
-                # Create colorized icon
-                icon = create_colorized_icon(svg_content, textColor)
-                _icon_cache[cache_key] = icon
-                return icon
+                icon = _atlas.icon(name, textColor)
+                if icon is not None:
+                    _icon_cache.put(cache_key, icon, icon_bytes(icon))
+                    return icon
             except Exception as e:
                 print(f"Error colorizing icon: {e}")
+                traceback.print_exc()
                 # Fall back to standard icon loading
         
         # Standard icon loading (no color override)
         icon = QIcon(svg_path)
-        _icon_cache[cache_key] = icon
+        _icon_cache.put(cache_key, icon, icon_bytes(icon))
         return icon
     
     # If we can't find the SVG, use the fallback
@@ -80,6 +324,9 @@ def create_colorized_icon(svg_content, color="#FFFFFF", size=QSize(24, 24)):
     """
     Create a colorized icon from SVG content string
     
+    HyprText's own icons come from the atlas; this is kept as public API for
+    extensions that ship their own SVGs (e.g. for register_custom_icon).
+    
     Args:
         svg_content (str): The SVG content string
         color (str): The color to apply to the SVG
@@ -108,11 +355,29 @@ def register_custom_icon(name, icon):
     """
     Register a custom icon in the icon cache
     
+    The icon is pinned, so it is never evicted. Pinned icons share PINNED_ICON_BUDGET,
+    and an icon that doesn't fit is refused. Re-registering a name replaces its icon.
+    
     Args:
         name (str): The name to give the icon
         icon (QIcon): The icon to register
+        
+    Returns:
+        bool: Whether the icon was registered
+    """
+    if not _icon_cache.put(name, icon, icon_bytes(icon), pinned=True):
+        print(f"Not registering icon {name}: custom icons already use "
+              f"{_icon_cache.pinned_bytes // 1024} KB of their {PINNED_ICON_BUDGET // 1024} KB budget")
+        return False
+    return True
+
+def get_icon_cache_stats():
+    """Return hit/miss/eviction counters and memory use of the icon caches
+    
+    Returns:
+        dict: {"icons": stats of the QIcon cache, "atlas": stats of the rendered colors}
     """
-    _icon_cache[name] = icon
+    return {"icons": _icon_cache.stats(), "atlas": _atlas._pixmaps.stats()}
 
 # Standard icon names for the application
 ICON_FILE = "file"            # File operations icon
@@ -0,0 +1,102 @@
+"""
+HyprText Instance Client
+========================
+
+Forwards a launch request (files to open) to an already running HyprText instance
+over a local socket. This module deliberately avoids PyQt6 so a forwarded launch
+only pays for the Python interpreter itself, not for Qt or plugin discovery.
+
+Any launch forwards to a listening instance (started with --single-instance or
+--daemon) unless --standalone is given. The wire protocol is one JSON object per line:
+
+    {"version": 1, "command": "open", "paths": ["/abs/file"], "new_window": false}
+
+and the server answers with a single "ok" line once the request has been accepted.
+Other commands are "ping" and "quit".
+"""
+
+import json
+import os
+import socket
+import tempfile
+
+PROTOCOL_VERSION = 1
+
+# How long a client waits for a running instance to accept a request (seconds)
+CONNECT_TIMEOUT = 1.0
+
+# Flags handled by HyprText itself rather than Qt
+LAUNCH_FLAGS = ('--single-instance', '--new-window', '--daemon', '--standalone', '--stop-daemon')
+
+def get_socket_path():
+    """Return the per-user socket path the running instance listens on"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"hyprtext-{os.getuid()}.sock")
+
+def parse_launch_args(argv):
+    """Split HyprText's launch flags from the files to open
+
+    Returns:
+        dict: files (absolute paths), single_instance, new_window, daemon, standalone, stop_daemon
+    """
+    options = {"files": [], "single_instance": False, "new_window": False,
+               "daemon": False, "standalone": False, "stop_daemon": False}
+    for arg in argv[1:]:
+        if arg in LAUNCH_FLAGS:
+            options[arg[2:].replace('-', '_')] = True
+        elif not arg.startswith('-'):
+            options["files"].append(os.path.abspath(arg))
+    return options
+
+def strip_launch_flags(argv):
+    """Remove HyprText's own launch flags from argv in place (Qt doesn't know them)"""
+    argv[:] = argv[:1] + [arg for arg in argv[1:] if arg not in LAUNCH_FLAGS]
+
+def send_message(message, socket_path=None, timeout=CONNECT_TIMEOUT):
+    """Send one message to the running instance, returning True if it was accepted"""
+    socket_path = socket_path or get_socket_path()
+    if not os.path.exists(socket_path):
+        return False
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+            reply = b''
+            while not reply.endswith(b'\n'):
+                chunk = sock.recv(64)
+                if not chunk:
+                    break
+                reply += chunk
+            return reply.strip() == b'ok'
+    except OSError:
+        # No server, or a stale socket left behind by a crashed instance
+        return False
+
+def is_server_alive(socket_path=None):
+    """Check whether an instance is accepting connections on the socket"""
+    return send_message({"version": PROTOCOL_VERSION, "command": "ping"}, socket_path)
+
+def forward_from_argv(argv):
+    """Forward this launch to a running instance, if one is listening
+
+    Returns:
+        bool: True if a running instance took over and this process can exit
+    """
+    options = parse_launch_args(argv)
+    if options["stop_daemon"]:
+        if not send_message({"version": PROTOCOL_VERSION, "command": "quit"}):
+            print("No running HyprText instance to stop")
+        return True
+    if options["standalone"] or options["daemon"]:
+        return False
+
+    return send_message({
+        "version": PROTOCOL_VERSION,
+        "command": "open",
+        "paths": options["files"],
+        # A bare launch (e.g. from a keybind) always asks for a fresh window
+        "new_window": options["new_window"] or not options["files"]
+    })
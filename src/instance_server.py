@@ -0,0 +1,117 @@
+"""
+HyprText Instance Server
+========================
+
+Lets later launches reuse this process. An instance started with --single-instance
+or --daemon listens on a local socket (see instance_client for the protocol); later
+launches forward their file paths and exit, and this instance opens them.
+"""
+
+import json
+import traceback
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer
+
+from instance_client import PROTOCOL_VERSION, get_socket_path, is_server_alive
+
+class InstanceServer(QObject):
+    """Accepts open requests from other HyprText launches"""
+
+    # Emitted with (paths, new_window) for every accepted open request
+    open_requested = pyqtSignal(list, bool)
+    
+    # Emitted when a client asks the instance to exit
+    quit_requested = pyqtSignal()
+
+    def __init__(self, parent=None, socket_path=None):
+        super().__init__(parent)
+        self.socket_path = socket_path or get_socket_path()
+        self.server = None
+        self._buffers = {}  # Maps sockets to partially received data
+
+    def listen(self):
+        """Start listening, replacing a stale socket left by a crashed instance"""
+        try:
+            if is_server_alive(self.socket_path):
+                print(f"Another HyprText instance is already listening on {self.socket_path}")
+                return False
+
+            # Nobody answered, so any socket file is stale
+            QLocalServer.removeServer(self.socket_path)
+
+            self.server = QLocalServer(self)
+            self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+            self.server.newConnection.connect(self._on_new_connection)
+            if not self.server.listen(self.socket_path):
+                print(f"Could not listen on {self.socket_path}: {self.server.errorString()}")
+                self.server = None
+                return False
+
+            print(f"Listening for new files on {self.socket_path}")
+            return True
+        except Exception as e:
+            print(f"Error starting instance server: {str(e)}")
+            traceback.print_exc()
+            return False
+
+    def close(self):
+        """Stop listening and remove the socket file"""
+        if self.server is not None:
+            self.server.close()
+            QLocalServer.removeServer(self.socket_path)
+            self.server = None
+
+    def _on_new_connection(self):
+        """Accept all pending client connections"""
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self._buffers[sock] = b''
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+
+    def _on_disconnected(self, sock):
+        """Forget a closed connection"""
+        self._buffers.pop(sock, None)
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock):
+        """Read complete lines from a client and handle each message"""
+        try:
+            data = self._buffers.get(sock, b'') + bytes(sock.readAll())
+            while b'\n' in data:
+                line, data = data.split(b'\n', 1)
+                reply = self._handle_message(line)
+                sock.write(reply + b'\n')
+                sock.flush()
+            self._buffers[sock] = data
+        except Exception as e:
+            print(f"Error handling instance request: {str(e)}")
+            traceback.print_exc()
+            sock.abort()
+
+    def _handle_message(self, line):
+        """Handle one protocol message and return the reply
+
+        Requests are acknowledged before they run: opening files can build a window
+        or show a modal error box, and the client gives up after CONNECT_TIMEOUT.
+        """
+        try:
+            message = json.loads(line.decode('utf-8'))
+        except ValueError:
+            return b'error invalid message'
+
+        if message.get("version") != PROTOCOL_VERSION:
+            return b'error unsupported version'
+
+        command = message.get("command")
+        if command == "ping":
+            return b'ok'
+        if command == "open":
+            paths = [str(path) for path in message.get("paths", [])]
+            new_window = bool(message.get("new_window", False))
+            QTimer.singleShot(0, lambda: self.open_requested.emit(paths, new_window))
+            return b'ok'
+        if command == "quit":
+            QTimer.singleShot(0, self.quit_requested.emit)
+            return b'ok'
+        return b'error unknown command'
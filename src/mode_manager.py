@@ -1,14 +1,18 @@
 import os
 import importlib.util
 import sys
+import time
 from PyQt6.QtWidgets import QTextEdit
 
+from startup_profiler import startup_profiler
+
 class ModeManager:
     """Manager for dynamically loading and handling editor modes"""
     
     def __init__(self):
         self.modes = {}  # Dictionary of mode_name: mode_module
         self.current_mode = None
+        self._reload_pending = {}  # Dictionary of module path: name of a mode whose file failed to reload
         
     def discover_modes(self):
         """Scan the mods/modes directory for mode modules"""
@@ -40,25 +44,57 @@ class ModeManager:
         # Find all Python files in the directory
         for filename in os.listdir(modes_dir):
             if filename.endswith(".py"):
-                module_name = filename[:-3]  # Remove .py extension
-                module_path = os.path.join(modes_dir, filename)
-                
-                try:
-                    # Load the module
-                    spec = importlib.util.spec_from_file_location(module_name, module_path)
-                    module = importlib.util.module_from_spec(spec)
-                    sys.modules[module_name] = module
-                    spec.loader.exec_module(module)
-                    
-                    # Check for required attributes and functions
-                    if hasattr(module, 'MODE_NAME') and hasattr(module, 'create_editor'):
-                        mode_name = module.MODE_NAME
-                        self.modes[mode_name] = module
-                        print(f"Loaded mode: {mode_name}")
-                    else:
-                        print(f"Skipping {filename}: Missing required attributes")
-                except Exception as e:
-                    print(f"Error loading {filename}: {str(e)}")
+                self._load_mode_file(os.path.join(modes_dir, filename))
+    
+    def _load_mode_file(self, module_path):
+        """Import one mode file and register it; returns the mode name or None"""
+        filename = os.path.basename(module_path)
+        module_name = filename[:-3]  # Remove .py extension
+        try:
+            # Load the module
+            started = time.perf_counter()
+            spec = importlib.util.spec_from_file_location(module_name, module_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            startup_profiler.record_plugin("mode", module_name, started)
+            
+            # Check for required attributes and functions
+            if hasattr(module, 'MODE_NAME') and hasattr(module, 'create_editor'):
+                mode_name = module.MODE_NAME
+                self.modes[mode_name] = module
+                print(f"Loaded mode: {mode_name}")
+                return mode_name
+            print(f"Skipping {filename}: Missing required attributes")
+        except Exception as e:
+            print(f"Error loading {filename}: {str(e)}")
+        return None
+    
+    def reload_mode_file(self, module_path):
+        """Re-import a single mode file that was added, changed or removed
+        
+        Returns (old_name, new_name); old_name is None for a new file and new_name is
+        None if the file is gone or broken.
+        
+        A mode whose file is briefly broken (e.g. halfway through a save) is remembered,
+        and reported as old_name once the file loads again, so windows left in it can
+        switch to the new code instead of dropping to Standard Mode.
+        """
+        old_name = self._reload_pending.pop(module_path, None)
+        for mode_name, module in list(self.modes.items()):
+            if os.path.abspath(getattr(module, '__file__', '') or '') == os.path.abspath(module_path):
+                old_name = mode_name
+                del self.modes[mode_name]
+        
+        exists = os.path.exists(module_path)
+        new_name = self._load_mode_file(module_path) if exists else None
+        if old_name is not None and new_name is None and exists:
+            self._reload_pending[module_path] = old_name
+        return old_name, new_name
+    
+    def is_reload_pending(self, mode_name):
+        """Check whether a mode is only missing because its file failed to reload"""
+        return mode_name in self._reload_pending.values()
     
     def get_mode_names(self):
         """Return a list of available mode names"""
@@ -0,0 +1,117 @@
+"""
+HyprText Plugin Watcher
+=======================
+
+Watches mods/themes, mods/modes and mods/extensions and reports which plugin files
+were added, changed or removed, so a single theme, mode or extension can be
+re-imported while it is being developed instead of rescanning everything. Bursts
+of file events (editors often write a temporary file and rename it over the
+original) are collapsed into one report per file.
+"""
+
+import os
+import traceback
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+# Quiet time after the last file event before changes are reported (ms)
+RELOAD_DEBOUNCE = 150
+
+# Plugin kind for each directory under mods/
+PLUGIN_DIRECTORIES = {
+    "themes": "theme",
+    "modes": "mode",
+    "extensions": "extension",
+}
+
+def get_mods_directory():
+    """Return the mods/ directory next to src/"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(app_dir, "mods")
+
+def _stat_plugins(directory):
+    """Return a dictionary of plugin file path: mtime_ns for a directory"""
+    plugins = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".py") and entry.name != "__init__.py":
+                    try:
+                        plugins[entry.path] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+    except OSError:
+        pass
+    return plugins
+
+class PluginWatcher(QObject):
+    """Reports edits to plugin files under mods/"""
+
+    # Emitted with (kind, module_path) for each added, changed or removed plugin file;
+    # kind is "theme", "mode" or "extension"
+    plugin_changed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, mods_directory=None):
+        super().__init__(parent)
+        mods_directory = mods_directory or get_mods_directory()
+        self.directories = {os.path.join(mods_directory, name): kind for name, kind in PLUGIN_DIRECTORIES.items()}
+        self._mtimes = {}  # Dictionary of plugin file path: mtime_ns when last reported
+        self._dirty = set()  # Directories with pending events
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(RELOAD_DEBOUNCE)
+        self._timer.timeout.connect(self._flush)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._onChanged)
+        self.watcher.fileChanged.connect(self._onChanged)
+
+    def start(self):
+        """Start watching the plugin directories"""
+        try:
+            for directory in self.directories:
+                if not os.path.isdir(directory):
+                    continue
+                plugins = _stat_plugins(directory)
+                self._mtimes.update(plugins)
+                self.watcher.addPath(directory)
+                if plugins:
+                    self.watcher.addPaths(list(plugins))
+        except Exception as e:
+            print(f"Error starting the plugin watcher: {str(e)}")
+            traceback.print_exc()
+
+    def stop(self):
+        self._timer.stop()
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+
+    def _onChanged(self, path):
+        directory = path if path in self.directories else os.path.dirname(path)
+        if directory in self.directories:
+            self._dirty.add(directory)
+            self._timer.start()
+
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        for directory in dirty:
+            kind = self.directories[directory]
+            current = _stat_plugins(directory)
+
+            # A file replaced by rename is no longer watched; watch the new one
+            watched = set(self.watcher.files())
+            unwatched = [path for path in current if path not in watched]
+            if unwatched:
+                self.watcher.addPaths(unwatched)
+
+            known = {path for path in self._mtimes if os.path.dirname(path) == directory}
+            for path in sorted(known | set(current)):
+                mtime = current.get(path)
+                if mtime == self._mtimes.get(path):
+                    continue
+                if mtime is None:
+                    self._mtimes.pop(path, None)
+                else:
+                    self._mtimes[path] = mtime
+                self.plugin_changed.emit(kind, path)
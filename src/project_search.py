@@ -0,0 +1,275 @@
+"""
+Project Search for HyprText
+===========================
+
+This module implements "Find in Files": a non-modal panel that greps every text file
+under a directory. Files are walked on a background thread, skipped if they look
+binary (the same null-byte check FileManager uses), decoded with the same encoding
+rules as read_file (see text_io), and searched in batches by a warm process pool
+(see search_worker).
+Hits stream back to the panel as each batch completes. When the trigram index is
+enabled (see trigram_index), only files that can contain the pattern are scanned.
+"""
+
+import os
+import re
+import time
+import traceback
+from concurrent.futures import as_completed
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QCheckBox, QLabel,
+    QListWidget, QListWidgetItem, QFileDialog
+)
+
+from batch_convert import iter_input_files
+from settings_service import settings_service
+from search_worker import compile_search_pattern, get_executor, search_batch, warm_up
+from trigram_index import get_index
+
+# Files handed to a worker per task; large enough to amortize IPC, small enough to stream
+FILES_PER_BATCH = 64
+
+# Hits kept in total, so a pathological pattern can't flood the panel
+MAX_RESULTS = 10000
+
+class ProjectSearchThread(QThread):
+    """Walks the directory and feeds the process pool, streaming hits back"""
+
+    # List of (path, line_number, column, line_text)
+    hits_found = pyqtSignal(list)
+    # (files searched, files queued)
+    progress = pyqtSignal(int, int)
+    # (files searched, total hits, seconds)
+    search_finished = pyqtSignal(int, int, float)
+    search_failed = pyqtSignal(str)
+    # (candidate files, indexed files) once the trigram index has narrowed the search
+    narrowed = pyqtSignal(int, int)
+
+    def __init__(self, root, pattern_text, case_sensitive=False, use_regex=False, use_index=False, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.pattern_text = pattern_text
+        self.case_sensitive = case_sensitive
+        self.use_regex = use_regex
+        self.use_index = use_index
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        start = time.perf_counter()
+        self.searched = self.queued = self.total_hits = 0
+        pending = []
+        try:
+            executor = get_executor()
+            file_paths = self._indexedCandidates(executor) if self.use_index else None
+            if file_paths is None:
+                file_paths = iter_input_files([self.root])
+            
+            batch = []
+            for file_path in file_paths:
+                if self._cancelled:
+                    break
+                batch.append(file_path)
+                if len(batch) >= FILES_PER_BATCH:
+                    pending.append(self._submit(executor, batch))
+                    batch = []
+                    # Stream whatever finished while the walk goes on
+                    pending = [future for future in pending if not self._collect(future, block=False)]
+            if batch and not self._cancelled:
+                pending.append(self._submit(executor, batch))
+
+            for future in as_completed(pending):
+                if self._cancelled:
+                    break
+                self._collect(future)
+        except Exception as e:
+            traceback.print_exc()
+            self.search_failed.emit(str(e))
+        finally:
+            for future in pending:
+                future.cancel()
+        self.search_finished.emit(self.searched, self.total_hits, time.perf_counter() - start)
+
+    def _indexedCandidates(self, executor):
+        """Refresh the project's trigram index and return the files worth scanning"""
+        index = get_index(self.root)
+        with index.lock:
+            if index.update(executor, cancelled=lambda: self._cancelled):
+                index.save()
+            candidates = index.candidates(self.pattern_text, self.use_regex)
+            if candidates is None:
+                # Nothing to narrow by, but the index already knows every file
+                return sorted(index.files)
+            self.narrowed.emit(len(candidates), len(index.files))
+            return candidates
+
+    def _submit(self, executor, batch):
+        self.queued += len(batch)
+        return executor.submit(search_batch, batch, self.pattern_text, self.case_sensitive, self.use_regex)
+
+    def _collect(self, future, block=True):
+        """Emit a finished batch's hits; returns False if it isn't done and block is False"""
+        if not block and not future.done():
+            return False
+        count, hits = future.result()
+        self.searched += count
+        if hits and self.total_hits < MAX_RESULTS:
+            hits = hits[:MAX_RESULTS - self.total_hits]
+            self.total_hits += len(hits)
+            self.hits_found.emit(hits)
+        self.progress.emit(self.searched, self.queued)
+        return True
+
+class ProjectSearchDialog(QDialog):
+    """Non-modal Find in Files panel"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.search_thread = None
+        self.narrowed_text = ""
+        self.setWindowTitle("Find in Files")
+        self.setModal(False)
+        self.resize(760, 480)
+        self.initUI()
+
+    def initUI(self):
+        """Build the panel's widgets"""
+        layout = QVBoxLayout(self)
+
+        row = QHBoxLayout()
+        self.directory_edit = QLineEdit()
+        self.directory_edit.setPlaceholderText("Directory")
+        row.addWidget(self.directory_edit, 1)
+        browse_button = QPushButton("Browse…")
+        browse_button.clicked.connect(self.browseDirectory)
+        row.addWidget(browse_button)
+        layout.addLayout(row)
+
+        row = QHBoxLayout()
+        self.pattern_edit = QLineEdit()
+        self.pattern_edit.setPlaceholderText("Search for")
+        self.pattern_edit.returnPressed.connect(self.startSearch)
+        row.addWidget(self.pattern_edit, 1)
+        self.case_box = QCheckBox("Match case")
+        row.addWidget(self.case_box)
+        self.regex_box = QCheckBox("Regex")
+        row.addWidget(self.regex_box)
+        self.index_box = QCheckBox("Use index")
+        self.index_box.setToolTip("Keep a trigram index of this directory to skip files that can't match")
+        self.index_box.setChecked(settings_service.value('project_search_use_index', True, type=bool))
+        self.index_box.toggled.connect(lambda checked: settings_service.setValue('project_search_use_index', checked))
+        row.addWidget(self.index_box)
+        self.search_button = QPushButton("Search")
+        self.search_button.clicked.connect(self.startSearch)
+        row.addWidget(self.search_button)
+        layout.addLayout(row)
+
+        self.results_list = QListWidget()
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.itemActivated.connect(self.openResult)
+        layout.addWidget(self.results_list, 1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    def showPanel(self, directory=None):
+        """Show the panel, defaulting to the current file's directory"""
+        if directory and not self.directory_edit.text():
+            self.directory_edit.setText(directory)
+        warm_up()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.pattern_edit.setFocus()
+        self.pattern_edit.selectAll()
+
+    def browseDirectory(self):
+        directory = QFileDialog.getExistingDirectory(self, "Search in", self.directory_edit.text() or os.getcwd())
+        if directory:
+            self.directory_edit.setText(directory)
+
+    def startSearch(self):
+        """Cancel any running search and start a new one"""
+        try:
+            pattern_text = self.pattern_edit.text()
+            root = os.path.expanduser(self.directory_edit.text().strip() or os.getcwd())
+            if not pattern_text:
+                return
+            if not os.path.isdir(root):
+                self.status_label.setText(f"Not a directory: {root}")
+                return
+            try:
+                compile_search_pattern(pattern_text, self.case_box.isChecked(), self.regex_box.isChecked())
+            except re.error as e:
+                self.status_label.setText(f"Invalid pattern: {str(e)}")
+                return
+
+            self.cancelSearch()
+            self.results_list.clear()
+            self.status_label.setText("Searching…")
+
+            self.search_thread = ProjectSearchThread(root, pattern_text, self.case_box.isChecked(),
+                                                     self.regex_box.isChecked(), self.index_box.isChecked(), self)
+            self.search_thread.hits_found.connect(self.addHits)
+            self.search_thread.progress.connect(self.updateProgress)
+            self.search_thread.narrowed.connect(self.searchNarrowed)
+            self.narrowed_text = ""
+            self.search_thread.search_finished.connect(self.searchFinished)
+            self.search_thread.search_failed.connect(lambda message: self.status_label.setText(f"Search failed: {message}"))
+            self.search_thread.finished.connect(self.searchThreadFinished)
+            self.search_thread.finished.connect(self.search_thread.deleteLater)
+            self.search_thread.start()
+        except Exception as e:
+            print(f"Error starting project search: {str(e)}")
+            traceback.print_exc()
+
+    def searchThreadFinished(self):
+        """Forget a thread that has finished; deleteLater destroys it right after"""
+        if self.sender() is self.search_thread:
+            self.search_thread = None
+
+    def cancelSearch(self):
+        if self.search_thread is not None:
+            self.search_thread.cancel()
+            self.search_thread.hits_found.disconnect()
+            self.search_thread.progress.disconnect()
+            self.search_thread.search_finished.disconnect()
+            self.search_thread.search_failed.disconnect()
+            self.search_thread.narrowed.disconnect()
+            self.search_thread = None
+
+    def addHits(self, hits):
+        """Append a streamed batch of hits"""
+        root = self.directory_edit.text().strip()
+        self.results_list.setUpdatesEnabled(False)
+        for file_path, line_number, column, line in hits:
+            display_path = os.path.relpath(file_path, root) if root else file_path
+            item = QListWidgetItem(f"{display_path}:{line_number}: {line}")
+            item.setData(Qt.ItemDataRole.UserRole, (file_path, line_number, column))
+            self.results_list.addItem(item)
+        self.results_list.setUpdatesEnabled(True)
+
+    def updateProgress(self, searched, queued):
+        self.status_label.setText(f"Searching… {searched}/{queued} files, {self.results_list.count()} hits")
+
+    def searchNarrowed(self, candidates, indexed):
+        self.narrowed_text = f" (index narrowed {indexed} files to {candidates})"
+
+    def searchFinished(self, searched, total_hits, seconds):
+        limit = " (limit reached)" if total_hits >= MAX_RESULTS else ""
+        self.status_label.setText(f"{total_hits} hits{limit} in {searched} files{self.narrowed_text}, "
+                                  f"{seconds * 1000:.0f} ms")
+
+    def openResult(self, item):
+        """Open the file of a hit and jump to its line"""
+        file_path, line_number, column = item.data(Qt.ItemDataRole.UserRole)
+        self.app.openFilePath(file_path)
+        self.app.gotoLine(line_number, column)
+
+    def closeEvent(self, event):
+        self.cancelSearch()
+        super().closeEvent(event)
@@ -0,0 +1,310 @@
+"""
+Quick Open for HyprText
+=======================
+
+This module provides the Ctrl+P palette: type a few characters of a path and pick a
+file from a fuzzy-ranked list. A background crawler lists the directory once and the
+resulting path index is kept in memory for the rest of the session, so opening the
+palette again is instant; the listing is refreshed in the background when it gets old.
+Ranking is incremental: when the query grows, only the previous matches are re-filtered.
+"""
+
+import heapq
+import os
+import re
+import threading
+import time
+import traceback
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+
+from batch_convert import SKIPPED_DIRECTORIES
+
+# Stop crawling after this many files; quick open is meant for projects, not whole disks
+MAX_INDEXED_PATHS = 200000
+
+# Number of ranked results shown
+MAX_RESULTS = 200
+
+# A cached listing older than this is refreshed in the background when the palette opens (seconds)
+REFRESH_AFTER = 30.0
+
+# Paths sent from the crawler per batch
+CRAWL_BATCH_SIZE = 2000
+
+# Delay between the last keystroke and re-ranking while the crawler is still adding paths (ms)
+RANK_DEBOUNCE = 40
+
+class PathIndex:
+    """Relative paths of the files under one directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.paths = []  # Relative paths
+        self.lower = []  # Lowercase copies used for matching
+        self.complete = False
+        self.crawled_at = 0.0
+        self.generation = 0  # Bumped whenever paths change, invalidating incremental results
+
+    def add(self, paths):
+        self.paths.extend(paths)
+        self.lower.extend(path.lower() for path in paths)
+        self.generation += 1
+
+    def replace(self, paths):
+        self.paths = list(paths)
+        self.lower = [path.lower() for path in self.paths]
+        self.generation += 1
+
+# Path indexes kept between invocations, by root directory
+_path_indexes = {}
+_path_indexes_lock = threading.Lock()
+
+def get_path_index(root):
+    """Return the cached path index for root, creating an empty one if needed"""
+    with _path_indexes_lock:
+        index = _path_indexes.get(root)
+        if index is None:
+            index = PathIndex(root)
+            _path_indexes[root] = index
+        return index
+
+def crawl(root, cancelled=lambda: False):
+    """Yield batches of file paths relative to root, breadth-first"""
+    batch = []
+    count = 0
+    pending = [root]
+    while pending and count < MAX_INDEXED_PATHS:
+        directory = pending.pop(0)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIPPED_DIRECTORIES:
+                                pending.append(entry.path)
+                        elif entry.is_file():
+                            batch.append(os.path.relpath(entry.path, root))
+                            count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+        if len(batch) >= CRAWL_BATCH_SIZE:
+            if cancelled():
+                return
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def compile_query(query):
+    """Compile a query into a subsequence pattern: 'abc' matches 'a...b...c'"""
+    query = query.lower().replace(' ', '')
+    if not query:
+        return None
+    return re.compile('.*?'.join(re.escape(char) for char in query))
+
+def rank(index, pattern, candidates=None, limit=MAX_RESULTS):
+    """Return (matching indexes, best `limit` indexes in ranked order)
+
+    Matches whose characters sit close together rank first, then matches that fall
+    inside the file name, then shorter paths.
+    """
+    lower = index.lower
+    search = pattern.search
+    matches = []
+    scored = []
+    for i in (range(len(lower)) if candidates is None else candidates):
+        path = lower[i]
+        match = search(path)
+        if match is None:
+            continue
+        matches.append(i)
+        start, end = match.span()
+        in_name = start > path.rfind('/')
+        scored.append((end - start, not in_name, len(path), i))
+    best = [entry[3] for entry in heapq.nsmallest(limit, scored)]
+    return matches, best
+
+class PathCrawler(QThread):
+    """Lists a directory in the background"""
+
+    paths_found = pyqtSignal(list)
+    crawl_finished = pyqtSignal(list)
+
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        all_paths = []
+        try:
+            for batch in crawl(self.root, lambda: self._cancelled):
+                all_paths.extend(batch)
+                self.paths_found.emit(batch)
+        except Exception as e:
+            print(f"Error crawling {self.root}: {str(e)}")
+            traceback.print_exc()
+        if not self._cancelled:
+            self.crawl_finished.emit(all_paths)
+
+class QuickOpenPalette(QDialog):
+    """Popup for fuzzy-opening a file by path"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.index = None
+        self.crawler = None
+        self._query = ""
+        self._matches = None  # Indexes matching self._query, for incremental filtering
+        self._matches_generation = -1
+
+        self.setWindowFlags(Qt.WindowType.Popup | Qt.WindowType.FramelessWindowHint)
+        self.setMinimumWidth(560)
+
+        self._rank_timer = QTimer(self)
+        self._rank_timer.setSingleShot(True)
+        self._rank_timer.timeout.connect(self.updateResults)
+
+        self.initUI()
+
+    def initUI(self):
+        """Build the palette's widgets"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Open file by name…")
+        self.query_edit.textChanged.connect(self.updateResults)
+        self.query_edit.installEventFilter(self)
+        layout.addWidget(self.query_edit)
+
+        self.results_list = QListWidget()
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.itemActivated.connect(self.openItem)
+        layout.addWidget(self.results_list)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    def showPalette(self, root):
+        """Show the palette for root, reusing (and refreshing if stale) its cached listing"""
+        root = os.path.abspath(root)
+        if self.index is None or self.index.root != root:
+            self._stopCrawler()
+            self.index = get_path_index(root)
+            self._matches = None
+
+        if self.crawler is None and (not self.index.complete or time.monotonic() - self.index.crawled_at > REFRESH_AFTER):
+            self._startCrawler()
+
+        # Center horizontally near the top of the window
+        geometry = self.app.geometry()
+        self.resize(max(self.minimumWidth(), geometry.width() * 2 // 3), min(420, geometry.height() - 80))
+        self.move(geometry.x() + (geometry.width() - self.width()) // 2, geometry.y() + 60)
+
+        self.show()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+        self.updateResults()
+
+    def _startCrawler(self):
+        # A fresh crawl of a known root replaces the listing when done; the old one stays usable meanwhile
+        refreshing = self.index.complete
+        self.crawler = PathCrawler(self.index.root, self)
+        if not refreshing:
+            self.crawler.paths_found.connect(self._onPathsFound)
+        self.crawler.crawl_finished.connect(self._onCrawlFinished)
+        self.crawler.finished.connect(self.crawler.deleteLater)
+        self.crawler.start()
+
+    def _stopCrawler(self):
+        if self.crawler is not None:
+            self.crawler.cancel()
+            self.crawler.paths_found.disconnect()
+            self.crawler.crawl_finished.disconnect()
+            self.crawler = None
+        if self.index is not None and not self.index.complete:
+            # A partial listing can't be resumed; start over next time
+            self.index.replace([])
+
+    def _onPathsFound(self, batch):
+        self.index.add(batch)
+        if self.isVisible() and not self._rank_timer.isActive():
+            self._rank_timer.start(RANK_DEBOUNCE)
+
+    def _onCrawlFinished(self, paths):
+        self.crawler = None
+        if self.index.complete:
+            self.index.replace(paths)
+        self.index.complete = True
+        self.index.crawled_at = time.monotonic()
+        if self.isVisible():
+            self.updateResults()
+
+    def updateResults(self):
+        """Re-rank the listing for the current query"""
+        try:
+            query = self.query_edit.text()
+            pattern = compile_query(query)
+            self.results_list.setUpdatesEnabled(False)
+            self.results_list.clear()
+
+            if pattern is None:
+                self._query, self._matches = "", None
+                best = range(min(MAX_RESULTS, len(self.index.paths)))
+                total = len(self.index.paths)
+            else:
+                # Extending the query can only shrink the matches, so re-filter those
+                candidates = None
+                if (self._matches is not None and self._matches_generation == self.index.generation
+                        and query.lower().startswith(self._query.lower())):
+                    candidates = self._matches
+                matches, best = rank(self.index, pattern, candidates)
+                self._query, self._matches = query, matches
+                self._matches_generation = self.index.generation
+                total = len(matches)
+
+            for i in best:
+                item = QListWidgetItem(self.index.paths[i])
+                item.setData(Qt.ItemDataRole.UserRole, i)
+                self.results_list.addItem(item)
+            if self.results_list.count():
+                self.results_list.setCurrentRow(0)
+
+            crawling = "" if self.index.complete else " (indexing…)"
+            self.status_label.setText(f"{total:,} of {len(self.index.paths):,} files in {self.index.root}{crawling}")
+        except Exception as e:
+            print(f"Error ranking quick open results: {str(e)}")
+            traceback.print_exc()
+        finally:
+            self.results_list.setUpdatesEnabled(True)
+
+    def eventFilter(self, obj, event):
+        """Let the arrow keys move through the results while typing"""
+        if obj is self.query_edit and event.type() == event.Type.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Down, Qt.Key.Key_Up, Qt.Key.Key_PageDown, Qt.Key.Key_PageUp):
+                step = {Qt.Key.Key_Down: 1, Qt.Key.Key_Up: -1, Qt.Key.Key_PageDown: 10, Qt.Key.Key_PageUp: -10}[key]
+                row = max(0, min(self.results_list.count() - 1, self.results_list.currentRow() + step))
+                self.results_list.setCurrentRow(row)
+                return True
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                self.openItem(self.results_list.currentItem())
+                return True
+        return super().eventFilter(obj, event)
+
+    def openItem(self, item):
+        """Open the chosen file in a buffer"""
+        if item is None:
+            return
+        file_path = os.path.join(self.index.root, item.text())
+        self.hide()
+        self.app.openFilePath(file_path)
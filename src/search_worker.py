@@ -0,0 +1,136 @@
+"""
+Search Worker for HyprText
+==========================
+
+The process pool behind Find in Files and the work it runs: searching batches of
+files (here) and re-indexing them (trigram_index.index_batch). Workers unpickle
+their tasks by importing this module, so it and everything it imports stay free of
+PyQt6, settings and extensions; a worker never loads the GUI.
+"""
+
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from text_io import BINARY_SNIFF_SIZE, decode_text, is_probably_binary
+
+# Modules the forkserver imports once, so each forked worker starts with them loaded
+WORKER_MODULES = ['search_worker', 'trigram_index']
+
+# Files larger than this are not searched (bytes)
+MAX_FILE_SIZE = 16 * 1024 * 1024
+
+# Hits kept per file, so a pathological pattern can't flood the panel
+MAX_HITS_PER_FILE = 200
+
+# Matched lines are trimmed to this many characters for display
+MAX_LINE_LENGTH = 300
+
+# Warm worker pool shared by every search in this process
+_executor = None
+_executor_lock = threading.Lock()
+
+def _pool_context():
+    """Return the start method for pool workers
+
+    The pool is created on first use, when the GUI process already runs Qt and
+    extension threads, so workers are never forked from it directly. A forkserver
+    is started once and forks workers from its own single-threaded process; where
+    that is not available, workers are spawned. Either way a worker only needs the
+    Qt-free modules in WORKER_MODULES to run its tasks.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Without '__main__' in the list the forkserver doesn't import the GUI entry point
+        context.set_forkserver_preload(WORKER_MODULES)
+        return context
+    return multiprocessing.get_context('spawn')
+
+def get_executor():
+    """Return the shared process pool, starting it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(mp_context=_pool_context())
+            atexit.register(shutdown_executor)
+        return _executor
+
+def shutdown_executor():
+    """Stop the shared pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _noop():
+    return None
+
+def warm_up():
+    """Start the pool's worker processes ahead of the first search"""
+    executor = get_executor()
+    for _ in range(os.cpu_count() or 1):
+        executor.submit(_noop)
+
+def compile_search_pattern(text, case_sensitive=False, use_regex=False):
+    """Compile the search text, raising re.error for an invalid regex"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(text if use_regex else re.escape(text), flags)
+
+def search_file(file_path, pattern, max_hits=MAX_HITS_PER_FILE):
+    """Return [(line_number, column, line_text)] for the matches in one file"""
+    try:
+        if os.path.getsize(file_path) > MAX_FILE_SIZE:
+            return []
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+
+    if is_probably_binary(data[:BINARY_SNIFF_SIZE]):
+        return []
+    try:
+        content, _ = decode_text(data)
+    except Exception:
+        return []
+
+    # One C-level scan rejects most files before any per-line work
+    match = pattern.search(content)
+    if match is None:
+        return []
+
+    hits = []
+    line_number = 1
+    scanned = 0
+    last_line_start = -1
+    while match is not None and len(hits) < max_hits:
+        start = match.start()
+        line_number += content.count('\n', scanned, start)
+        scanned = start
+        line_start = content.rfind('\n', 0, start) + 1
+
+        # Report each line once, at its first match
+        if line_start != last_line_start:
+            line_end = content.find('\n', start)
+            line = content[line_start:line_end if line_end != -1 else len(content)].rstrip('\r')
+            hits.append((line_number, start - line_start, line.strip()[:MAX_LINE_LENGTH]))
+            last_line_start = line_start
+
+        match = pattern.search(content, max(match.end(), start + 1))
+    return hits
+
+def search_batch(file_paths, pattern_text, case_sensitive, use_regex):
+    """Search a batch of files in a worker process
+
+    Returns:
+        tuple: (number of files searched, [(path, line_number, column, line_text)])
+    """
+    pattern = compile_search_pattern(pattern_text, case_sensitive, use_regex)
+    results = []
+    for file_path in file_paths:
+        for line_number, column, line in search_file(file_path, pattern):
+            results.append((file_path, line_number, column, line))
+    return len(file_paths), results
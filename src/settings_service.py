@@ -0,0 +1,140 @@
+"""
+HyprText Settings Service
+=========================
+
+One place to read and write the application's QSettings. Values are cached in
+memory after the first read, and writes are collected and handed to QSettings in a
+single batch once things have been quiet for FLUSH_DELAY, so toggling an option or
+switching a theme never waits on the settings file. Pending writes are flushed
+when the application quits and, as a last resort, when the interpreter exits.
+"""
+
+import atexit
+import copy
+import threading
+import traceback
+from PyQt6.QtCore import QCoreApplication, QSettings, QThread, QTimer
+
+from theme_default import APP_NAME
+
+# Quiet time after the last write before pending values go to disk (ms)
+FLUSH_DELAY = 2000
+
+_MISSING = object()
+
+def _detach(value):
+    """Copy mutable containers, so callers never share an object with the cache"""
+    if isinstance(value, (list, dict)):
+        return copy.deepcopy(value)
+    return value
+
+def _convert(value, value_type, default):
+    """Coerce a stored value the way QSettings.value(..., type=...) would"""
+    if value_type is None or isinstance(value, value_type):
+        return value
+    try:
+        if value_type is bool:
+            if isinstance(value, str):
+                return value.strip().lower() in ("true", "1", "yes", "on")
+            return bool(value)
+        if value_type is list:
+            return [value] if isinstance(value, str) else list(value)
+        return value_type(value)
+    except (TypeError, ValueError):
+        return default
+
+class SettingsService:
+    """Cached, batched access to the HyprText settings"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get or create the singleton instance"""
+        if cls._instance is None:
+            cls._instance = SettingsService()
+        return cls._instance
+
+    def __init__(self, organization=APP_NAME, application=APP_NAME):
+        if SettingsService._instance is not None:
+            raise RuntimeError("SettingsService is a singleton. Use get_instance() instead.")
+        self.organization = organization
+        self.application = application
+        self._settings = None  # QSettings, created on first use
+        self._cache = {}  # Dictionary of key: value as last read or written (_MISSING if unset)
+        self._pending = {}  # Dictionary of key: value (or _MISSING to remove) not yet written
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    @property
+    def settings(self):
+        if self._settings is None:
+            self._settings = QSettings(self.organization, self.application)
+        return self._settings
+
+    def value(self, key, default=None, type=None):
+        """Return a setting, reading it from QSettings only the first time"""
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING and key not in self._cache:
+                value = self.settings.value(key)
+                if value is None:
+                    value = _MISSING
+                self._cache[key] = value
+        if value is _MISSING:
+            return default
+        return _detach(_convert(value, type, default))
+
+    def setValue(self, key, value):
+        """Change a setting now; it is written to disk with the next batch"""
+        value = _detach(value)
+        with self._lock:
+            cached = self._cache.get(key, _MISSING)
+            if cached is not _MISSING and type(cached) is type(value) and cached == value:
+                return
+            self._cache[key] = _MISSING if value is None else value
+            self._pending[key] = value
+        self._schedule_flush()
+
+    def remove(self, key):
+        """Remove a setting; it is removed on disk with the next batch"""
+        with self._lock:
+            self._cache[key] = _MISSING
+            self._pending[key] = _MISSING
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        # The timer lives on the GUI thread; before the application exists (or from
+        # worker threads) the values simply wait for the next flush
+        app = QCoreApplication.instance()
+        if app is None or QThread.currentThread() is not app.thread():
+            return
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.setInterval(FLUSH_DELAY)
+            self._timer.timeout.connect(self.flush)
+            app.aboutToQuit.connect(self.flush)
+        self._timer.start()
+
+    def flush(self):
+        """Write all pending changes to disk in one batch"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            settings = self.settings
+            for key, value in pending.items():
+                if value is _MISSING:
+                    settings.remove(key)
+                else:
+                    settings.setValue(key, value)
+            settings.sync()
+        except Exception as e:
+            print(f"Error writing settings: {str(e)}")
+            traceback.print_exc()
+
+# Initialize the singleton instance
+settings_service = SettingsService.get_instance()
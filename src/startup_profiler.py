@@ -0,0 +1,151 @@
+"""
+Startup Profiler for HyprText
+=============================
+
+This module timestamps each startup phase and every plugin import so regressions in
+cold-start latency can be caught. Timings are always collected (a couple of
+perf_counter calls per phase); a report is only written when profiling is requested:
+
+    ./run.sh --profile-startup[=report.json] [--profile-startup-cprofile[=dump.prof]]
+
+The report is JSON with one entry per phase and per plugin import, in milliseconds
+relative to the moment this module was imported.
+"""
+
+import json
+import os
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+
+# Default output paths, relative to the working directory
+DEFAULT_REPORT_PATH = "startup_profile.json"
+DEFAULT_CPROFILE_PATH = "startup_profile.prof"
+
+# Bumped whenever the report layout changes
+REPORT_VERSION = 1
+
+class StartupProfiler:
+    """Collects startup phase and plugin import timings"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.report_path = None
+        self.cprofile_path = None
+        self.phases = []  # List of {"name", "start_ms", "duration_ms"}
+        self.plugins = []  # List of {"kind", "name", "start_ms", "duration_ms"}
+        self.marks = []  # List of {"name", "at_ms"}
+        self.finished = False
+        self._profile = None
+        self._depth = 0
+
+    def configure_from_argv(self, argv):
+        """Enable profiling if requested and remove the profiler's flags from argv in place"""
+        remaining = argv[:1]
+        for arg in argv[1:]:
+            if arg == '--profile-startup':
+                self.report_path = DEFAULT_REPORT_PATH
+            elif arg.startswith('--profile-startup='):
+                self.report_path = arg.split('=', 1)[1] or DEFAULT_REPORT_PATH
+            elif arg == '--profile-startup-cprofile':
+                self.cprofile_path = DEFAULT_CPROFILE_PATH
+            elif arg.startswith('--profile-startup-cprofile='):
+                self.cprofile_path = arg.split('=', 1)[1] or DEFAULT_CPROFILE_PATH
+            else:
+                remaining.append(arg)
+        argv[:] = remaining
+
+        # A cProfile dump implies a report as well
+        if self.cprofile_path and not self.report_path:
+            self.report_path = DEFAULT_REPORT_PATH
+        self.enabled = self.report_path is not None
+
+        if self.cprofile_path:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def _now_ms(self):
+        """Milliseconds since the profiler was created"""
+        return (time.perf_counter() - self.origin) * 1000.0
+
+    def mark(self, name):
+        """Record a point in time"""
+        if not self.finished:
+            self.marks.append({"name": name, "at_ms": round(self._now_ms(), 3)})
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work"""
+        if self.finished:
+            yield
+            return
+
+        start = self._now_ms()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases.append({
+                "name": name,
+                "depth": self._depth,
+                "start_ms": round(start, 3),
+                "duration_ms": round(self._now_ms() - start, 3)
+            })
+
+    def record_plugin(self, kind, name, started):
+        """Record a plugin import that began at perf_counter() value `started`"""
+        if self.finished:
+            return
+        start_ms = (started - self.origin) * 1000.0
+        self.plugins.append({
+            "kind": kind,
+            "name": name,
+            "start_ms": round(start_ms, 3),
+            "duration_ms": round(self._now_ms() - start_ms, 3)
+        })
+
+    def build_report(self):
+        """Return the report as a JSON-serializable dictionary"""
+        return {
+            "version": REPORT_VERSION,
+            "python": sys.version.split()[0],
+            "argv": sys.argv[1:],
+            "total_ms": round(self._now_ms(), 3),
+            "phases": sorted(self.phases, key=lambda p: p["start_ms"]),
+            "plugins": self.plugins,
+            "marks": self.marks,
+            "cprofile": os.path.abspath(self.cprofile_path) if self.cprofile_path else None
+        }
+
+    def finish(self):
+        """Stop collecting and write the report if profiling was requested"""
+        if self.finished:
+            return
+        self.mark("startup_complete")
+        self.finished = True
+
+        if not self.enabled:
+            return
+
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+                self._profile.dump_stats(self.cprofile_path)
+
+            report = self.build_report()
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+            print(f"Startup took {report['total_ms']:.1f} ms, report written to {os.path.abspath(self.report_path)}")
+            for phase in report["phases"]:
+                print(f"  {'  ' * phase['depth']}{phase['name']}: {phase['duration_ms']:.1f} ms")
+        except Exception as e:
+            print(f"Error writing startup profile: {str(e)}")
+            traceback.print_exc()
+
+# Create a global instance as early as possible so its origin is close to process start
+startup_profiler = StartupProfiler()
@@ -0,0 +1,145 @@
+"""
+Text I/O helpers for HyprText
+=============================
+
+This module holds the encoding detection and line-ending normalization rules used by
+FileManager. It does not import PyQt6, so headless tools can reuse the exact same
+rules without starting a QApplication or loading a theme.
+"""
+
+import codecs
+import os
+
+# Encodings tried, in order, when a file isn't valid UTF-8
+FALLBACK_ENCODINGS = ['latin-1', 'cp1252', 'utf-16', 'utf-32']
+
+# Encoding used for every file HyprText writes
+DEFAULT_ENCODING = 'utf-8'
+
+# Number of leading bytes inspected when deciding whether a file is binary
+BINARY_SNIFF_SIZE = 1024
+
+# Chunk size used by the streaming converter
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def is_probably_binary(head):
+    """Check the first bytes of a file for null bytes, which text files don't contain"""
+    return b'\x00' in head[:BINARY_SNIFF_SIZE]
+
+def normalize_line_endings(content):
+    """Convert Windows and old Mac line endings to Unix line endings"""
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+def decode_text(data):
+    """Decode raw file bytes, returning (content, encoding)
+
+    UTF-8 is tried first, then FALLBACK_ENCODINGS. Line endings are left as they are.
+    Binary data raises an exception.
+    """
+    for encoding in [DEFAULT_ENCODING] + FALLBACK_ENCODINGS:
+        try:
+            return data.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+
+    # Check if it's likely a text file with unknown encoding
+    if not is_probably_binary(data):
+        return data.decode('latin-1', errors='replace'), 'latin-1'
+    raise Exception("The file appears to be binary and cannot be opened in a text editor")
+
+def read_text(file_path):
+    """Read a text file, returning (content, encoding)
+
+    The file is read once and decoded with decode_text; line endings are normalized
+    to '\n'. Binary files raise an exception.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    content, encoding = decode_text(data)
+    return normalize_line_endings(content), encoding
+
+def write_text(file_path, content, encoding=DEFAULT_ENCODING):
+    """Write content with normalized line endings"""
+    with open(file_path, 'w', encoding=encoding, newline='') as f:
+        f.write(normalize_line_endings(content))
+
+def _normalize_stream(src, dst, encoding, chunk_size):
+    """Decode src with encoding and write normalized UTF-8 text to dst
+
+    Returns True if any line ending had to be rewritten. Raises UnicodeDecodeError
+    if src isn't valid in the given encoding.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    rewrote_line_endings = False
+    pending_cr = False
+
+    while True:
+        raw = src.read(chunk_size)
+        final = not raw
+        text = decoder.decode(raw, final=final)
+
+        # A '\r' at the end of a chunk may be the first half of a '\r\n' pair
+        if pending_cr:
+            text = '\r' + text
+        pending_cr = text.endswith('\r') and not final
+        if pending_cr:
+            text = text[:-1]
+
+        if '\r' in text:
+            rewrote_line_endings = True
+            text = normalize_line_endings(text)
+        if text:
+            dst.write(text.encode(DEFAULT_ENCODING))
+        if final:
+            return rewrote_line_endings
+
+def normalize_file(file_path, dry_run=False, chunk_size=STREAM_CHUNK_SIZE):
+    """Rewrite a file the way FileManager would save it, streaming in chunks
+
+    The file is transcoded to UTF-8 with Unix line endings through a temporary file
+    that atomically replaces the original, so memory use stays flat for huge files.
+    Files that are already normalized are left untouched.
+
+    Returns:
+        dict: path, bytes_in, bytes_out, encoding, changed and skipped (reason or None)
+    """
+    result = {
+        "path": file_path,
+        "bytes_in": os.path.getsize(file_path),
+        "bytes_out": 0,
+        "encoding": None,
+        "changed": False,
+        "skipped": None
+    }
+
+    with open(file_path, 'rb') as src:
+        if is_probably_binary(src.read(BINARY_SNIFF_SIZE)):
+            result["skipped"] = "binary"
+            return result
+
+        tmp_path = f"{file_path}.hyprtext-tmp"
+        try:
+            for encoding in [DEFAULT_ENCODING] + FALLBACK_ENCODINGS:
+                src.seek(0)
+                try:
+                    with open(tmp_path, 'wb') as dst:
+                        rewrote = _normalize_stream(src, dst, encoding, chunk_size)
+                except UnicodeDecodeError:
+                    continue
+                result["encoding"] = encoding
+                result["changed"] = rewrote or encoding != DEFAULT_ENCODING
+                result["bytes_out"] = os.path.getsize(tmp_path)
+                break
+            else:
+                result["skipped"] = "undecodable"
+                return result
+
+            if result["changed"] and not dry_run:
+                # Keep the original permissions on the rewritten file
+                os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+                os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return result
@@ -0,0 +1,248 @@
+"""
+HyprText Theme Compiler
+=======================
+
+Turns a theme module into a bundle of everything the editor needs from it: the
+formatted application and file dialog stylesheets for dark and light mode, the
+colors of a matching QPalette, the shadow parameters, the font and the theme's
+metadata. Bundles are pickled to ~/.cache/hyprtext/themes and reused until the
+theme file (or theme_default.py, which supplies missing values) changes, so a
+theme switch is a dictionary lookup rather than formatting large templates, and
+startup doesn't need to import theme modules whose bundle is up to date.
+
+Compile every installed theme ahead of time with:
+
+    python src/theme_compiler.py [--force] [theme files...]
+
+This module does not import PyQt6.
+"""
+
+import hashlib
+import importlib.util
+import os
+import pickle
+import re
+import sys
+import traceback
+
+import theme_default
+
+# Bumped whenever the bundle layout changes; older bundles are recompiled
+BUNDLE_VERSION = 1
+
+# QPalette color roles and the theme color each one is taken from
+PALETTE_ROLES = {
+    "Window": "background",
+    "WindowText": "text",
+    "Base": "background",
+    "AlternateBase": "menu_bg",
+    "Text": "text",
+    "Button": "menu_bg",
+    "ButtonText": "text",
+    "Highlight": "menu_hover",
+    "HighlightedText": "accent",
+    "ToolTipBase": "menu_bg",
+    "ToolTipText": "text",
+    "PlaceholderText": "accent",
+    "Link": "accent",
+}
+
+_RGB_FUNCTION = re.compile(r'rgba?\(\s*([^)]*)\)', re.IGNORECASE)
+
+def get_bundle_directory():
+    """Return the directory compiled bundles are stored in"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "hyprtext", "themes")
+
+def get_themes_directory():
+    """Return mods/themes next to src/"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(app_dir, "mods", "themes")
+
+def parse_css_color(value):
+    """Parse '#rgb', '#rrggbb', '#rrggbbaa' or 'rgb[a](r, g, b[, a])' into an (r, g, b, a) tuple, or None"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.startswith('#'):
+        digits = value[1:]
+        if len(digits) == 3:
+            digits = ''.join(char * 2 for char in digits)
+        if len(digits) in (6, 8):
+            try:
+                channels = [int(digits[i:i + 2], 16) for i in range(0, len(digits), 2)]
+            except ValueError:
+                return None
+            return tuple(channels) if len(channels) == 4 else (*channels, 255)
+        return None
+
+    match = _RGB_FUNCTION.fullmatch(value)
+    if match is None:
+        return None
+    parts = [part.strip() for part in match.group(1).split(',')]
+    if len(parts) not in (3, 4):
+        return None
+    try:
+        red, green, blue = (int(float(part)) for part in parts[:3])
+        alpha = 255
+        if len(parts) == 4:
+            # CSS alpha is 0-1 (or a percentage)
+            alpha_part = parts[3]
+            alpha = float(alpha_part[:-1]) / 100 if alpha_part.endswith('%') else float(alpha_part)
+            alpha = round(max(0.0, min(1.0, alpha)) * 255)
+    except ValueError:
+        return None
+    return (red, green, blue, alpha)
+
+def source_stamp(module_path):
+    """Return what a bundle depends on: (mtime_ns, size) of the theme file and of theme_default.py"""
+    stamps = []
+    for path in (module_path, theme_default.__file__):
+        stat = os.stat(path)
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+def get_bundle_path(module_path):
+    """Return where the bundle for a theme file is stored"""
+    module_path = os.path.abspath(module_path)
+    digest = hashlib.sha1(module_path.encode('utf-8', errors='surrogatepass')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(module_path))[0]
+    return os.path.join(get_bundle_directory(), f"{name}-{digest}.pickle")
+
+def load_theme_source(module_path):
+    """Import a theme file"""
+    if os.path.abspath(module_path) == os.path.abspath(theme_default.__file__):
+        return theme_default
+    module_name = os.path.splitext(os.path.basename(module_path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def _compile_variant(module, is_dark):
+    if is_dark:
+        colors = getattr(module, 'DARK_MODE', theme_default.DARK_MODE)
+        template = getattr(module, 'DARK_STYLESHEET_TEMPLATE', theme_default.DARK_STYLESHEET_TEMPLATE)
+        default_colors = theme_default.DARK_MODE
+    else:
+        colors = getattr(module, 'LIGHT_MODE', theme_default.LIGHT_MODE)
+        template = getattr(module, 'LIGHT_STYLESHEET_TEMPLATE', theme_default.LIGHT_STYLESHEET_TEMPLATE)
+        default_colors = theme_default.LIGHT_MODE
+
+    try:
+        stylesheet = template % colors
+    except Exception as e:
+        print(f"Error formatting stylesheet of {getattr(module, 'THEME_NAME', module.__name__)}: {str(e)}")
+        default_template = (theme_default.DARK_STYLESHEET_TEMPLATE if is_dark
+                            else theme_default.LIGHT_STYLESHEET_TEMPLATE)
+        stylesheet = default_template % default_colors
+
+    # Dialogs only use a few colors; fill any the theme leaves out from the default theme
+    dialog_colors = {**default_colors, **colors}
+    dialog_template = getattr(module, 'FILE_DIALOG_STYLESHEET_TEMPLATE', theme_default.FILE_DIALOG_STYLESHEET_TEMPLATE)
+    try:
+        dialog_stylesheet = dialog_template % dialog_colors
+    except Exception as e:
+        print(f"Error formatting dialog stylesheet of {getattr(module, 'THEME_NAME', module.__name__)}: {str(e)}")
+        dialog_stylesheet = theme_default.FILE_DIALOG_STYLESHEET_TEMPLATE % dialog_colors
+
+    palette = {}
+    for role, color_key in PALETTE_ROLES.items():
+        rgba = parse_css_color(dialog_colors.get(color_key))
+        if rgba is not None:
+            palette[role] = rgba
+
+    return {
+        "colors": dict(colors),
+        "stylesheet": stylesheet,
+        "dialog_stylesheet": dialog_stylesheet,
+        "palette": palette,
+    }
+
+def compile_theme(module_path, module=None):
+    """Build the bundle for a theme file, importing it unless module is given"""
+    module_path = os.path.abspath(module_path)
+    stamp = source_stamp(module_path)
+    if module is None:
+        module = load_theme_source(module_path)
+    return {
+        "version": BUNDLE_VERSION,
+        "source": module_path,
+        "stamp": stamp,
+        "name": getattr(module, 'THEME_NAME', None),
+        "description": getattr(module, 'THEME_DESCRIPTION', None),
+        "author": getattr(module, 'THEME_AUTHOR', "Unknown"),
+        "version_string": getattr(module, 'THEME_VERSION', "1.0"),
+        "font": (getattr(module, 'DEFAULT_FONT', theme_default.DEFAULT_FONT),
+                 getattr(module, 'DEFAULT_FONT_SIZE', theme_default.DEFAULT_FONT_SIZE)),
+        "use_transparency": getattr(module, 'USE_TRANSPARENCY', True),
+        "shadow": dict(getattr(module, 'SHADOW_EFFECT', theme_default.SHADOW_EFFECT)),
+        "dark": _compile_variant(module, True),
+        "light": _compile_variant(module, False),
+    }
+
+def save_bundle(bundle):
+    """Write a bundle atomically"""
+    try:
+        os.makedirs(get_bundle_directory(), exist_ok=True)
+        path = get_bundle_path(bundle["source"])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Failed to save theme bundle for {bundle.get('source')}: {str(e)}")
+        traceback.print_exc()
+
+def load_bundle(module_path):
+    """Return the stored bundle for a theme file, or None if there is none or it is stale"""
+    module_path = os.path.abspath(module_path)
+    try:
+        with open(get_bundle_path(module_path), 'rb') as f:
+            bundle = pickle.load(f)
+        if (bundle.get("version") == BUNDLE_VERSION and bundle.get("source") == module_path
+                and bundle.get("stamp") == source_stamp(module_path)):
+            return bundle
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Discarding unreadable theme bundle for {module_path}: {str(e)}")
+    return None
+
+def get_bundle(module_path, module=None):
+    """Return an up-to-date bundle for a theme file, compiling and storing it if needed"""
+    bundle = load_bundle(module_path)
+    if bundle is None:
+        bundle = compile_theme(module_path, module)
+        save_bundle(bundle)
+    return bundle
+
+def main(argv=None):
+    """Compile the given theme files, or every installed theme"""
+    args = list(sys.argv[1:] if argv is None else argv)
+    force = '--force' in args
+    paths = [arg for arg in args if arg != '--force']
+    if not paths:
+        paths = [theme_default.__file__]
+        themes_dir = get_themes_directory()
+        if os.path.isdir(themes_dir):
+            paths += sorted(os.path.join(themes_dir, f) for f in os.listdir(themes_dir)
+                            if f.endswith('.py') and f != '__init__.py')
+
+    failed = 0
+    for path in paths:
+        try:
+            if not force and load_bundle(path) is not None:
+                print(f"Up to date: {path}")
+                continue
+            bundle = compile_theme(path)
+            save_bundle(bundle)
+            print(f"Compiled {bundle['name'] or path} -> {get_bundle_path(path)}")
+        except Exception as e:
+            print(f"Failed to compile {path}: {str(e)}")
+            failed += 1
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -532,4 +532,128 @@ LIGHT_STYLESHEET_TEMPLATE = """
         padding: 0 5px;
         color: %(accent)s;
     }
-""" 
\ No newline at end of file
+"""
+
+# Stylesheet template for the open/save dialogs, filled with DARK_MODE or LIGHT_MODE
+FILE_DIALOG_STYLESHEET_TEMPLATE = """
+    QFileDialog {
+        background-color: %(menu_bg)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        border-radius: 8px;
+    }
+    QDialog, QFileDialog QWidget {
+        background-color: %(menu_bg)s;
+        color: %(text)s;
+    }
+    QListView, QTreeView {
+        background-color: %(background)s;
+        color: %(text)s;
+        font-size: 12pt;
+        border: 1px solid %(accent)s;
+        border-radius: 6px;
+        padding: 4px;
+        selection-background-color: %(menu_hover)s;
+        selection-color: %(accent)s;
+    }
+    QHeaderView::section {
+        background-color: %(menu_bg)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        padding: 4px;
+    }
+    QPushButton {
+        background-color: %(menu_bg)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        border-radius: 6px;
+        padding: 6px 12px;
+        min-width: 80px;
+    }
+    QPushButton:hover {
+        background-color: %(menu_hover)s;
+        color: %(accent)s;
+        border: 1px solid %(accent)s;
+    }
+    QPushButton:pressed {
+        background-color: %(menu_active)s;
+    }
+    QLineEdit {
+        background-color: %(background)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        border-radius: 6px;
+        padding: 5px;
+        font-size: 12pt;
+    }
+    QLineEdit:focus {
+        border: 2px solid %(accent)s;
+    }
+    QComboBox {
+        background-color: %(background)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        border-radius: 6px;
+        padding: 5px;
+        font-size: 12pt;
+    }
+    QComboBox:hover {
+        background-color: %(menu_hover)s;
+        color: %(accent)s;
+    }
+    QComboBox::drop-down {
+        border: none;
+        width: 24px;
+    }
+    QComboBox QAbstractItemView {
+        background-color: %(menu_bg)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        selection-background-color: %(menu_hover)s;
+        selection-color: %(accent)s;
+    }
+    QToolButton {
+        background-color: %(menu_bg)s;
+        color: %(text)s;
+        border: 1px solid %(accent)s;
+        border-radius: 4px;
+    }
+    QToolButton:hover {
+        background-color: %(menu_hover)s;
+        color: %(accent)s;
+    }
+    QToolButton:pressed {
+        background-color: %(menu_active)s;
+    }
+    QLabel {
+        color: %(text)s;
+    }
+    QScrollBar:vertical {
+        border: none;
+        background-color: transparent;
+        width: 12px;
+        margin: 0px;
+    }
+    QScrollBar::handle:vertical {
+        background-color: %(accent)s;
+        border-radius: 6px;
+        min-height: 20px;
+    }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+        height: 0px;
+    }
+    QScrollBar:horizontal {
+        border: none;
+        background-color: transparent;
+        height: 12px;
+        margin: 0px;
+    }
+    QScrollBar::handle:horizontal {
+        background-color: %(accent)s;
+        border-radius: 6px;
+        min-width: 20px;
+    }
+    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
+        width: 0px;
+    }
+"""
@@ -1,16 +1,22 @@
 import darkdetect
-from PyQt6.QtGui import QFont, QColor
+from PyQt6.QtGui import QFont, QColor, QPalette
 from PyQt6.QtWidgets import QGraphicsDropShadowEffect
-from PyQt6.QtCore import QPointF, QSettings
+from PyQt6.QtCore import QPointF
 import os
 import importlib.util
 import sys
+import time
 import traceback
 
+import theme_compiler
+import theme_default
+from startup_profiler import startup_profiler
+from settings_service import settings_service
+
 # Import default theme
 from theme_default import (
     APP_NAME, DEFAULT_FONT, DEFAULT_FONT_SIZE, 
-    DARK_MODE, LIGHT_MODE, SHADOW_EFFECT,
+    DARK_MODE, LIGHT_MODE,
     DARK_STYLESHEET_TEMPLATE, LIGHT_STYLESHEET_TEMPLATE
 )
 
@@ -21,11 +27,18 @@ DARK_TEXT = DARK_MODE["text"]
 LIGHT_BG = LIGHT_MODE["background"]
 LIGHT_TEXT = LIGHT_MODE["text"]
 
+# darkdetect spawns a process on Linux, so its answer is reused for this long (seconds)
+DARK_MODE_CACHE_SECONDS = 1.0
+
 class ThemeManager:
     """Manages theme settings and styling for the application"""
     
     _current_theme = None
     _available_themes = {}
+    _dark_mode_cache = None  # Tuple of (is_dark, monotonic time it was read)
+    _bundles = {}  # Dictionary of theme name: compiled bundle (see theme_compiler)
+    _palettes = {}  # Dictionary of (theme name, is_dark): QPalette
+    _reload_pending = {}  # Dictionary of module path: name of the current theme whose file failed to reload
     
     @classmethod
     def initialize(cls):
@@ -45,8 +58,7 @@ class ThemeManager:
         cls.discover_themes()
         
         # Load theme from settings
-        settings = QSettings(APP_NAME, APP_NAME)
-        theme_name = settings.value('theme', "Default")
+        theme_name = settings_service.value('theme', "Default")
         
         # Default to "Default" if the saved theme is not available
         if theme_name not in cls._available_themes:
@@ -77,37 +89,186 @@ class ThemeManager:
             # Find all Python files in the directory
             for filename in os.listdir(themes_dir):
                 if filename.endswith(".py") and filename != "__init__.py":
-                    module_name = filename[:-3]  # Remove .py extension
-                    module_path = os.path.join(themes_dir, filename)
-                    
-                    try:
-                        # Load the module
-                        spec = importlib.util.spec_from_file_location(module_name, module_path)
-                        module = importlib.util.module_from_spec(spec)
-                        sys.modules[module_name] = module
-                        spec.loader.exec_module(module)
-                        
-                        # Check for required attributes
-                        if hasattr(module, 'THEME_NAME') and hasattr(module, 'THEME_DESCRIPTION'):
-                            theme_name = module.THEME_NAME
-                            cls._available_themes[theme_name] = {
-                                "module_path": module_path,
-                                "name": theme_name,
-                                "description": module.THEME_DESCRIPTION,
-                                "author": getattr(module, 'THEME_AUTHOR', "Unknown"),
-                                "version": getattr(module, 'THEME_VERSION', "1.0"),
-                                "module": module
-                            }
-                            print(f"Loaded theme: {theme_name}")
-                        else:
-                            print(f"Skipping {filename}: Missing required attributes")
-                    except Exception as e:
-                        print(f"Error loading theme {filename}: {str(e)}")
-                        traceback.print_exc()
+                    cls._register_theme_file(os.path.join(themes_dir, filename))
         except Exception as e:
             print(f"Error discovering themes: {str(e)}")
             traceback.print_exc()
     
+    @classmethod
+    def _register_theme_file(cls, module_path):
+        """Register a theme from its compiled bundle if that is up to date, otherwise import it"""
+        try:
+            bundle = theme_compiler.load_bundle(module_path)
+        except OSError:
+            bundle = None
+        if bundle is None or not bundle.get("name") or bundle.get("description") is None:
+            return cls._load_theme_file(module_path)
+        
+        # The module itself is only imported if something needs more than the bundle
+        theme_name = bundle["name"]
+        cls._available_themes[theme_name] = {
+            "module_path": module_path,
+            "name": theme_name,
+            "description": bundle["description"],
+            "author": bundle["author"],
+            "version": bundle["version_string"],
+            "module": None
+        }
+        cls._bundles[theme_name] = bundle
+        print(f"Loaded theme: {theme_name} (compiled)")
+        return theme_name
+    
+    @classmethod
+    def _load_theme_file(cls, module_path):
+        """Import one theme file and register it; returns the theme name or None"""
+        filename = os.path.basename(module_path)
+        module_name = filename[:-3]  # Remove .py extension
+        try:
+            # Load the module
+            started = time.perf_counter()
+            spec = importlib.util.spec_from_file_location(module_name, module_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            startup_profiler.record_plugin("theme", module_name, started)
+            
+            # Check for required attributes
+            if hasattr(module, 'THEME_NAME') and hasattr(module, 'THEME_DESCRIPTION'):
+                theme_name = module.THEME_NAME
+                cls._available_themes[theme_name] = {
+                    "module_path": module_path,
+                    "name": theme_name,
+                    "description": module.THEME_DESCRIPTION,
+                    "author": getattr(module, 'THEME_AUTHOR', "Unknown"),
+                    "version": getattr(module, 'THEME_VERSION', "1.0"),
+                    "module": module
+                }
+                print(f"Loaded theme: {theme_name}")
+                return theme_name
+            print(f"Skipping {filename}: Missing required attributes")
+        except Exception as e:
+            print(f"Error loading theme {filename}: {str(e)}")
+            traceback.print_exc()
+        return None
+    
+    @classmethod
+    def reload_theme_file(cls, module_path):
+        """Re-import a single theme file that was added, changed or removed
+        
+        The current theme follows a rename of its THEME_NAME. Returns (old_name, new_name);
+        old_name is None for a new file and new_name is None if the file is gone or broken.
+        
+        The current theme stays current while its file is broken (e.g. halfway through a
+        save), drawn from its last compiled bundle, and picks up the new code once the
+        file loads again. Only deleting the file falls back to Default.
+        """
+        old_name = None
+        pending_name = cls._reload_pending.pop(module_path, None)
+        for theme_name, theme_info in list(cls._available_themes.items()):
+            if theme_info.get("module_path") == module_path:
+                old_name = theme_name
+                del cls._available_themes[theme_name]
+        
+        previous_name = old_name or pending_name
+        exists = os.path.exists(module_path)
+        new_name = cls._load_theme_file(module_path) if exists else None
+        is_current = previous_name is not None and cls._current_theme == previous_name
+        if is_current and new_name is None and exists:
+            # Keep the last good bundle until the file is fixed
+            cls._reload_pending[module_path] = previous_name
+            return old_name, new_name
+        
+        cls._forget_bundle(previous_name)
+        cls._forget_bundle(new_name)
+        if is_current:
+            cls._current_theme = new_name or "Default"
+        return old_name, new_name
+    
+    @classmethod
+    def get_bundle(cls, theme_name=None):
+        """Return the compiled bundle of a theme (the current one by default)
+        
+        The stored bundle is used when it is newer than the theme's source, otherwise
+        the theme is compiled and the bundle stored for the next start.
+        """
+        theme_name = theme_name or cls.get_current_theme()
+        bundle = cls._bundles.get(theme_name)
+        if bundle is not None:
+            return bundle
+        
+        if theme_name not in cls._available_themes:
+            theme_name = "Default"
+        theme_info = cls._available_themes[theme_name]
+        module_path = theme_info.get("module_path") or theme_default.__file__
+        # Reuse the module if discovery already imported it; otherwise it is only imported if stale
+        bundle = theme_compiler.get_bundle(module_path, theme_info.get("module"))
+        cls._bundles[theme_name] = bundle
+        return bundle
+    
+    @classmethod
+    def _forget_bundle(cls, theme_name):
+        """Drop a theme's bundle and palettes from memory, e.g. after it was reloaded"""
+        if theme_name is None:
+            return
+        cls._bundles.pop(theme_name, None)
+        cls._palettes.pop((theme_name, True), None)
+        cls._palettes.pop((theme_name, False), None)
+    
+    @classmethod
+    def _get_variant(cls, is_dark=None):
+        """Return the dark or light part of the current theme's bundle"""
+        if is_dark is None:
+            is_dark = cls.is_dark_mode()
+        return cls.get_bundle()["dark" if is_dark else "light"]
+    
+    @classmethod
+    def get_theme_colors(cls, is_dark=None):
+        """Return the current theme's color dictionary for dark or light mode"""
+        try:
+            return cls._get_variant(is_dark)["colors"]
+        except Exception as e:
+            print(f"Error getting theme colors: {str(e)}")
+            traceback.print_exc()
+            return DARK_MODE if (cls.is_dark_mode() if is_dark is None else is_dark) else LIGHT_MODE
+    
+    @classmethod
+    def uses_transparency(cls):
+        """Check whether the current theme wants a translucent window"""
+        try:
+            return cls.get_bundle()["use_transparency"]
+        except Exception as e:
+            print(f"Error reading theme transparency: {str(e)}")
+            return True
+    
+    @classmethod
+    def get_palette(cls, is_dark=None):
+        """Return a QPalette matching the current theme"""
+        if is_dark is None:
+            is_dark = cls.is_dark_mode()
+        key = (cls.get_current_theme(), is_dark)
+        palette = cls._palettes.get(key)
+        if palette is None:
+            palette = QPalette()
+            try:
+                for role, rgba in cls._get_variant(is_dark)["palette"].items():
+                    palette.setColor(QPalette.ColorRole[role], QColor(*rgba))
+            except Exception as e:
+                print(f"Error building theme palette: {str(e)}")
+                traceback.print_exc()
+            cls._palettes[key] = palette
+        return palette
+    
+    @classmethod
+    def get_dialog_stylesheet(cls, is_dark=None):
+        """Get the stylesheet for the open/save dialogs"""
+        try:
+            return cls._get_variant(is_dark)["dialog_stylesheet"]
+        except Exception as e:
+            print(f"Error getting dialog stylesheet: {str(e)}")
+            traceback.print_exc()
+            colors = DARK_MODE if (cls.is_dark_mode() if is_dark is None else is_dark) else LIGHT_MODE
+            return theme_default.FILE_DIALOG_STYLESHEET_TEMPLATE % colors
+    
     @classmethod
     def get_available_themes(cls):
         """Return a list of available theme names"""
@@ -131,8 +292,7 @@ class ThemeManager:
             cls._current_theme = theme_name
             
             # Save the theme choice in settings
-            settings = QSettings(APP_NAME, APP_NAME)
-            settings.setValue('theme', theme_name)
+            settings_service.setValue('theme', theme_name)
             
             print(f"Loaded theme: {theme_name}")
             return True
@@ -149,19 +309,17 @@ class ThemeManager:
     @classmethod
     def is_dark_mode(cls):
         """Check if dark mode is enabled"""
-        return darkdetect.isDark()
+        now = time.monotonic()
+        if cls._dark_mode_cache is None or now - cls._dark_mode_cache[1] > DARK_MODE_CACHE_SECONDS:
+            cls._dark_mode_cache = (bool(darkdetect.isDark()), now)
+        return cls._dark_mode_cache[0]
     
     @classmethod
     def get_editor_font(cls):
         """Get the editor font"""
         try:
-            # Get the current theme module
-            theme_module = cls._get_theme_module()
-            
-            # Get font from theme
-            font_name = getattr(theme_module, 'DEFAULT_FONT', DEFAULT_FONT)
-            font_size = getattr(theme_module, 'DEFAULT_FONT_SIZE', DEFAULT_FONT_SIZE)
-            
+            # Get font from the theme's bundle
+            font_name, font_size = cls.get_bundle()["font"]
             return QFont(font_name, font_size)
         except Exception as e:
             print(f"Error getting editor font: {str(e)}")
@@ -183,19 +341,8 @@ class ThemeManager:
             is_dark = cls.is_dark_mode()
             
         try:
-            # Get the current theme module
-            theme_module = cls._get_theme_module()
-            
-            # Get theme colors
-            if is_dark:
-                colors = getattr(theme_module, 'DARK_MODE', DARK_MODE)
-                template = getattr(theme_module, 'DARK_STYLESHEET_TEMPLATE', DARK_STYLESHEET_TEMPLATE)
-            else:
-                colors = getattr(theme_module, 'LIGHT_MODE', LIGHT_MODE)
-                template = getattr(theme_module, 'LIGHT_STYLESHEET_TEMPLATE', LIGHT_STYLESHEET_TEMPLATE)
-            
-            # Format the stylesheet template with the theme colors using % operator
-            return template % colors
+            # Already formatted by the theme compiler
+            return cls._get_variant(is_dark)["stylesheet"]
         except Exception as e:
             print(f"Error getting stylesheet: {str(e)}")
             traceback.print_exc()
@@ -225,11 +372,8 @@ class ThemeManager:
     def apply_shadow_effect(cls, widget):
         """Apply a shadow effect to a widget"""
         try:
-            # Get the current theme module
-            theme_module = cls._get_theme_module()
-            
             # Get shadow effect settings
-            shadow_effect = getattr(theme_module, 'SHADOW_EFFECT', SHADOW_EFFECT)
+            shadow_effect = cls.get_bundle()["shadow"]
             
             # Apply the shadow effect
             shadow = QGraphicsDropShadowEffect()
@@ -249,46 +393,7 @@ class ThemeManager:
             shadow.setOffset(QPointF(0, 0))
             widget.setGraphicsEffect(shadow)
             return shadow
-    
-    @classmethod
-    def _get_theme_module(cls):
-        """Get the module for the current theme"""
-        theme_name = cls._current_theme or "Default"
-        
-        if theme_name == "Default":
-            # Use imported default theme
-            import theme_default
-            return theme_default
-        else:
-            # Return the custom theme module
-            theme_info = cls._available_themes.get(theme_name, {})
-            return theme_info.get("module", None) or cls._load_theme_module(theme_name)
-    
-    @classmethod
-    def _load_theme_module(cls, theme_name):
-        """Load a theme module dynamically"""
-        try:
-            theme_info = cls._available_themes.get(theme_name, {})
-            module_path = theme_info.get("module_path")
-            
-            if not module_path or not os.path.exists(module_path):
-                print(f"Theme module not found: {theme_name}")
-                return None
-                
-            # Load the module
-            spec = importlib.util.spec_from_file_location(theme_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[theme_name] = module
-            spec.loader.exec_module(module)
-            
-            # Cache the module
-            cls._available_themes[theme_name]["module"] = module
-            
-            return module
-        except Exception as e:
-            print(f"Error loading theme module {theme_name}: {str(e)}")
-            traceback.print_exc()
-            return None
 
 # Initialize the theme manager
-ThemeManager.initialize() 
\ No newline at end of file
+with startup_profiler.phase("ThemeManager.initialize"):
+    ThemeManager.initialize() 
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Trigram Index for HyprText
+==========================
+
+This module keeps an optional on-disk trigram index per project directory so Find in
+Files can skip files that can't possibly match. Every file's case-folded text is
+reduced to the set of its three-character substrings; a literal search then only
+needs to scan files containing all of the query's trigrams.
+
+The index lives in ~/.cache/hyprtext/trigrams/<sha1 of the directory>.pickle and is
+brought up to date before each search by comparing file mtimes and sizes, so only
+new or changed files are re-read. It does not import PyQt6.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import traceback
+
+from batch_convert import iter_input_files
+from text_io import BINARY_SNIFF_SIZE, decode_text, is_probably_binary
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Bumped whenever the pickled layout changes; older indexes are rebuilt
+INDEX_VERSION = 2
+
+# Files larger than this aren't indexed and are always scanned (bytes)
+MAX_INDEXED_FILE_SIZE = 4 * 1024 * 1024
+
+# Files re-indexed per worker task
+FILES_PER_BATCH = 64
+
+# Indexes already loaded in this process, by root directory
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index_directory():
+    """Return the directory index files are stored in"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "hyprtext", "trigrams")
+
+# Dotted capital I and dotless i match "i" under re.IGNORECASE, but casefold() keeps them apart
+_CASE_FOLD_FIXES = {0x130: 'i', 0x131: 'i'}
+
+def fold_case(text):
+    """Fold text so that characters re.IGNORECASE treats as equal become the same string
+
+    Plain lower() misses some of them (e.g. the long s and the Kelvin sign), which would
+    let the index drop files a case-insensitive search matches.
+    """
+    return text.translate(_CASE_FOLD_FIXES).casefold()
+
+def trigrams_of(text):
+    """Return the set of case-folded trigrams in text"""
+    text = fold_case(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def index_file(file_path):
+    """Return (mtime_ns, size, trigrams) for a file; trigrams is None if it can't be indexed"""
+    stat = os.stat(file_path)
+    if stat.st_size > MAX_INDEXED_FILE_SIZE:
+        return stat.st_mtime_ns, stat.st_size, None
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if is_probably_binary(data[:BINARY_SNIFF_SIZE]):
+        # Binary files are skipped by the search anyway
+        return stat.st_mtime_ns, stat.st_size, frozenset()
+    try:
+        content, _ = decode_text(data)
+    except Exception:
+        return stat.st_mtime_ns, stat.st_size, frozenset()
+    return stat.st_mtime_ns, stat.st_size, frozenset(trigrams_of(content))
+
+def index_batch(file_paths):
+    """Index a batch of files in a worker process, skipping files that vanished"""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((file_path,) + index_file(file_path))
+        except OSError:
+            continue
+    return results
+
+def required_literals(pattern_text, use_regex):
+    """Return substrings every match must contain, or None if nothing is known
+
+    For a regex only literal runs at the top level of the pattern are used; anything
+    inside groups, alternations or repeats is ignored, which keeps this conservative.
+    """
+    if not use_regex:
+        return [pattern_text]
+
+    try:
+        parsed = sre_parse.parse(pattern_text)
+    except Exception:
+        return None
+
+    literals = []
+    run = []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        if run:
+            literals.append(''.join(run))
+            run = []
+    if run:
+        literals.append(''.join(run))
+    literals = [literal for literal in literals if len(literal) >= 3]
+    return literals or None
+
+class TrigramIndex:
+    """Trigram index of the text files under one directory"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.files = {}  # Dictionary of path: (mtime_ns, size, frozenset of trigrams or None)
+        self._postings = None  # Dictionary of trigram: set of paths, built on demand
+        self.lock = threading.Lock()
+
+    @property
+    def path(self):
+        digest = hashlib.sha1(self.root.encode('utf-8', errors='surrogatepass')).hexdigest()
+        return os.path.join(get_index_directory(), f"{digest}.pickle")
+
+    @classmethod
+    def load(cls, root):
+        """Load the stored index for root, or return an empty one"""
+        index = cls(root)
+        try:
+            with open(index.path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("root") == index.root:
+                index.files = data["files"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Discarding unreadable trigram index for {index.root}: {str(e)}")
+        return index
+
+    def save(self):
+        """Write the index atomically"""
+        try:
+            os.makedirs(get_index_directory(), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"version": INDEX_VERSION, "root": self.root, "files": self.files},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Failed to save trigram index for {self.root}: {str(e)}")
+            traceback.print_exc()
+
+    def update(self, executor=None, cancelled=lambda: False):
+        """Re-index new and changed files and forget deleted ones
+
+        Returns:
+            int: number of files that were (re)indexed or removed
+        """
+        stale = []
+        seen = set()
+        for file_path in iter_input_files([self.root]):
+            if cancelled():
+                return 0
+            seen.add(file_path)
+            entry = self.files.get(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                stale.append(file_path)
+
+        removed = [file_path for file_path in self.files if file_path not in seen]
+        for file_path in removed:
+            del self.files[file_path]
+
+        batches = [stale[i:i + FILES_PER_BATCH] for i in range(0, len(stale), FILES_PER_BATCH)]
+        if executor is not None and len(batches) > 1:
+            results = executor.map(index_batch, batches)
+        else:
+            results = map(index_batch, batches)
+        for batch in results:
+            if cancelled():
+                break
+            for file_path, mtime_ns, size, trigrams in batch:
+                self.files[file_path] = (mtime_ns, size, trigrams)
+
+        if stale or removed:
+            self._postings = None
+        return len(stale) + len(removed)
+
+    def _build_postings(self):
+        postings = {}
+        for file_path, (_, _, trigrams) in self.files.items():
+            if trigrams:
+                for trigram in trigrams:
+                    postings.setdefault(trigram, set()).add(file_path)
+        self._postings = postings
+
+    def candidates(self, pattern_text, use_regex=False):
+        """Return the files that may contain a match, or None if the index can't tell"""
+        literals = required_literals(pattern_text, use_regex)
+        if not literals:
+            return None
+
+        wanted = set()
+        for literal in literals:
+            wanted |= trigrams_of(literal)
+        if not wanted:
+            return None
+
+        if self._postings is None:
+            self._build_postings()
+
+        # Intersect starting from the rarest trigram
+        result = None
+        for trigram in sorted(wanted, key=lambda t: len(self._postings.get(t, ()))):
+            paths = self._postings.get(trigram, set())
+            result = set(paths) if result is None else result & paths
+            if not result:
+                break
+
+        # Files that were too large to index always have to be scanned
+        unindexed = {file_path for file_path, (_, _, trigrams) in self.files.items() if trigrams is None}
+        return sorted((result or set()) | unindexed)
+
+def get_index(root):
+    """Return the index for root, loading it from disk the first time"""
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = TrigramIndex.load(root)
+            _indexes[root] = index
+        return index